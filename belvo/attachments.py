@@ -0,0 +1,252 @@
+import binascii
+import json
+import os
+import pathlib
+import tempfile
+import uuid
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+# Fields holding base64 encoded documents, e.g. `attach_pdf` and `attach_xml`.
+FIELDS = ("pdf", "xml")
+
+# Replaces attachments in the body until they are resolved, once it's parsed.
+_PLACEHOLDER = "\x00belvo-attachment:"
+
+
+# Parser states.
+_OUTSIDE = "outside"
+_STRING = "string"
+_ATTACHMENT = "attachment"
+
+# Strings longer than any field name are not kept while looking for keys.
+_MAX_KEY_LENGTH = 32
+
+
+class AttachmentSink:
+    """
+    Where attachments are written while a response is decoded.
+    """
+
+    def open(self, field: str) -> BinaryIO:
+        """
+        Return a binary file to write the decoded attachment of `field` to.
+        """
+        raise NotImplementedError()
+
+    def close(self, file: BinaryIO, record: Dict, field: str) -> Any:
+        """
+        Called once `record` has been decoded, return what replaces the
+        attachment of `field` in it.
+        """
+        return file
+
+    def abort(self, file: BinaryIO) -> None:
+        """
+        Called instead of `close()` when the response couldn't be decoded.
+        """
+
+
+class DirectorySink(AttachmentSink):
+    """
+    Writes attachments to files in `path`, named after the id of their record
+    (e.g. `<id>.pdf`), and replaces them with the path of the file.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def open(self, field: str) -> BinaryIO:
+        return tempfile.NamedTemporaryFile(  # type: ignore
+            dir=str(self.path), prefix=".", suffix=f".{field}.part", delete=False
+        )
+
+    def close(self, file: BinaryIO, record: Dict, field: str) -> Any:
+        file.close()
+        target = self.path / "{}.{}".format(record.get("id") or uuid.uuid4(), field)
+        os.replace(file.name, str(target))
+        return str(target)
+
+    def abort(self, file: BinaryIO) -> None:
+        file.close()
+        try:
+            os.unlink(file.name)
+        except FileNotFoundError:
+            pass
+
+
+def _find(data: bytes, first: bytes, second: bytes, start: int) -> int:
+    """
+    Return the position of the first `first` or `second` in `data` from
+    `start`, or its length if there is none.
+    """
+    end = data.find(first, start)
+    if end == -1:
+        end = len(data)
+    found = data.find(second, start, end)
+    return end if found == -1 else found
+
+
+def as_sink(attachments: Union[str, "os.PathLike[str]", AttachmentSink]) -> AttachmentSink:
+    if isinstance(attachments, AttachmentSink):
+        return attachments
+    return DirectorySink(attachments)
+
+
+class AttachmentDecoder:
+    """
+    Incremental decoder for responses with attachments.
+
+    Bytes are given to `feed()` as they arrive, and the base64 encoded value
+    of any of `fields` is decoded and written to `sink` on the fly, so only
+    the rest of the body is kept in memory. `close()` parses it and returns it
+    with every attachment replaced by what `sink.close()` returns (e.g. the
+    path of the file).
+    """
+
+    def __init__(
+        self,
+        sink: AttachmentSink,
+        *,
+        fields: Tuple[str, ...] = FIELDS,
+        loads: Callable[[bytes], Any] = json.loads,
+    ) -> None:
+        self.sink = sink
+        self._fields = {field.encode() for field in fields}
+        self._loads = loads
+        self._body = bytearray()
+        self._state = _OUTSIDE
+        self._escape = False
+        self._string = bytearray()
+        self._key: Optional[bytes] = None
+        self._base64 = bytearray()
+        self._file: Optional[BinaryIO] = None
+        self._count = 0
+        self._pending: Dict[int, Tuple[str, BinaryIO]] = {}
+
+    def feed(self, data: bytes) -> None:
+        pos = 0
+        while pos < len(data):
+            if self._state == _OUTSIDE:
+                pos = self._feed_outside(data, pos)
+            elif self._escape:
+                # The character after a backslash, which can't end the string.
+                next_pos = pos + 1
+                char = data[pos:next_pos]
+                if self._state == _STRING:
+                    self._body += char
+                    self._keep(char)
+                elif char == b"/":
+                    self._write(char)
+                self._escape = False
+                pos = next_pos
+            else:
+                pos = self._feed_string(data, pos)
+
+    def close(self) -> Any:
+        if self._state != _OUTSIDE:
+            self.abort()
+            body = self._body.decode("utf-8", "replace")
+            raise json.JSONDecodeError("Unterminated string", body, len(body))
+        try:
+            value = self._loads(bytes(self._body))
+            self._resolve(value)
+        except BaseException:
+            self.abort()
+            raise
+        return value
+
+    def abort(self) -> None:
+        """
+        Discard the attachments that were not resolved.
+        """
+        for _field, file in self._pending.values():
+            self.sink.abort(file)
+        self._pending.clear()
+
+    def _feed_outside(self, data: bytes, pos: int) -> int:
+        end = _find(data, b'"', b":", pos)
+        skipped = data[pos:end]
+        if skipped.strip():
+            # Something else than the value of the last key, e.g. `null,`.
+            self._key = None
+        self._body += skipped
+        if end == len(data):
+            return end
+
+        next_pos = end + 1
+        char = data[end:next_pos]
+        self._body += char
+        if char == b":":
+            self._key = bytes(self._string)
+        elif self._key in self._fields:
+            self._start_attachment(self._key.decode())  # type: ignore
+        else:
+            self._state = _STRING
+            self._string.clear()
+            self._key = None
+        return next_pos
+
+    def _feed_string(self, data: bytes, pos: int) -> int:
+        end = _find(data, b'"', b"\\", pos)
+        segment = data[pos:end]
+        if self._state == _ATTACHMENT:
+            self._write(segment)
+        else:
+            self._body += segment
+            self._keep(segment)
+        if end == len(data):
+            return end
+
+        next_pos = end + 1
+        if data[end:next_pos] == b"\\":
+            if self._state == _STRING:
+                self._body += b"\\"
+            self._escape = True
+        else:
+            if self._state == _ATTACHMENT:
+                self._finish_attachment()
+            self._body += b'"'
+            self._state = _OUTSIDE
+        return next_pos
+
+    def _keep(self, segment: bytes) -> None:
+        if len(self._string) <= _MAX_KEY_LENGTH:
+            self._string += segment
+
+    def _start_attachment(self, field: str) -> None:
+        index = self._count
+        self._count += 1
+        self._file = self.sink.open(field)
+        self._pending[index] = (field, self._file)
+        self._body += json.dumps(f"{_PLACEHOLDER}{index}")[1:-1].encode()
+        self._state = _ATTACHMENT
+        self._key = None
+
+    def _write(self, segment: bytes) -> None:
+        # Only whole groups of 4 characters can be decoded, the rest waits for more data.
+        if self._base64:
+            segment = bytes(self._base64) + segment
+            self._base64.clear()
+        size = len(segment) - len(segment) % 4
+        if size:
+            self._file.write(binascii.a2b_base64(segment[:size]))  # type: ignore
+        self._base64 += segment[size:]
+
+    def _finish_attachment(self) -> None:
+        if self._base64:
+            self._file.write(binascii.a2b_base64(self._base64))  # type: ignore
+            self._base64.clear()
+
+    def _resolve(self, value: Any) -> None:
+        if isinstance(value, list):
+            for item in value:
+                self._resolve(item)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                if isinstance(item, str) and item.startswith(_PLACEHOLDER):
+                    index = int(item.rpartition(":")[2])
+                    field, file = self._pending.pop(index)
+                    value[key] = self.sink.close(file, value, field)
+                else:
+                    self._resolve(item)
@@ -0,0 +1,168 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class BatchItem:
+    """
+    Outcome of one call of a batch: either its `result` or the `error` it raised.
+    """
+
+    __slots__ = ("index", "call", "result", "error", "elapsed")
+
+    def __init__(self, index: int, call: Any) -> None:
+        self.index = index
+        self.call = call
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        outcome = "ok" if self.ok else repr(self.error)
+        return f"BatchItem(index={self.index}, {outcome})"
+
+
+class BatchResult:
+    """
+    Items of a batch, in input order or in completion order, plus statistics.
+    """
+
+    def __init__(self, items: List[BatchItem], elapsed: float) -> None:
+        self.items = items
+        self.elapsed = elapsed
+
+    def __iter__(self) -> Iterator[BatchItem]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index: int) -> BatchItem:
+        return self.items[index]
+
+    @property
+    def results(self) -> List[Any]:
+        return [item.result for item in self.items]
+
+    @property
+    def errors(self) -> List[BatchItem]:
+        return [item for item in self.items if not item.ok]
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.items) - len(self.errors)
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def throughput(self) -> float:
+        """
+        Calls completed per second.
+        """
+        return len(self.items) / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self) -> str:
+        return "BatchResult(succeeded={}, failed={}, elapsed={:.2f}s, throughput={:.1f}/s)".format(
+            self.succeeded, self.failed, self.elapsed, self.throughput
+        )
+
+
+def _arguments(call: Any, common: Dict[str, Any]) -> Tuple[Tuple, Dict[str, Any]]:
+    """
+    A call can be given as a dictionary of keyword arguments, a tuple or list of
+    positional arguments, or a single positional argument (e.g. a link id).
+    """
+    if isinstance(call, dict):
+        return (), {**common, **call}
+    if isinstance(call, (tuple, list)):
+        return tuple(call), dict(common)
+    return (call,), dict(common)
+
+
+def _run(func: Callable, item: BatchItem, common: Dict[str, Any]) -> BatchItem:
+    args, kwargs = _arguments(item.call, common)
+    started = time.perf_counter()
+    try:
+        item.result = func(*args, **kwargs)
+    except Exception as exc:
+        item.error = exc
+    item.elapsed = time.perf_counter() - started
+    return item
+
+
+def run_batch(
+    func: Callable,
+    calls: Iterable[Any],
+    *,
+    concurrency: int = 8,
+    ordered: bool = True,
+    on_result: Optional[Callable[[BatchItem], None]] = None,
+    **common: Any,
+) -> BatchResult:
+    """
+    Call `func` once per item of `calls` using up to `concurrency` threads.
+
+    Errors raised by a call are captured in its `BatchItem` instead of aborting
+    the batch. `on_result` is called with each item as soon as it completes and
+    items are returned in input order, or in completion order if `ordered` is
+    `False`. `common` keyword arguments are given to every call.
+    """
+    items = [BatchItem(index, call) for index, call in enumerate(calls)]
+    completed = []
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [executor.submit(_run, func, item, common) for item in items]
+        for future in as_completed(futures):
+            item = future.result()
+            completed.append(item)
+            if on_result is not None:
+                on_result(item)
+    elapsed = time.perf_counter() - started
+
+    return BatchResult(items if ordered else completed, elapsed)
+
+
+async def run_batch_async(
+    func: Callable,
+    calls: Iterable[Any],
+    *,
+    concurrency: int = 8,
+    ordered: bool = True,
+    on_result: Optional[Callable[[BatchItem], None]] = None,
+    **common: Any,
+) -> BatchResult:
+    """
+    Same as `run_batch`, for coroutine functions: up to `concurrency` calls are
+    awaited at the same time on the running event loop.
+    """
+    items = [BatchItem(index, call) for index, call in enumerate(calls)]
+    completed = []
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item: BatchItem) -> None:
+        args, kwargs = _arguments(item.call, common)
+        async with semaphore:
+            item_started = time.perf_counter()
+            try:
+                item.result = await func(*args, **kwargs)
+            except Exception as exc:
+                item.error = exc
+            item.elapsed = time.perf_counter() - item_started
+
+        completed.append(item)
+        if on_result is not None:
+            on_result(item)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run(item) for item in items))
+    elapsed = time.perf_counter() - started
+
+    return BatchResult(items if ordered else completed, elapsed)
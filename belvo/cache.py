@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+
+class CacheEntry:
+    __slots__ = ("endpoint", "content", "expires_at", "etag", "last_modified")
+
+    def __init__(
+        self,
+        endpoint: str,
+        content: bytes,
+        expires_at: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        self.endpoint = endpoint
+        self.content = content
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """
+        Headers to revalidate a stale entry with a conditional request.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    LRU cache for the responses of GET requests, meant for slow-changing
+    catalogs such as `/api/institutions/`.
+
+    Only endpoints with a TTL are cached: `ttls` maps endpoints to their TTL in
+    seconds and `ttl` applies to the rest (by default they are not cached). Once
+    an entry expires it is revalidated with `If-None-Match`/`If-Modified-Since`
+    when Belvo API gave an `ETag`/`Last-Modified`, so an unchanged response is
+    not downloaded again. Up to `maxsize` responses are kept.
+
+    Raw response bodies are cached (and decoded on every hit), so callers can
+    freely modify what they get.
+    """
+
+    def __init__(
+        self, maxsize: int = 256, ttl: Optional[float] = None, *, ttls: Dict[str, float] = None
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.ttls = ttls or {}
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, endpoint: str) -> Optional[float]:
+        return self.ttls.get(endpoint, self.ttl)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: Hashable, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def refresh(self, entry: CacheEntry) -> None:
+        """
+        Mark an entry as fresh again, after Belvo API confirmed it didn't change.
+        """
+        ttl = self.ttl_for(entry.endpoint) or 0
+        entry.expires_at = time.monotonic() + ttl
+
+    def invalidate(self, endpoint: Optional[str] = None) -> None:
+        """
+        Drop every cached response of `endpoint` (e.g. `"/api/institutions/"`),
+        or all of them if no endpoint is given.
+        """
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+                return
+            for key in [key for key, entry in self._entries.items() if entry.endpoint == endpoint]:
+                del self._entries[key]
@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, Mapping, Optional, Tuple
+
+from belvo.exceptions import CircuitOpenError
+from belvo.retry import RETRY_STATUSES
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Returns the circuit of a request given its endpoint and payload (body or query).
+CircuitKey = Callable[[str, Mapping[str, Any]], Hashable]
+
+
+def by_institution(links: Optional[Mapping[str, str]] = None) -> CircuitKey:
+    """
+    Key circuits by endpoint and institution, taken from the `institution` of
+    the payload or, through `links` (link id to institution), from its `link`.
+    """
+
+    def key(endpoint: str, payload: Mapping[str, Any]) -> Hashable:
+        institution = payload.get("institution")
+        if institution is None and links is not None:
+            institution = links.get(payload.get("link"))  # type: ignore
+        return (endpoint, institution) if institution is not None else endpoint
+
+    return key
+
+
+class _Circuit:
+    __slots__ = ("state", "calls", "opened_at", "trial_started_at")
+
+    def __init__(self, window: int) -> None:
+        self.state = CLOSED
+        # (failed, slow) for the most recent calls.
+        self.calls: Deque[Tuple[bool, bool]] = deque(maxlen=window)
+        self.opened_at = 0.0
+        self.trial_started_at: Optional[float] = None
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast, with a `CircuitOpenError`, to endpoints that are
+    failing or too slow, so that they don't tie up workers meanwhile.
+
+    Every endpoint (or the result of `key`, see `by_institution`) has its own
+    circuit, which opens when, out of its last `window` requests (and at least
+    `min_calls`), the share of failures (network errors or `failure_statuses`)
+    reaches `failure_rate` or, when `slow_call_duration` is given, the share of
+    requests slower than that many seconds reaches `slow_call_rate`.
+
+    After `reset_timeout` seconds open, the circuit is half-open: one trial
+    request is let through, which closes the circuit if it succeeds and opens
+    it again otherwise. `reset()` closes every circuit.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        slow_call_duration: Optional[float] = None,
+        slow_call_rate: float = 1.0,
+        window: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        failure_statuses: Iterable[int] = RETRY_STATUSES,
+        key: Optional[CircuitKey] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0 < failure_rate <= 1 or not 0 < slow_call_rate <= 1:
+            raise ValueError("failure_rate and slow_call_rate must be between 0 and 1")
+        if min_calls < 1 or window < min_calls:
+            raise ValueError("window must be at least min_calls, which must be at least 1")
+
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.window = window
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.failure_statuses = frozenset(failure_statuses)
+        self.key = key
+        self._clock = clock
+        self._circuits: Dict[Hashable, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def circuit(self, endpoint: str, payload: Optional[Mapping[str, Any]] = None) -> Hashable:
+        if self.key is None:
+            return endpoint
+        return self.key(endpoint, payload or {})
+
+    def state(self, circuit: Hashable) -> str:
+        with self._lock:
+            found = self._circuits.get(circuit)
+            if found is None:
+                return CLOSED
+            if found.state == OPEN and self._clock() - found.opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return found.state
+
+    def before_request(self, circuit: Hashable) -> None:
+        """
+        Raise a `CircuitOpenError` if a request can't be made to `circuit` now.
+        """
+        now = self._clock()
+        with self._lock:
+            found = self._circuits.get(circuit)
+            if found is None or found.state == CLOSED:
+                return
+
+            if found.state == OPEN:
+                retry_after = found.opened_at + self.reset_timeout - now
+                if retry_after > 0:
+                    raise CircuitOpenError(circuit, retry_after)
+                found.state = HALF_OPEN
+
+            # A trial request that never reported back is given up after `reset_timeout`.
+            trial = found.trial_started_at
+            if trial is not None and now - trial < self.reset_timeout:
+                raise CircuitOpenError(circuit, trial + self.reset_timeout - now)
+            found.trial_started_at = now
+
+    def after_request(
+        self, circuit: Hashable, elapsed: float, status: Optional[int] = None
+    ) -> None:
+        """
+        Record the outcome of a request to `circuit`, which took `elapsed`
+        seconds and returned `status` (`None` for a network error).
+        """
+        failed = status is None or status in self.failure_statuses
+        slow = self.slow_call_duration is not None and elapsed >= self.slow_call_duration
+        with self._lock:
+            found = self._circuits.get(circuit)
+            if found is None:
+                found = self._circuits[circuit] = _Circuit(self.window)
+
+            if found.state != CLOSED:
+                # Requests sent before the circuit opened don't decide whether it closes.
+                if found.state == HALF_OPEN and found.trial_started_at is not None:
+                    found.trial_started_at = None
+                    if failed or slow:
+                        self._open(circuit, found)
+                    else:
+                        logger.info("Circuit %s closed", circuit)
+                        found.state = CLOSED
+                        found.calls.clear()
+                return
+
+            found.calls.append((failed, slow))
+            if self._should_open(found):
+                self._open(circuit, found)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._circuits.clear()
+
+    def _should_open(self, circuit: _Circuit) -> bool:
+        calls = len(circuit.calls)
+        if calls < self.min_calls:
+            return False
+        failures = sum(1 for failed, _slow in circuit.calls if failed)
+        slow = sum(1 for _failed, slow in circuit.calls if slow)
+        return (
+            failures / calls >= self.failure_rate
+            or self.slow_call_duration is not None
+            and slow / calls >= self.slow_call_rate
+        )
+
+    def _open(self, key: Hashable, circuit: _Circuit) -> None:
+        logger.warning("Circuit %s opened for %.0fs", key, self.reset_timeout)
+        circuit.state = OPEN
+        circuit.opened_at = self._clock()
+        circuit.calls.clear()
@@ -1,25 +1,50 @@
 import os
+from typing import Any, Optional
 
 from . import resources
 from .enums import Environment
 from .exceptions import BelvoAPIException
-from .http import APISession
+from .http import APISession, AsyncAPISession
 
 
-class Client:
-    def __init__(self, secret_key_id: str, secret_key_password: str, url: str = None) -> None:
-        if url is None:
-            url = os.getenv("BELVO_API_URL")
+def _resolve_url(url: Optional[str]) -> str:
+    if url is None:
+        url = os.getenv("BELVO_API_URL")
 
-        url = Environment.get_url(url)
-        if not url:
-            raise BelvoAPIException("You need to provide a URL or a valid environment.")
+    url = Environment.get_url(url)
+    if not url:
+        raise BelvoAPIException("You need to provide a URL or a valid environment.")
+    return url
 
-        self.session = APISession(url)
 
-        if not self.session.login(secret_key_id, secret_key_password):
+class Client:
+    def __init__(
+        self,
+        secret_key_id: str,
+        secret_key_password: str,
+        url: str = None,
+        *,
+        lazy: bool = False,
+        **session_options: Any,
+    ) -> None:
+        url = _resolve_url(url)
+
+        self.session = APISession(url, **session_options)
+
+        if not self.session.login(secret_key_id, secret_key_password, lazy=lazy):
             raise BelvoAPIException("Login failed.")
 
+        self._setup_resources()
+
+    def verify(self) -> None:
+        """
+        Validate the credentials of the client, useful when it was created with
+        `lazy=True` and you want to fail early.
+        """
+        if not self.session.verify():
+            raise BelvoAPIException("Login failed.")
+
+    def _setup_resources(self) -> None:
         self._links = resources.Links(self.session)
         self._accounts = resources.Accounts(self.session)
         self._transactions = resources.Transactions(self.session)
@@ -85,3 +110,59 @@ class Client:
     @property
     def WidgetToken(self):
         return self._widget_token
+
+
+class AsyncClient(Client):
+    """
+    Client for asyncio applications. Resources are the same as in `Client`, but
+    `create`, `get`, `delete`, `resume`... must be awaited and `list()` must be
+    consumed with `async for`.
+
+    Login happens when entering the client as an async context manager (or
+    when awaiting `login()`), since it can not be done from `__init__`. With
+    `lazy=True` credentials are only validated by the first request.
+    """
+
+    session: AsyncAPISession  # type: ignore
+
+    def __init__(
+        self,
+        secret_key_id: str,
+        secret_key_password: str,
+        url: str = None,
+        *,
+        lazy: bool = False,
+        **session_options: Any,
+    ) -> None:
+        url = _resolve_url(url)
+
+        self._secret_key_id = secret_key_id
+        self._secret_key_password = secret_key_password
+        self._lazy = lazy
+        self.session = AsyncAPISession(url, **session_options)
+
+        self._setup_resources()
+
+    async def login(self) -> None:
+        if not await self.session.login(
+            self._secret_key_id, self._secret_key_password, lazy=self._lazy
+        ):
+            raise BelvoAPIException("Login failed.")
+
+    async def verify(self) -> None:  # type: ignore
+        if not await self.session.verify():
+            raise BelvoAPIException("Login failed.")
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    async def __aenter__(self) -> "AsyncClient":
+        try:
+            await self.login()
+        except BaseException:
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
@@ -0,0 +1,215 @@
+import inspect
+import re
+from array import array
+from datetime import date
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Tuple
+
+# Column kinds
+FLOAT = "float64"
+DATE = "date"
+DATETIME = "datetime"
+CATEGORY = "category"
+STRING = "string"
+
+# numpy uses the smallest int64 to represent NaT.
+NAT = -9223372036854775808
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MICROSECONDS_PER_DAY = 86_400_000_000
+_ISO_DATETIME = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:\.(\d{1,6})\d*)?)?)?"
+    r"(Z|[+-]\d{2}:?\d{2})?$"
+)
+
+Schema = Dict[str, str]
+
+
+def _parse_datetime(value: Any, kind: str) -> int:
+    """
+    Return an ISO 8601 date or datetime as days (`DATE`) or microseconds
+    (`DATETIME`, in UTC) since the epoch, or `NAT` if it can not be parsed.
+    """
+    match = _ISO_DATETIME.match(value) if isinstance(value, str) else None
+    if match is None:
+        return NAT
+
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    days = date(int(year), int(month), int(day)).toordinal() - _EPOCH_ORDINAL
+    if kind == DATE:
+        return days
+
+    seconds = int(hour or 0) * 3600 + int(minute or 0) * 60 + int(second or 0)
+    if offset and offset != "Z":
+        sign = -1 if offset[0] == "-" else 1
+        offset = offset[1:].replace(":", "")
+        seconds -= sign * (int(offset[:2]) * 3600 + int(offset[2:]) * 60)
+    microseconds = int(fraction.ljust(6, "0")) if fraction else 0
+    return days * _MICROSECONDS_PER_DAY + seconds * 1_000_000 + microseconds
+
+
+def _lookup(result: Dict, path: Tuple[str, ...]) -> Any:
+    value: Any = result
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+class Columns:
+    """
+    Results of a resource stored column by column.
+
+    `data` maps each column name to a compact buffer: an `array("d")` of floats
+    (`NaN` when missing) for `FLOAT` columns, an `array("q")` of days or
+    microseconds since the epoch (`NAT` when missing) for `DATE` and `DATETIME`
+    columns, an `array("i")` of codes into `categories[name]` (`-1` when missing)
+    for `CATEGORY` columns and a list for `STRING` columns.
+    """
+
+    def __init__(self, schema: Schema, data: Dict[str, Any], categories: Dict[str, List]) -> None:
+        self.schema = schema
+        self.data = data
+        self.categories = categories
+
+    def __len__(self) -> int:
+        return len(next(iter(self.data.values()))) if self.data else 0
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Return a dictionary of NumPy arrays, sharing memory with the buffers.
+        Category columns are returned as their `int32` codes.
+        """
+        try:
+            import numpy as np
+        except ImportError:  # pragma: no cover
+            raise ImportError("`to_numpy()` requires numpy to be installed.")
+
+        arrays = {}
+        for name, kind in self.schema.items():
+            buffer = self.data[name]
+            if kind == FLOAT:
+                arrays[name] = np.frombuffer(buffer, dtype=np.float64)
+            elif kind == DATE:
+                arrays[name] = np.frombuffer(buffer, dtype=np.int64).view("datetime64[D]")
+            elif kind == DATETIME:
+                arrays[name] = np.frombuffer(buffer, dtype=np.int64).view("datetime64[us]")
+            elif kind == CATEGORY:
+                arrays[name] = np.frombuffer(buffer, dtype=np.int32)
+            else:
+                arrays[name] = np.array(buffer, dtype=object)
+        return arrays
+
+    def to_pandas(self) -> Any:
+        try:
+            import pandas as pd
+        except ImportError:  # pragma: no cover
+            raise ImportError("`to_pandas()` requires pandas to be installed.")
+
+        arrays = self.to_numpy()
+        frame = {}
+        for name, kind in self.schema.items():
+            if kind == CATEGORY:
+                frame[name] = pd.Categorical.from_codes(arrays[name], self.categories[name])
+            else:
+                frame[name] = arrays[name]
+        return pd.DataFrame(frame)
+
+    def to_arrow(self) -> Any:
+        try:
+            import pyarrow as pa
+        except ImportError:  # pragma: no cover
+            raise ImportError("`to_arrow()` requires pyarrow to be installed.")
+
+        columns = {}
+        for name, kind in self.schema.items():
+            buffer = self.data[name]
+            if kind == FLOAT:
+                columns[name] = pa.array(buffer, type=pa.float64())
+            elif kind in (DATE, DATETIME):
+                values = [None if value == NAT else value for value in buffer]
+                arrow_type = pa.date32() if kind == DATE else pa.timestamp("us", tz="UTC")
+                storage_type = pa.int32() if kind == DATE else pa.int64()
+                columns[name] = pa.array(values, type=storage_type).cast(arrow_type)
+            elif kind == CATEGORY:
+                codes = pa.array([None if code == -1 else code for code in buffer], pa.int32())
+                columns[name] = pa.DictionaryArray.from_arrays(
+                    codes, pa.array(self.categories[name])
+                )
+            else:
+                columns[name] = pa.array(buffer, type=pa.string())
+        return pa.table(columns)
+
+
+class ColumnBuilder:
+    """
+    Accumulates results into typed column buffers as they are appended, so
+    results don't have to be kept around as dictionaries.
+
+    `schema` maps column names to their kind; names can use dots to reach nested
+    values (e.g. `"account.id"`).
+    """
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = dict(schema)
+        self._paths = [(name, tuple(name.split(".")), kind) for name, kind in schema.items()]
+        self._data: Dict[str, Any] = {}
+        self._codes: Dict[str, Dict[Any, int]] = {}
+        for name, kind in self.schema.items():
+            if kind == FLOAT:
+                self._data[name] = array("d")
+            elif kind in (DATE, DATETIME):
+                self._data[name] = array("q")
+            elif kind == CATEGORY:
+                self._data[name] = array("i")
+                self._codes[name] = {}
+            elif kind == STRING:
+                self._data[name] = []
+            else:
+                raise ValueError(f"Unknown column kind {kind!r} for {name!r}.")
+
+    def append(self, result: Dict) -> None:
+        if not isinstance(result, dict):
+            result = result.to_dict()
+
+        for name, path, kind in self._paths:
+            value = _lookup(result, path)
+            if kind == FLOAT:
+                self._data[name].append(float("nan") if value is None else float(value))
+            elif kind in (DATE, DATETIME):
+                self._data[name].append(_parse_datetime(value, kind))
+            elif kind == CATEGORY:
+                codes = self._codes[name]
+                if value is None:
+                    code = -1
+                else:
+                    code = codes.setdefault(value, len(codes))
+                self._data[name].append(code)
+            else:
+                self._data[name].append(value)
+
+    def extend(self, results: Iterable[Dict]) -> "ColumnBuilder":
+        for result in results:
+            self.append(result)
+        return self
+
+    def build(self) -> Columns:
+        categories = {name: list(codes) for name, codes in self._codes.items()}
+        return Columns(self.schema, self._data, categories)
+
+
+async def _to_columns_async(results: AsyncGenerator, schema: Schema) -> Columns:
+    builder = ColumnBuilder(schema)
+    async for result in results:
+        builder.append(result)
+    return builder.build()
+
+
+def to_columns(results: Any, schema: Schema) -> Any:
+    """
+    Consume `results` (e.g. what `.list()` returns) into `Columns`. For async
+    generators a coroutine is returned instead.
+    """
+    if inspect.isasyncgen(results):
+        return _to_columns_async(results, schema)
+    return ColumnBuilder(schema).extend(results).build()
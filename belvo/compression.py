@@ -0,0 +1,117 @@
+import gzip
+import importlib.util
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Content codings, from the most to the least preferred.
+PREFERENCE = ("zstd", "br", "gzip", "deflate")
+
+
+def requests_encodings() -> Tuple[str, ...]:
+    """
+    Content codings urllib3 can decode, which depends on the optional
+    `brotli` and `zstandard` packages being installed.
+    """
+    from urllib3.util.request import ACCEPT_ENCODING
+
+    return tuple(encoding.strip() for encoding in ACCEPT_ENCODING.split(","))
+
+
+def httpx_encodings() -> Tuple[str, ...]:
+    """
+    Content codings httpx can decode: gzip and deflate, plus br when `brotli`
+    (or `brotlicffi`) is installed and, since httpx 0.27, zstd when `zstandard`
+    is installed.
+    """
+    import httpx
+
+    encodings = ["gzip", "deflate"]
+    if _installed("brotli") or _installed("brotlicffi"):
+        encodings.append("br")
+    version = tuple(int(part) for part in httpx.__version__.split(".")[:2])
+    if version >= (0, 27) and _installed("zstandard"):
+        encodings.append("zstd")
+    return tuple(encodings)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+class TransferStats:
+    """
+    Bytes sent and received before (`raw`) and after (`wire`) compression.
+    """
+
+    def __init__(self) -> None:
+        self._bytes: Dict[str, List[int]] = {"request": [0, 0], "response": [0, 0]}
+        self._lock = threading.Lock()
+
+    def record(self, direction: str, raw: int, wire: int) -> None:
+        with self._lock:
+            counts = self._bytes[direction]
+            counts[0] += raw
+            counts[1] += wire
+
+    def raw_bytes(self, direction: str = "response") -> int:
+        with self._lock:
+            return self._bytes[direction][0]
+
+    def wire_bytes(self, direction: str = "response") -> int:
+        with self._lock:
+            return self._bytes[direction][1]
+
+    def ratio(self, direction: str = "response") -> float:
+        """
+        Wire bytes per raw byte, e.g. 0.2 when compression saved 80% of the transfer.
+        """
+        with self._lock:
+            raw, wire = self._bytes[direction]
+        return wire / raw if raw else 1.0
+
+
+class Compression:
+    """
+    Compression settings of a session.
+
+    Responses can be compressed with any of `encodings` (by default, every
+    coding the HTTP client can decode, e.g. zstd and br when `zstandard` and
+    `brotli` are installed), and are decompressed while being read.
+
+    With `compress_requests`, request bodies of at least `min_size` bytes (e.g.
+    links created with certificates) are sent gzipped; only enable it if the
+    server accepts compressed bodies.
+
+    Raw and wire byte counts are kept in `stats`.
+    """
+
+    def __init__(
+        self,
+        *,
+        encodings: Optional[Sequence[str]] = None,
+        compress_requests: bool = False,
+        min_size: int = 1024,
+        level: int = 6,
+    ) -> None:
+        self.encodings = encodings
+        self.compress_requests = compress_requests
+        self.min_size = min_size
+        self.level = level
+        self.stats = TransferStats()
+
+    def accept_encoding(self, supported: Iterable[str]) -> str:
+        """
+        Return the `Accept-Encoding` header for an HTTP client able to decode
+        the `supported` codings.
+        """
+        supported = set(supported)
+        wanted = self.encodings if self.encodings is not None else PREFERENCE
+        return ", ".join(encoding for encoding in wanted if encoding in supported) or "identity"
+
+    def compress(self, body: bytes) -> Tuple[bytes, Optional[str]]:
+        """
+        Return the body to send and its content coding, if it was compressed.
+        """
+        if not self.compress_requests or len(body) < self.min_size:
+            return body, None
+        return gzip.compress(body, self.level), "gzip"
@@ -0,0 +1,67 @@
+import time
+from typing import Callable, Dict, Optional, Tuple, Union
+
+# A timeout, in seconds, for both connecting and reading, or `(connect, read)`.
+RequestTimeout = Union[None, float, Tuple[Optional[float], Optional[float]]]
+
+
+class Timeouts:
+    """
+    Connect and read timeouts of requests, in seconds, with `endpoints` giving
+    some endpoints timeouts of their own, e.g. `{"/api/transactions/": (3.05, 60)}`.
+    `None` means no timeout.
+    """
+
+    def __init__(
+        self,
+        connect: Optional[float] = 3.05,
+        read: Optional[float] = 30.0,
+        *,
+        endpoints: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    ) -> None:
+        self.connect = connect
+        self.read = read
+        self.endpoints = endpoints or {}
+
+    def for_endpoint(self, endpoint: str) -> Tuple[Optional[float], Optional[float]]:
+        return self.endpoints.get(endpoint, (self.connect, self.read))
+
+
+class Deadline:
+    """
+    Time budget of a call, shared by every request (and retry) it makes.
+    """
+
+    __slots__ = ("budget", "expires_at", "_clock")
+
+    def __init__(self, budget: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if budget <= 0:
+            raise ValueError("deadline must be greater than 0")
+
+        self.budget = budget
+        self.expires_at = clock() + budget
+        self._clock = clock
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def limit(self, timeout: RequestTimeout) -> RequestTimeout:
+        """
+        Return `timeout`, lowered so that requests don't outlive the deadline.
+        """
+        remaining = self.remaining()
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return (
+                remaining if connect is None else min(connect, remaining),
+                remaining if read is None else min(read, remaining),
+            )
+        return remaining if timeout is None else min(timeout, remaining)
+
+
+def start_deadline(seconds: Optional[float]) -> Optional[Deadline]:
+    return Deadline(seconds) if seconds is not None else None
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, List, Optional, Tuple
 
 
 class BelvoAPIException(Exception):
@@ -6,6 +6,67 @@ class BelvoAPIException(Exception):
 
 
 class RequestError(BelvoAPIException):
-    def __init__(self, status_code: int, detail: Any):
+    def __init__(self, status_code: Optional[int], detail: Any):
         self.status_code = status_code
         self.detail = detail
+
+
+class CircuitOpenError(BelvoAPIException):
+    """
+    Raised instead of making a request to a circuit (usually an endpoint) that
+    is failing, see `belvo.circuit.CircuitBreaker`.
+    """
+
+    def __init__(self, circuit: Any, retry_after: float):
+        super().__init__(f"Circuit {circuit} is open, retry in {retry_after:.1f}s.")
+        self.circuit = circuit
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(BelvoAPIException):
+    """
+    Raised when a call runs out of its deadline. For `list()` calls, `pages`
+    and `results` tell how many pages and results were received before.
+    """
+
+    def __init__(
+        self,
+        deadline: float,
+        endpoint: str,
+        pages: Optional[int] = None,
+        results: Optional[int] = None,
+    ):
+        super().__init__(deadline, endpoint)
+        self.deadline = deadline
+        self.endpoint = endpoint
+        self.pages = pages
+        self.results = results
+
+    def __str__(self) -> str:
+        message = f"Deadline of {self.deadline:g}s exceeded for {self.endpoint}"
+        if self.pages is not None:
+            message += f" after {self.pages} pages and {self.results} results"
+        return message + "."
+
+
+class PartialResultError(RequestError):
+    """
+    Raised by `create()` calls split into date windows when some windows kept
+    failing. `results` holds the merged results of the windows that succeeded,
+    `failed` the `(date_from, date_to)` windows that failed and `errors` the
+    error of each of them. `status_code` and `detail` are the ones of the first
+    failed window, when it failed with an error response.
+    """
+
+    def __init__(
+        self, results: List[Any], failed: List[Tuple[str, str]], errors: List[BaseException]
+    ):
+        first = errors[0]
+        super().__init__(getattr(first, "status_code", None), getattr(first, "detail", None))
+        self.results = results
+        self.failed = failed
+        self.errors = errors
+
+    def __str__(self) -> str:
+        windows = ", ".join(f"{date_from}..{date_to}" for date_from, date_to in self.failed)
+        return f"{len(self.failed)} windows failed: {windows}."
@@ -1,23 +1,227 @@
+import asyncio
+import hashlib
 import logging
-from typing import Dict, Generator, List, Union
+import math
+import os
+import socket
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from itertools import count
+from typing import (
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Deque,
+    Dict,
+    Generator,
+    Hashable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-from requests import HTTPError, Session
+from requests import HTTPError, Response, Session
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, RequestException, Timeout
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import NewConnectionError
 
 from belvo import __version__
-from belvo.exceptions import RequestError
+from belvo.attachments import AttachmentDecoder, AttachmentSink, as_sink
+from belvo.cache import CacheEntry, ResponseCache
+from belvo.circuit import CircuitBreaker
+from belvo.codec import JSONCodec, default_codec
+from belvo.compression import Compression, httpx_encodings, requests_encodings
+from belvo.deadline import Deadline, RequestTimeout, Timeouts, start_deadline
+from belvo.exceptions import BelvoAPIException, CircuitOpenError, DeadlineExceeded, RequestError
+from belvo.metrics import MetricsRegistry
+from belvo.ratelimit import RateLimiter
+from belvo.retry import RetryPolicy
+from belvo.singleflight import AsyncSingleFlight, SingleFlight
+from belvo.streaming import PageDecoder
+from belvo.tracing import Span, Tracer
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = f"belvo-python ({__version__})"
+STREAM_CHUNK_SIZE = 64 * 1024
+# Timeout of GET and DELETE requests, in seconds, when the session has no `timeouts`.
+DEFAULT_TIMEOUT = 5
+
+# A directory, or a sink, to write base64 encoded attachments (e.g. PDFs) to.
+Attachments = Union[str, "os.PathLike[str]", AttachmentSink]
+# Events hooks can be added for, see `BaseAPISession.add_hook()`.
+HOOK_EVENTS = ("before_request", "after_response", "on_error", "on_page")
+
+
+class PoolAdapter(HTTPAdapter):
+    """
+    `HTTPAdapter` that can also enable TCP keep-alive probes on pooled
+    connections, so idle connections to Belvo API are not silently dropped by
+    NATs or load balancers and can be reused instead of opening new ones.
+
+    An instance can be shared by several sessions (see `APISession(adapter=...)`)
+    so they all draw connections from the same pool.
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["_socket_options"]
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOLSIZE,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        pool_block: bool = DEFAULT_POOLBLOCK,
+        *,
+        keepalive_idle: Optional[int] = None,
+        keepalive_interval: Optional[int] = None,
+    ) -> None:
+        self._socket_options: List = []
+        if keepalive_idle is not None or keepalive_interval is not None:
+            self._socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            if keepalive_idle is not None and hasattr(socket, "TCP_KEEPIDLE"):
+                self._socket_options.append(
+                    (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepalive_idle)  # type: ignore
+                )
+            if keepalive_interval is not None and hasattr(socket, "TCP_KEEPINTVL"):
+                self._socket_options.append(
+                    (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, keepalive_interval)  # type: ignore
+                )
+
+        super().__init__(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block
+        )
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        if self._socket_options:
+            kwargs["socket_options"] = HTTPConnection.default_socket_options + self._socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+
+def endpoint_of(url: str, base_url: Optional[str] = None) -> str:
+    """
+    Return the resource endpoint a URL belongs to, e.g. `/api/transactions/`
+    for both `{base_url}/api/transactions/` and `{base_url}/api/transactions/<id>/?page=2`.
+    """
+    if base_url and url.startswith(base_url):
+        url = url.replace(base_url, "", 1)
+    segments = [segment for segment in urlsplit(url).path.split("/") if segment]
+    return "/{}/".format("/".join(segments[:2])) if segments else "/"
+
+
+def _request_was_sent(exc: Exception) -> bool:
+    if isinstance(exc, ConnectTimeout):
+        return False
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return not isinstance(reason, NewConnectionError)
+
+
+def _content_length(r: Any) -> Optional[int]:
+    try:
+        return int(r.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _wire_bytes(r: Response) -> int:
+    """
+    Return how many bytes of the body of `r` were received, before decompression.
+    """
+    try:
+        return int(r.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        return len(r.content)
+
+
+def _with_headers(kwargs: Dict, headers: Dict[str, str]) -> Dict:
+    if not headers:
+        return kwargs
+    return {**kwargs, "headers": {**(kwargs.get("headers") or {}), **headers}}
+
+
+@contextmanager
+def _no_span() -> Iterator[None]:
+    yield None
+
+
+class Pagination:
+    """
+    Progress of one `list()` call.
+    """
+
+    __slots__ = ("endpoint", "pages", "results")
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.pages = 0
+        self.results = 0
+
+
+def _remaining_page_urls(data: Dict) -> Optional[List[str]]:
+    """
+    Build the URLs of every page after the first one requested, using the
+    `count` of its response and the `page` query parameter of its `next` link.
+
+    Returns `None` when they can not be known in advance, in that case pages have
+    to be requested one after the other by following `next`.
+    """
+    next_url, count, results = data.get("next"), data.get("count"), data.get("results")
+    if not next_url or not count or not results:
+        return None
+
+    parts = urlsplit(next_url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    try:
+        next_page = int(dict(query)["page"])
+    except (KeyError, ValueError):
+        return None
+
+    # The listing may not have started on the first page, e.g. with `page=3`.
+    total_pages = math.ceil(count / len(results))
+    urls = []
+    for page in range(next_page, total_pages + 1):
+        page_query = [(key, str(page) if key == "page" else value) for key, value in query]
+        urls.append(urlunsplit(parts._replace(query=urlencode(page_query))))
+    return urls
+
+
+class BaseAPISession:
+    """
+    State and helpers shared by `APISession` and `AsyncAPISession`, which only
+    differ in how requests are sent.
+    """
 
-class APISession:
     _secret_key_id: str
     _secret_key_password: str
     _url: str
-
-    def __init__(self, url: str) -> None:
-        self._url = url
-        self._session = Session()
-        self._session.headers.update({"User-Agent": f"belvo-python ({__version__})"})
+    _session: Any
+    _rate_limiter: Optional[RateLimiter]
+    _cache: Optional[ResponseCache]
+    _flights: Union[SingleFlight, AsyncSingleFlight, None] = None
+    _circuit_breaker: Optional[CircuitBreaker] = None
+    _timeouts: Optional[Timeouts] = None
+    _codec: JSONCodec
+    _compression: Optional[Compression] = None
+    _metrics: Optional[MetricsRegistry] = None
+    _tracer: Optional[Tracer] = None
+    _hooks: Dict[str, List[Callable]]
+    # Whether the credentials are known to be valid, only `False` between a
+    # lazy login and the first response from Belvo API.
+    _authenticated: bool = True
+    # Digest of the credentials, which cached and coalesced responses are keyed on.
+    _credentials_key: str = ""
 
     @property
     def url(self) -> Union[str, None]:
@@ -28,58 +232,695 @@ class APISession:
         return self._secret_key_id
 
     @property
-    def session(self) -> Session:
-        return self._session
+    def headers(self) -> Dict:
+        return self._session.headers  # type: ignore
 
     @property
-    def headers(self) -> Dict:
-        return self.session.headers  # type: ignore
+    def cache(self) -> Optional[ResponseCache]:
+        return self._cache
 
-    def login(self, secret_key_id: str, secret_key_password: str, timeout: int = 5) -> bool:
-        base_url = "{}/api/".format(self.url)
+    @property
+    def codec(self) -> JSONCodec:
+        return self._codec
+
+    def _decode(self, content: bytes) -> Any:
+        return self._codec.loads(content)
+
+    def _attachment_decoder(self, attachments: Attachments) -> AttachmentDecoder:
+        return AttachmentDecoder(as_sink(attachments), loads=self._decode)
+
+    def _with_body(self, url: str, field: str, data: Any, kwargs: Dict) -> Dict:
+        """
+        Return `kwargs` plus `data` encoded (and compressed, if enabled) as the
+        body of the request, in the `field` the HTTP client expects it.
+        """
+        headers = {"Content-Type": self._codec.content_type, **(kwargs.get("headers") or {})}
+        body = self._codec.dumps(data)
+        raw = len(body)
+        if self._compression is not None:
+            body, encoding = self._compression.compress(body)
+            if encoding is not None:
+                headers["Content-Encoding"] = encoding
+        if self._tracks_transfers:
+            self._record_transfer("request", url, raw, len(body))
+        return {**kwargs, field: body, "headers": headers}
+
+    @property
+    def compression(self) -> Optional[Compression]:
+        return self._compression
+
+    @property
+    def _tracks_transfers(self) -> bool:
+        return self._compression is not None or self._metrics is not None
+
+    def _record_transfer(self, direction: str, url: str, raw: int, wire: int) -> None:
+        if self._compression is not None:
+            self._compression.stats.record(direction, raw, wire)
+        if self._metrics is not None:
+            self._metrics.observe_transfer(direction, endpoint_of(url, self.url), raw, wire)
+
+    @property
+    def metrics(self) -> Optional[MetricsRegistry]:
+        return self._metrics
+
+    def _observe_request(
+        self,
+        method: str,
+        url: str,
+        status: Union[int, str],
+        started: float,
+        request_bytes: Optional[int] = None,
+        response_bytes: Optional[int] = None,
+    ) -> None:
+        if self._metrics is None:
+            return
+        self._metrics.observe_request(
+            method,
+            endpoint_of(url, self.url),
+            str(status),
+            time.perf_counter() - started,
+            request_bytes,
+            response_bytes,
+        )
+
+    def _observe_pagination(self, pagination: Pagination) -> None:
+        if self._metrics is not None:
+            self._metrics.observe_pages(pagination.endpoint, pagination.pages)
+
+    @property
+    def tracer(self) -> Optional[Tracer]:
+        return self._tracer
+
+    def _set_hooks(self, hooks: Optional[Dict[str, List[Callable]]]) -> None:
+        self._hooks = {event: [] for event in HOOK_EVENTS}
+        for event, event_hooks in (hooks or {}).items():
+            for hook in event_hooks:
+                self.add_hook(event, hook)
+
+    def add_hook(self, event: str, hook: Callable) -> None:
+        """
+        Call `hook` on `event`, one of:
+
+        * `before_request(method, url, headers)`: before sending every request
+          (retries included), `headers` can be updated to send more headers.
+        * `after_response(method, url, response, elapsed)`: once a response is
+          received, `elapsed` seconds after sending the request.
+        * `on_error(method, url, exception)`: when no response was received.
+        * `on_page(endpoint, number, page)`: for every page of `list()` (without
+          its `results` when streaming).
+        """
+        if event not in HOOK_EVENTS:
+            raise ValueError(f"event must be one of {HOOK_EVENTS}")
+        self._hooks[event].append(hook)
+
+    def _run_hooks(self, event: str, *args: Any) -> None:
+        for hook in self._hooks[event]:
+            hook(*args)
+
+    def _span(
+        self, name: str, url: str, *, link: str = None, parent: Optional[Span] = None, **attributes
+    ) -> ContextManager[Optional[Span]]:
+        if self._tracer is None:
+            return _no_span()
+        attributes["belvo.endpoint"] = endpoint_of(url, self.url)
+        if link:
+            attributes["belvo.link"] = link
+        return self._tracer.span(name, parent=parent, **attributes)
+
+    def _start_request(
+        self, method: str, url: str, attempt: int, parent: Optional[Span]
+    ) -> Tuple[Optional[Span], Dict[str, str]]:
+        """
+        Start the span of a request and return it with the headers to send.
+        """
+        span, headers = None, {}
+        if self._tracer is not None:
+            span = self._tracer.start_span(
+                "belvo.http",
+                parent=parent,
+                attributes={
+                    "http.method": method,
+                    "http.url": url,
+                    "belvo.endpoint": endpoint_of(url, self.url),
+                    "belvo.attempt": attempt,
+                },
+            )
+            headers["traceparent"] = span.traceparent
+        self._run_hooks("before_request", method, url, headers)
+        return span, headers
+
+    def _finish_request(
+        self,
+        method: str,
+        url: str,
+        started: float,
+        span: Optional[Span],
+        r: Any = None,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """
+        Run the `on_error` hooks, or the `after_response` ones, and end the span
+        of the request even if a hook raises.
+        """
+        try:
+            if error is not None:
+                self._run_hooks("on_error", method, url, error)
+                return
+
+            if span is not None and r is not None:
+                span.set_attribute("http.status_code", r.status_code)
+            self._run_hooks("after_response", method, url, r, time.perf_counter() - started)
+        finally:
+            if span is not None:
+                span.end(error=error)
+
+    def _start_page_span(self, url: str, number: int) -> Optional[Span]:
+        if self._tracer is None:
+            return None
+        return self._tracer.start_span(
+            "belvo.page",
+            attributes={"belvo.endpoint": endpoint_of(url, self.url), "belvo.page": number},
+        )
+
+    def _page_received(self, pagination: Pagination, page: Dict) -> None:
+        pagination.pages += 1
+        self._run_hooks("on_page", pagination.endpoint, pagination.pages, page)
+
+    def _circuit_of(self, url: str, payload: Optional[Mapping]) -> Optional[Hashable]:
+        if self._circuit_breaker is None:
+            return None
+        if self._circuit_breaker.key is not None:
+            # Following pages of a list only have their filters in the URL.
+            payload = {**dict(parse_qsl(urlsplit(url).query)), **(payload or {})}
+        return self._circuit_breaker.circuit(endpoint_of(url, self.url), payload)
+
+    def _check_circuit(self, method: str, url: str, circuit: Optional[Hashable]) -> None:
+        if circuit is None:
+            return
+        try:
+            self._circuit_breaker.before_request(circuit)  # type: ignore
+        except CircuitOpenError as exc:
+            self._observe_request(method, url, type(exc).__name__, time.perf_counter())
+            raise
+
+    def _record_circuit(
+        self, circuit: Optional[Hashable], started: float, status: Optional[int] = None
+    ) -> None:
+        if circuit is not None:
+            elapsed = time.perf_counter() - started
+            self._circuit_breaker.after_request(circuit, elapsed, status)  # type: ignore
+
+    def _timeout(
+        self, method: str, url: str, timeout: RequestTimeout, deadline: Optional[Deadline]
+    ) -> RequestTimeout:
+        if timeout is None:
+            if self._timeouts is not None:
+                timeout = self._timeouts.for_endpoint(endpoint_of(url, self.url))
+            elif method in ("GET", "DELETE"):
+                timeout = DEFAULT_TIMEOUT
+        if deadline is not None:
+            timeout = deadline.limit(timeout)
+        return timeout
+
+    def _check_deadline(self, url: str, deadline: Optional[Deadline], wait: float = 0.0) -> None:
+        """
+        Raise `DeadlineExceeded` if `deadline` expires within `wait` seconds.
+        """
+        if deadline is not None and deadline.remaining() <= wait:
+            raise DeadlineExceeded(deadline.budget, endpoint_of(url, self.url))
+
+    def _throttle_delay(self, url: str) -> float:
+        if self._rate_limiter is None:
+            return 0.0
+        key_id = getattr(self, "_secret_key_id", "")
+        return self._rate_limiter.reserve(key_id, endpoint_of(url, self.url))
+
+    def _set_credentials(self, secret_key_id: str, secret_key_password: str) -> None:
         self._secret_key_id = secret_key_id
         self._secret_key_password = secret_key_password
+        self._credentials_key = hashlib.sha256(
+            f"{secret_key_id}:{secret_key_password}".encode()
+        ).hexdigest()
         self._session.auth = (secret_key_id, secret_key_password)
+        self._authenticated = False
 
-        try:
-            r = self.session.get(base_url, timeout=timeout)
-            r.raise_for_status()
-        except HTTPError:
-            return False
+    def _check_authentication(self, status_code: int) -> None:
+        if self._authenticated:
+            return
+        if status_code == 401:
+            raise BelvoAPIException("Login failed.")
+        self._authenticated = True
+
+    def _request_key(self, url: str, params: Optional[Dict]) -> Hashable:
+        # Identifies GET requests with the same URL, query string and credentials.
+        query = tuple(sorted((key, str(value)) for key, value in (params or {}).items()))
+        return (self._credentials_key, url, query)
+
+    def _cache_lookup(
+        self, url: str, params: Optional[Dict]
+    ) -> Tuple[Optional[Hashable], Optional[CacheEntry]]:
+        if self._cache is None or self._cache.ttl_for(endpoint_of(url, self.url)) is None:
+            return None, None
+
+        key = self._request_key(url, params)
+        return key, self._cache.get(key)
+
+    @property
+    def coalesced(self) -> int:
+        """
+        Number of GET requests that shared the response of an identical one.
+        """
+        return self._flights.shared if self._flights is not None else 0
+
+    def _cache_store(self, key: Optional[Hashable], url: str, r: Any) -> None:
+        if self._cache is None or key is None:
+            return
+
+        endpoint = endpoint_of(url, self.url)
+        ttl = self._cache.ttl_for(endpoint) or 0
+        entry = CacheEntry(
+            endpoint,
+            r.content,
+            expires_at=time.monotonic() + ttl,
+            etag=r.headers.get("ETag"),
+            last_modified=r.headers.get("Last-Modified"),
+        )
+        self._cache.set(key, entry)
+
+    def _invalidate_cache(self, method: str, url: str, status_code: int) -> None:
+        # Writes to an endpoint make its cached responses outdated.
+        if self._cache is not None and method != "GET" and status_code < 400:
+            self._cache.invalidate(endpoint_of(url, self.url))
+
+
+class APISession(BaseAPISession):
+    _flights: Optional[SingleFlight] = None
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        pool_connections: int = DEFAULT_POOLSIZE,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        pool_block: bool = DEFAULT_POOLBLOCK,
+        keepalive_idle: Optional[int] = None,
+        keepalive_interval: Optional[int] = None,
+        adapter: Optional[HTTPAdapter] = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        hooks: Optional[Dict[str, List[Callable]]] = None,
+        tracer: Optional[Tracer] = None,
+        codec: Optional[JSONCodec] = None,
+        compression: Optional[Compression] = None,
+        coalesce: bool = False,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeouts: Optional[Timeouts] = None,
+    ) -> None:
+        """
+        `pool_maxsize` is the maximum number of connections kept per host (set it
+        to the number of threads sharing this session) and `pool_block` makes
+        threads wait for a free connection instead of opening throwaway ones.
+        `pool_connections` is the number of per-host pools to cache.
+
+        Pass an `adapter` (e.g. a `PoolAdapter`) to share one connection pool
+        between several sessions, in that case pool settings are ignored.
+
+        Give a `retry` policy to retry requests failing with a network error or
+        a retryable status (429, 5xx), each page of `list()` is retried on its own.
+
+        A `rate_limiter` makes requests wait so they stay under the given number
+        of requests per second per secret key.
+
+        A `cache` keeps responses of GET requests to the endpoints it has a TTL for.
+
+        Requests, their latency and sizes, and pages of `list()` calls are recorded
+        in `metrics` when given.
+
+        `hooks` maps events to the callables to call on them (see `add_hook()`).
+        With a `tracer`, login, requests, pages of `list()`, creations and resumes
+        are traced, and the trace context is sent in a `traceparent` header.
+
+        Bodies are encoded and decoded with `codec`, which defaults to orjson when
+        it is installed and to the standard `json` module otherwise.
+
+        `compression` advertises every content coding the session can decode,
+        can compress large request bodies and counts raw and wire bytes.
+
+        With `coalesce`, identical GET requests (same URL, query string and
+        credentials) made while one is in flight wait for it and share its
+        response instead of being sent again.
+
+        A `circuit_breaker` fails requests to failing or slow endpoints with a
+        `CircuitOpenError` instead of making them, until they recover.
+
+        `timeouts` sets the connect and read timeouts of requests, by endpoint.
+        Without it, GET and DELETE requests time out after 5 seconds and others
+        never do.
+        """
+        self._url = url
+        self._retry = retry
+        self._rate_limiter = rate_limiter
+        self._cache = cache
+        self._metrics = metrics
+        self._tracer = tracer
+        self._codec = codec or default_codec()
+        self._compression = compression
+        self._flights = SingleFlight() if coalesce else None
+        self._circuit_breaker = circuit_breaker
+        self._timeouts = timeouts
+        self._set_hooks(hooks)
+        self._session = Session()
+        self._session.headers.update({"User-Agent": USER_AGENT})
+        if compression is not None:
+            self._session.headers["Accept-Encoding"] = compression.accept_encoding(
+                requests_encodings()
+            )
+
+        if adapter is None:
+            adapter = PoolAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                keepalive_idle=keepalive_idle,
+                keepalive_interval=keepalive_interval,
+            )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    @property
+    def session(self) -> Session:
+        return self._session
+
+    def login(
+        self,
+        secret_key_id: str,
+        secret_key_password: str,
+        timeout: RequestTimeout = None,
+        *,
+        lazy: bool = False,
+    ) -> bool:
+        """
+        Set the credentials of the session and validate them against Belvo API.
+
+        When `lazy` is `True` no request is made: credentials are validated by the
+        first request made with them (or by calling `verify()`), which raises a
+        `BelvoAPIException` if they are rejected.
+        """
+        self._set_credentials(secret_key_id, secret_key_password)
+        if lazy:
+            return True
+        return self.verify(timeout=timeout)
+
+    def verify(self, timeout: RequestTimeout = None) -> bool:
+        base_url = "{}/api/".format(self.url)
+        with self._span("belvo.login", base_url):
+            try:
+                r = self._request("GET", base_url, timeout=timeout)
+                r.raise_for_status()
+            except (HTTPError, BelvoAPIException):
+                return False
         return True
 
-    def _get(self, url: str, params: Dict = None, timeout: int = 5) -> Dict:
+    def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        parent: Optional[Span] = None,
+        payload: Optional[Mapping] = None,
+        deadline: Optional[Deadline] = None,
+        timeout: RequestTimeout = None,
+        **kwargs,
+    ) -> Response:
+        circuit = self._circuit_of(url, payload)
+        attempt = 1
+        while True:
+            self._check_circuit(method, url, circuit)
+            wait = self._throttle_delay(url)
+            if wait:
+                self._check_deadline(url, deadline, wait)
+                time.sleep(wait)
+            self._check_deadline(url, deadline)
+
+            span, headers = self._start_request(method, url, attempt, parent)
+            request_timeout = self._timeout(method, url, timeout, deadline)
+            if request_timeout is not None:
+                kwargs["timeout"] = request_timeout
+            started = time.perf_counter()
+            try:
+                r = getattr(self.session, method.lower())(url=url, **_with_headers(kwargs, headers))
+            except RequestException as exc:
+                self._record_circuit(circuit, started)
+                self._observe_request(method, url, type(exc).__name__, started)
+                self._finish_request(method, url, started, span, error=exc)
+                if deadline is not None and deadline.expired:
+                    raise DeadlineExceeded(deadline.budget, endpoint_of(url, self.url)) from exc
+                if (
+                    not isinstance(exc, (ConnectionError, Timeout))
+                    or self._retry is None
+                    or not self._retry.should_retry(
+                        method, attempt, request_sent=_request_was_sent(exc)
+                    )
+                ):
+                    raise
+                delay = self._retry.delay(attempt)
+                logger.info("%s %s failed (%s), retrying in %.2fs", method, url, exc, delay)
+            except Exception as exc:
+                # Not raised by the HTTP client itself, e.g. by a transport adapter.
+                self._finish_request(method, url, started, span, error=exc)
+                raise
+            else:
+                self._record_circuit(circuit, started, r.status_code)
+                if self._metrics is not None:
+                    body = r.request.body if r.request is not None else None
+                    self._observe_request(
+                        method,
+                        url,
+                        r.status_code,
+                        started,
+                        len(body) if body else 0,
+                        _content_length(r) if kwargs.get("stream") else len(r.content),
+                    )
+                if self._tracks_transfers and not kwargs.get("stream"):
+                    self._record_transfer("response", url, len(r.content), _wire_bytes(r))
+                self._finish_request(method, url, started, span, r)
+                self._check_authentication(r.status_code)
+                if self._retry is None or not self._retry.should_retry(
+                    method, attempt, status=r.status_code
+                ):
+                    self._invalidate_cache(method, url, r.status_code)
+                    return r
+                delay = self._retry.delay(attempt, r.headers.get("Retry-After"))
+                logger.info(
+                    "%s %s returned %s, retrying in %.2fs", method, url, r.status_code, delay
+                )
+                r.close()
+
+            self._check_deadline(url, deadline, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _get(
+        self,
+        url: str,
+        params: Dict = None,
+        timeout: RequestTimeout = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict:
         if params is None:
             params = {}
 
-        r = self.session.get(url=url, params=params, timeout=timeout)
+        cache_key, cached = self._cache_lookup(url, params)
+        if cached is not None and cached.is_fresh:
+            return self._decode(cached.content)
+
+        def fetch() -> bytes:
+            return self._fetch(url, params, timeout, cache_key, cached, deadline)
+
+        if self._flights is None:
+            return self._decode(fetch())
+        # Every caller decodes the shared body, so they don't share mutable results.
+        return self._decode(self._flights.do(self._request_key(url, params), fetch))
+
+    def _fetch(
+        self,
+        url: str,
+        params: Dict,
+        timeout: RequestTimeout,
+        cache_key: Optional[Hashable],
+        cached: Optional[CacheEntry],
+        deadline: Optional[Deadline] = None,
+    ) -> bytes:
+        kwargs: Dict[str, Any] = {}
+        if cached is not None and cached.validators():
+            kwargs["headers"] = cached.validators()
+
+        r = self._request(
+            "GET",
+            url,
+            params=params,
+            payload=params,
+            timeout=timeout,
+            deadline=deadline,
+            **kwargs,
+        )
+        if cached is not None and r.status_code == 304:
+            self._cache.refresh(cached)  # type: ignore
+            return cached.content
+
         r.raise_for_status()
-        return r.json()
+        self._cache_store(cache_key, url, r)
+        return r.content
 
-    def get(self, endpoint: str, id: str, params: Dict = None) -> Dict:
+    def get(
+        self, endpoint: str, id: str, params: Dict = None, *, deadline: Optional[float] = None
+    ) -> Dict:
         url = "{}{}{}/".format(self.url, endpoint, id)
-        return self._get(url=url, params=params)
+        return self._get(url=url, params=params, deadline=start_deadline(deadline))
 
     def put(
-        self, endpoint: str, id: str, data: Dict, raise_exception: bool = False, **kwargs
+        self,
+        endpoint: str,
+        id: str,
+        data: Dict,
+        raise_exception: bool = False,
+        *,
+        deadline: Optional[float] = None,
+        **kwargs,
     ) -> Union[List[Dict], Dict]:
         url = "{}{}{}/".format(self.url, endpoint, id)
-        r = self.session.put(url=url, json=data, **kwargs)
+        with self._span("belvo.update", url, link=data.get("link")):
+            r = self._request(
+                "PUT",
+                url,
+                payload=data,
+                deadline=start_deadline(deadline),
+                **self._with_body(url, "data", data, kwargs),
+            )
 
-        if raise_exception:
-            try:
-                r.raise_for_status()
-            except HTTPError:
-                raise RequestError(r.status_code, r.json())
+            if raise_exception:
+                try:
+                    r.raise_for_status()
+                except HTTPError:
+                    raise RequestError(r.status_code, self._decode(r.content))
+
+        return self._decode(r.content)
+
+    def list(
+        self,
+        endpoint: str,
+        params: Dict = None,
+        *,
+        prefetch: int = 0,
+        stream: bool = False,
+        deadline: Optional[float] = None,
+    ) -> Generator:
+        """
+        Yield the results of every page of `endpoint`.
 
-        return r.json()
+        With `prefetch`, up to that many pages are requested in background threads
+        while the current one is consumed. With `stream`, each page is decoded
+        while it is downloaded and results are yielded one by one, so memory is
+        bounded by a single result instead of a whole page.
 
-    def list(self, endpoint: str, params: Dict = None) -> Generator:
+        With a `deadline`, in seconds, requesting (and retrying) pages stops with
+        a `DeadlineExceeded` telling how many were received once it's over.
+        """
         url = "{}{}".format(self.url, endpoint)
+        if stream and prefetch > 0:
+            raise ValueError("`prefetch` can not be used together with `stream`.")
+
+        pagination = Pagination(endpoint)
+        budget = start_deadline(deadline)
+        try:
+            if stream:
+                for result in self._stream_results(url, params, pagination, budget):
+                    pagination.results += 1
+                    yield result
+                return
+
+            if prefetch > 0:
+                pages = self._prefetch_pages(url, params, prefetch, budget)
+            else:
+                pages = self._pages(url, params, budget)
+
+            for data in pages:
+                self._page_received(pagination, data)
+                for result in data["results"]:
+                    pagination.results += 1
+                    yield result
+        except DeadlineExceeded as exc:
+            exc.pages, exc.results = pagination.pages, pagination.results
+            raise
+        finally:
+            self._observe_pagination(pagination)
+
+    def _stream_results(
+        self,
+        url: str,
+        params: Optional[Dict],
+        pagination: Pagination,
+        deadline: Optional[Deadline] = None,
+    ) -> Generator:
         while True:
-            data = self._get(url, params=params)
-            for result in data["results"]:
-                yield result
+            # The span of a streamed page can not be the current one, as it stays
+            # open while results are yielded.
+            span = self._start_page_span(url, pagination.pages + 1)
+            try:
+                r = self._request(
+                    "GET",
+                    url,
+                    params=params or {},
+                    payload=params,
+                    deadline=deadline,
+                    stream=True,
+                    parent=span,
+                )
+                with closing(r):
+                    r.raise_for_status()
+                    decoder = PageDecoder()
+                    raw = 0
+                    for chunk in r.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                        raw += len(chunk)
+                        yield from decoder.feed(chunk)
+                    page = decoder.close()
+                    if self._tracks_transfers:
+                        self._record_transfer("response", url, raw, _wire_bytes(r))
+            except Exception as exc:
+                if span is not None:
+                    span.end(error=exc)
+                raise
+            finally:
+                if span is not None:
+                    span.end()
+            self._page_received(pagination, page)
+
+            if not page.get("next"):
+                break
+
+            url = page["next"]
+            params = None
+
+    def _get_page(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        number: int = 1,
+        parent: Span = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict:
+        attributes: Dict[str, Any] = {"belvo.page": number}
+        with self._span("belvo.page", url, parent=parent, **attributes):
+            return self._get(url, params=params, deadline=deadline)
+
+    def _pages(
+        self, url: str, params: Optional[Dict], deadline: Optional[Deadline] = None
+    ) -> Generator:
+        for number in count(1):
+            data = self._get_page(url, params, number, deadline=deadline)
+            yield data
 
             if not data["next"]:
                 break
@@ -87,39 +928,652 @@ class APISession:
             url = data["next"]
             params = None
 
+    def _prefetch_pages(
+        self,
+        url: str,
+        params: Optional[Dict],
+        prefetch: int,
+        deadline: Optional[Deadline] = None,
+    ) -> Generator:
+        """
+        Same as `_pages`, but up to `prefetch` pages are requested in background
+        threads while the current one is being consumed. Pages are always
+        yielded in order.
+        """
+        executor = ThreadPoolExecutor(max_workers=prefetch)
+        pending: Deque = deque()
+        # Worker threads do not see the current span, so it is given to them.
+        parent = self._tracer.current() if self._tracer is not None else None
+        numbers = count(2)
+        try:
+            data = self._get_page(url, params, deadline=deadline)
+            page_urls = _remaining_page_urls(data)
+
+            if page_urls is None:
+                # Only the next page is known, so we can stay one page ahead.
+                while True:
+                    if data["next"]:
+                        pending.append(
+                            executor.submit(
+                                self._get_page, data["next"], None, next(numbers), parent, deadline
+                            )
+                        )
+                    yield data
+
+                    if not pending:
+                        break
+                    data = pending.popleft().result()
+                return
+
+            urls = iter(page_urls)
+            for next_url in urls:
+                pending.append(
+                    executor.submit(self._get_page, next_url, None, next(numbers), parent, deadline)
+                )
+                if len(pending) == prefetch:
+                    break
+            yield data
+
+            while pending:
+                data = pending.popleft().result()
+                page_url = next(urls, None)
+                if page_url is not None:
+                    pending.append(
+                        executor.submit(
+                            self._get_page, page_url, None, next(numbers), parent, deadline
+                        )
+                    )
+                yield data
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
     def post(
-        self, endpoint: str, data: Dict, raise_exception: bool = False, *args, **kwargs
+        self,
+        endpoint: str,
+        data: Dict,
+        raise_exception: bool = False,
+        *args,
+        attachments: Optional[Attachments] = None,
+        deadline: Optional[float] = None,
+        **kwargs,
     ) -> Union[List, Dict]:
+        """
+        With `attachments`, the base64 encoded documents of the response (e.g.
+        when creating statements with `attach_pdf=True`) are decoded to that
+        directory, or `AttachmentSink`, while it's being received, and replaced
+        by the path of their file.
+
+        A `deadline`, in seconds, bounds the time spent on the request and its
+        retries, which raise `DeadlineExceeded` once it's over.
+        """
         url = "{}{}".format(self.url, endpoint)
-        r = self.session.post(url, json=data, **kwargs)
+        if attachments is not None:
+            kwargs["stream"] = True
+        with self._span("belvo.create", url, link=data.get("link")):
+            r = self._request(
+                "POST",
+                url,
+                payload=data,
+                deadline=start_deadline(deadline),
+                **self._with_body(url, "data", data, kwargs),
+            )
 
-        if raise_exception:
-            try:
-                r.raise_for_status()
-            except HTTPError:
-                raise RequestError(r.status_code, r.json())
+            if raise_exception:
+                try:
+                    r.raise_for_status()
+                except HTTPError:
+                    raise RequestError(r.status_code, self._decode(r.content))
 
-        return r.json()
+        return self._read(r, attachments)
 
     def patch(
-        self, endpoint: str, data: Dict, raise_exception: bool = False, **kwargs
+        self,
+        endpoint: str,
+        data: Dict,
+        raise_exception: bool = False,
+        *,
+        attachments: Optional[Attachments] = None,
+        deadline: Optional[float] = None,
+        **kwargs,
     ) -> Union[List[Dict], Dict]:
         url = "{}{}".format(self.url, endpoint)
-        r = self.session.patch(url=url, json=data, **kwargs)
+        if attachments is not None:
+            kwargs["stream"] = True
+        with self._span("belvo.resume", url, link=data.get("link")):
+            r = self._request(
+                "PATCH",
+                url,
+                payload=data,
+                deadline=start_deadline(deadline),
+                **self._with_body(url, "data", data, kwargs),
+            )
 
-        if raise_exception:
-            try:
-                r.raise_for_status()
-            except HTTPError:
-                raise RequestError(r.status_code, r.json())
+            if raise_exception:
+                try:
+                    r.raise_for_status()
+                except HTTPError:
+                    raise RequestError(r.status_code, self._decode(r.content))
+
+        return self._read(r, attachments)
 
-        return r.json()
+    def _read(self, r: Response, attachments: Optional[Attachments]) -> Any:
+        if attachments is None:
+            return self._decode(r.content)
 
-    def delete(self, endpoint: str, id: str, timeout: int = 5) -> bool:
+        decoder = self._attachment_decoder(attachments)
+        with closing(r):
+            try:
+                for chunk in r.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    decoder.feed(chunk)
+            except BaseException:
+                decoder.abort()
+                raise
+        return decoder.close()
+
+    def delete(self, endpoint: str, id: str, timeout: RequestTimeout = None) -> bool:
         url = "{}{}{}/".format(self.url, endpoint, id)
-        r = self.session.delete(url, timeout=timeout)
+        r = self._request("DELETE", url, timeout=timeout)
         try:
             r.raise_for_status()
         except HTTPError:
             return False
         return True
+
+
+class AsyncAPISession(BaseAPISession):
+    """
+    Non-blocking counterpart of `APISession` built on top of `httpx.AsyncClient`.
+
+    It exposes the same methods, but every one of them is a coroutine (and
+    `list()` is an async generator), so the resources bound to it become
+    awaitable without any change.
+    """
+
+    _flights: Optional[AsyncSingleFlight] = None
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        pool_maxsize: int = 100,
+        keepalive_maxsize: int = 20,
+        keepalive_expiry: Optional[float] = 5.0,
+        transport: Any = None,
+        retry: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        hooks: Optional[Dict[str, List[Callable]]] = None,
+        tracer: Optional[Tracer] = None,
+        codec: Optional[JSONCodec] = None,
+        compression: Optional[Compression] = None,
+        coalesce: bool = False,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        timeouts: Optional[Timeouts] = None,
+    ) -> None:
+        """
+        `pool_maxsize` bounds the number of concurrent connections, of which up
+        to `keepalive_maxsize` are kept open for `keepalive_expiry` seconds once
+        idle. Pass a shared `transport` to use one pool for several sessions.
+        `retry`, `rate_limiter`, `cache`, `metrics`, `hooks`, `tracer`, `codec`,
+        `compression`, `coalesce`, `circuit_breaker` and `timeouts` work as in
+        `APISession`.
+        """
+        if httpx is None:
+            raise BelvoAPIException(
+                "AsyncAPISession requires httpx, install it with `pip install belvo-python[async]`."
+            )
+
+        self._url = url
+        self._retry = retry
+        self._rate_limiter = rate_limiter
+        self._cache = cache
+        self._metrics = metrics
+        self._tracer = tracer
+        self._codec = codec or default_codec()
+        self._compression = compression
+        self._flights = AsyncSingleFlight() if coalesce else None
+        self._circuit_breaker = circuit_breaker
+        self._timeouts = timeouts
+        self._set_hooks(hooks)
+        headers = {"User-Agent": USER_AGENT}
+        if compression is not None:
+            headers["Accept-Encoding"] = compression.accept_encoding(httpx_encodings())
+        self._session = httpx.AsyncClient(
+            headers=headers,
+            timeout=None,
+            limits=httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=keepalive_maxsize,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            transport=transport,
+        )
+
+    @property
+    def session(self) -> "httpx.AsyncClient":
+        return self._session
+
+    async def close(self) -> None:
+        await self._session.aclose()
+
+    async def login(
+        self,
+        secret_key_id: str,
+        secret_key_password: str,
+        timeout: RequestTimeout = None,
+        *,
+        lazy: bool = False,
+    ) -> bool:
+        self._set_credentials(secret_key_id, secret_key_password)
+        if lazy:
+            return True
+        return await self.verify(timeout=timeout)
+
+    async def verify(self, timeout: RequestTimeout = None) -> bool:
+        base_url = "{}/api/".format(self.url)
+        with self._span("belvo.login", base_url):
+            try:
+                r = await self._request("GET", base_url, timeout=timeout)
+            except BelvoAPIException:
+                return False
+        return not r.is_error
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        *,
+        stream: bool = False,
+        parent: Optional[Span] = None,
+        payload: Optional[Mapping] = None,
+        deadline: Optional[Deadline] = None,
+        timeout: RequestTimeout = None,
+        **kwargs,
+    ) -> "httpx.Response":
+        circuit = self._circuit_of(url, payload)
+        attempt = 1
+        while True:
+            self._check_circuit(method, url, circuit)
+            wait = self._throttle_delay(url)
+            if wait:
+                self._check_deadline(url, deadline, wait)
+                await asyncio.sleep(wait)
+            self._check_deadline(url, deadline)
+
+            span, headers = self._start_request(method, url, attempt, parent)
+            request_timeout = self._timeout(method, url, timeout, deadline)
+            if isinstance(request_timeout, tuple):
+                connect, read = request_timeout
+                kwargs["timeout"] = httpx.Timeout(read, connect=connect)
+            elif request_timeout is not None:
+                kwargs["timeout"] = request_timeout
+            started = time.perf_counter()
+            try:
+                request = self.session.build_request(method, url, **_with_headers(kwargs, headers))
+                r = await self.session.send(request, stream=stream)
+            except httpx.RequestError as exc:
+                self._record_circuit(circuit, started)
+                self._observe_request(method, url, type(exc).__name__, started)
+                self._finish_request(method, url, started, span, error=exc)
+                if deadline is not None and deadline.expired:
+                    raise DeadlineExceeded(deadline.budget, endpoint_of(url, self.url)) from exc
+                request_sent = not isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout))
+                if (
+                    not isinstance(exc, httpx.TransportError)
+                    or self._retry is None
+                    or not self._retry.should_retry(method, attempt, request_sent=request_sent)
+                ):
+                    raise
+                delay = self._retry.delay(attempt)
+                logger.info("%s %s failed (%s), retrying in %.2fs", method, url, exc, delay)
+            except Exception as exc:
+                # Not raised by the HTTP client itself, e.g. by a transport adapter.
+                self._finish_request(method, url, started, span, error=exc)
+                raise
+            else:
+                self._record_circuit(circuit, started, r.status_code)
+                self._observe_request(
+                    method,
+                    url,
+                    r.status_code,
+                    started,
+                    len(request.content),
+                    _content_length(r) if stream else len(r.content),
+                )
+                if self._tracks_transfers and not stream:
+                    self._record_transfer("response", url, len(r.content), r.num_bytes_downloaded)
+                self._finish_request(method, url, started, span, r)
+                self._check_authentication(r.status_code)
+                if self._retry is None or not self._retry.should_retry(
+                    method, attempt, status=r.status_code
+                ):
+                    self._invalidate_cache(method, url, r.status_code)
+                    return r
+                delay = self._retry.delay(attempt, r.headers.get("Retry-After"))
+                logger.info(
+                    "%s %s returned %s, retrying in %.2fs", method, url, r.status_code, delay
+                )
+                await r.aclose()
+
+            self._check_deadline(url, deadline, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get(
+        self,
+        url: str,
+        params: Dict = None,
+        timeout: RequestTimeout = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict:
+        cache_key, cached = self._cache_lookup(url, params)
+        if cached is not None and cached.is_fresh:
+            return self._decode(cached.content)
+
+        def fetch() -> Awaitable[bytes]:
+            return self._fetch(url, params, timeout, cache_key, cached, deadline)
+
+        if self._flights is None:
+            return self._decode(await fetch())
+        return self._decode(await self._flights.do(self._request_key(url, params), fetch))
+
+    async def _fetch(
+        self,
+        url: str,
+        params: Optional[Dict],
+        timeout: RequestTimeout,
+        cache_key: Optional[Hashable],
+        cached: Optional[CacheEntry],
+        deadline: Optional[Deadline] = None,
+    ) -> bytes:
+        headers = cached.validators() if cached is not None else None
+
+        # Unlike `requests`, httpx replaces the query string of the URL when
+        # `params` is given, even if empty, which would break `next` links.
+        r = await self._request(
+            "GET",
+            url,
+            params=params or None,
+            payload=params,
+            timeout=timeout,
+            deadline=deadline,
+            headers=headers or None,
+        )
+        if cached is not None and r.status_code == 304:
+            self._cache.refresh(cached)  # type: ignore
+            return cached.content
+
+        r.raise_for_status()
+        self._cache_store(cache_key, url, r)
+        return r.content
+
+    async def get(
+        self, endpoint: str, id: str, params: Dict = None, *, deadline: Optional[float] = None
+    ) -> Dict:
+        url = "{}{}{}/".format(self.url, endpoint, id)
+        return await self._get(url=url, params=params, deadline=start_deadline(deadline))
+
+    async def put(
+        self,
+        endpoint: str,
+        id: str,
+        data: Dict,
+        raise_exception: bool = False,
+        *,
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> Union[List[Dict], Dict]:
+        url = "{}{}{}/".format(self.url, endpoint, id)
+        with self._span("belvo.update", url, link=data.get("link")):
+            r = await self._request(
+                "PUT",
+                url,
+                payload=data,
+                deadline=start_deadline(deadline),
+                **self._with_body(url, "content", data, kwargs),
+            )
+
+            if raise_exception and r.is_error:
+                raise RequestError(r.status_code, self._decode(r.content))
+
+        return self._decode(r.content)
+
+    async def list(
+        self,
+        endpoint: str,
+        params: Dict = None,
+        *,
+        prefetch: int = 0,
+        stream: bool = False,
+        deadline: Optional[float] = None,
+    ) -> AsyncGenerator:
+        url = "{}{}".format(self.url, endpoint)
+        if stream and prefetch > 0:
+            raise ValueError("`prefetch` can not be used together with `stream`.")
+
+        pagination = Pagination(endpoint)
+        budget = start_deadline(deadline)
+        try:
+            if stream:
+                async for result in self._stream_results(url, params, pagination, budget):
+                    pagination.results += 1
+                    yield result
+                return
+
+            if prefetch > 0:
+                pages = self._prefetch_pages(url, params, prefetch, budget)
+            else:
+                pages = self._pages(url, params, budget)
+
+            async for data in pages:
+                self._page_received(pagination, data)
+                for result in data["results"]:
+                    pagination.results += 1
+                    yield result
+        except DeadlineExceeded as exc:
+            exc.pages, exc.results = pagination.pages, pagination.results
+            raise
+        finally:
+            self._observe_pagination(pagination)
+
+    async def _stream_results(
+        self,
+        url: str,
+        params: Optional[Dict],
+        pagination: Pagination,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncGenerator:
+        while True:
+            span = self._start_page_span(url, pagination.pages + 1)
+            try:
+                r = await self._request(
+                    "GET",
+                    url,
+                    params=params or None,
+                    payload=params,
+                    deadline=deadline,
+                    stream=True,
+                    parent=span,
+                )
+                try:
+                    r.raise_for_status()
+                    decoder = PageDecoder()
+                    raw = 0
+                    async for chunk in r.aiter_bytes(STREAM_CHUNK_SIZE):
+                        raw += len(chunk)
+                        for result in decoder.feed(chunk):
+                            yield result
+                    page = decoder.close()
+                    if self._tracks_transfers:
+                        self._record_transfer("response", url, raw, r.num_bytes_downloaded)
+                finally:
+                    await r.aclose()
+            except Exception as exc:
+                if span is not None:
+                    span.end(error=exc)
+                raise
+            finally:
+                if span is not None:
+                    span.end()
+            self._page_received(pagination, page)
+
+            if not page.get("next"):
+                break
+
+            url = page["next"]
+            params = None
+
+    async def _get_page(
+        self,
+        url: str,
+        params: Optional[Dict] = None,
+        number: int = 1,
+        parent: Span = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Dict:
+        attributes: Dict[str, Any] = {"belvo.page": number}
+        with self._span("belvo.page", url, parent=parent, **attributes):
+            return await self._get(url, params=params, deadline=deadline)
+
+    async def _pages(
+        self, url: str, params: Optional[Dict], deadline: Optional[Deadline] = None
+    ) -> AsyncGenerator:
+        for number in count(1):
+            data = await self._get_page(url, params, number, deadline=deadline)
+            yield data
+
+            if not data["next"]:
+                break
+
+            url = data["next"]
+            params = None
+
+    async def _prefetch_pages(
+        self,
+        url: str,
+        params: Optional[Dict],
+        prefetch: int,
+        deadline: Optional[Deadline] = None,
+    ) -> AsyncGenerator:
+        pending: Deque = deque()
+        numbers = count(2)
+        try:
+            data = await self._get_page(url, params, deadline=deadline)
+            page_urls = _remaining_page_urls(data)
+
+            if page_urls is None:
+                while True:
+                    if data["next"]:
+                        pending.append(
+                            asyncio.ensure_future(
+                                self._get_page(data["next"], None, next(numbers), deadline=deadline)
+                            )
+                        )
+                    yield data
+
+                    if not pending:
+                        break
+                    data = await pending.popleft()
+                return
+
+            urls = iter(page_urls)
+            for next_url in urls:
+                pending.append(
+                    asyncio.ensure_future(
+                        self._get_page(next_url, None, next(numbers), deadline=deadline)
+                    )
+                )
+                if len(pending) == prefetch:
+                    break
+            yield data
+
+            while pending:
+                data = await pending.popleft()
+                page_url = next(urls, None)
+                if page_url is not None:
+                    pending.append(
+                        asyncio.ensure_future(
+                            self._get_page(page_url, None, next(numbers), deadline=deadline)
+                        )
+                    )
+                yield data
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def post(
+        self,
+        endpoint: str,
+        data: Dict,
+        raise_exception: bool = False,
+        *args,
+        attachments: Optional[Attachments] = None,
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> Union[List, Dict]:
+        url = "{}{}".format(self.url, endpoint)
+        if attachments is not None:
+            kwargs["stream"] = True
+        with self._span("belvo.create", url, link=data.get("link")):
+            r = await self._request(
+                "POST",
+                url,
+                payload=data,
+                deadline=start_deadline(deadline),
+                **self._with_body(url, "content", data, kwargs),
+            )
+
+            if raise_exception and r.is_error:
+                raise RequestError(r.status_code, self._decode(await r.aread()))
+
+        return await self._read(r, attachments)
+
+    async def patch(
+        self,
+        endpoint: str,
+        data: Dict,
+        raise_exception: bool = False,
+        *,
+        attachments: Optional[Attachments] = None,
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> Union[List[Dict], Dict]:
+        url = "{}{}".format(self.url, endpoint)
+        if attachments is not None:
+            kwargs["stream"] = True
+        with self._span("belvo.resume", url, link=data.get("link")):
+            r = await self._request(
+                "PATCH",
+                url,
+                payload=data,
+                deadline=start_deadline(deadline),
+                **self._with_body(url, "content", data, kwargs),
+            )
+
+            if raise_exception and r.is_error:
+                raise RequestError(r.status_code, self._decode(await r.aread()))
+
+        return await self._read(r, attachments)
+
+    async def _read(self, r: "httpx.Response", attachments: Optional[Attachments]) -> Any:
+        if attachments is None:
+            return self._decode(r.content)
+
+        decoder = self._attachment_decoder(attachments)
+        try:
+            async for chunk in r.aiter_bytes(STREAM_CHUNK_SIZE):
+                decoder.feed(chunk)
+        except BaseException:
+            decoder.abort()
+            raise
+        finally:
+            await r.aclose()
+        return decoder.close()
+
+    async def delete(self, endpoint: str, id: str, timeout: RequestTimeout = None) -> bool:
+        url = "{}{}{}/".format(self.url, endpoint, id)
+        r = await self._request("DELETE", url, timeout=timeout)
+        return not r.is_error
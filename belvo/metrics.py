@@ -0,0 +1,221 @@
+import logging
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets, in seconds and bytes.
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+PAGE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+COUNTER = "counter"
+HISTOGRAM = "histogram"
+
+# Name: (type, help, buckets).
+METRICS: Dict[str, Tuple[str, str, str]] = {
+    "belvo_requests_total": (COUNTER, "Requests sent to Belvo API.", ""),
+    "belvo_request_duration_seconds": (
+        HISTOGRAM,
+        "Time until Belvo API responded (or the request failed).",
+        "latency",
+    ),
+    "belvo_request_size_bytes": (HISTOGRAM, "Size of request bodies.", "size"),
+    "belvo_response_size_bytes": (HISTOGRAM, "Size of response bodies.", "size"),
+    "belvo_list_pages": (HISTOGRAM, "Pages requested by each list() call.", "pages"),
+    "belvo_raw_bytes_total": (COUNTER, "Bytes of bodies before compression.", ""),
+    "belvo_wire_bytes_total": (COUNTER, "Bytes of bodies as transferred, once compressed.", ""),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+# Called with the name, labels and value of every observation.
+Sink = Callable[[str, Dict[str, str], float], None]
+
+
+class Histogram:
+    """
+    Number of observations per bucket (not cumulative), plus their count and sum.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        `(le, count)` pairs as exported to Prometheus, ending with `+Inf`.
+        """
+        buckets, total = [], 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else _number(bound), total))
+        return buckets
+
+
+class MetricsRegistry:
+    """
+    In-process metrics of the requests made by a session: counters per method,
+    endpoint and status, histograms of latencies, body sizes and pages per
+    `list()` call. Every observation is also forwarded to the `sinks`.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_buckets: Sequence[float] = LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = SIZE_BUCKETS,
+        page_buckets: Sequence[float] = PAGE_BUCKETS,
+        sinks: Iterable[Sink] = (),
+    ) -> None:
+        self._buckets = {"latency": latency_buckets, "size": size_buckets, "pages": page_buckets}
+        self._sinks = list(sinks)
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def add_sink(self, sink: Sink) -> None:
+        self._sinks.append(sink)
+
+    def inc(self, name: str, labels: Dict[str, str], value: float = 1) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._emit(name, labels, value)
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(self._buckets[METRICS[name][2]])
+                self._histograms[key] = histogram
+            histogram.observe(value)
+        self._emit(name, labels, value)
+
+    def observe_request(
+        self,
+        method: str,
+        endpoint: str,
+        status: str,
+        elapsed: float,
+        request_bytes: Optional[int] = None,
+        response_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Record one request. `status` is the status code, or the name of the
+        exception when no response was received.
+        """
+        labels = {"method": method, "endpoint": endpoint}
+        self.inc("belvo_requests_total", {**labels, "status": str(status)})
+        self.observe("belvo_request_duration_seconds", labels, elapsed)
+        if request_bytes is not None:
+            self.observe("belvo_request_size_bytes", labels, request_bytes)
+        if response_bytes is not None:
+            self.observe("belvo_response_size_bytes", labels, response_bytes)
+
+    def observe_transfer(self, direction: str, endpoint: str, raw: int, wire: int) -> None:
+        """
+        Record the size of a request or response body before and after compression.
+        """
+        labels = {"direction": direction, "endpoint": endpoint}
+        self.inc("belvo_raw_bytes_total", labels, raw)
+        self.inc("belvo_wire_bytes_total", labels, wire)
+
+    def observe_pages(self, endpoint: str, pages: int) -> None:
+        self.observe("belvo_list_pages", {"endpoint": endpoint}, pages)
+
+    def counter(self, name: str, **labels: str) -> float:
+        with self._lock:
+            return self._counters.get((name, _labels(labels)), 0)
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get((name, _labels(labels)))
+
+    def collect(
+        self,
+    ) -> Tuple[Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], Histogram]]:
+        """
+        Return a copy of every counter and histogram, keyed by name and labels.
+        """
+        with self._lock:
+            histograms = {}
+            for key, histogram in self._histograms.items():
+                copy = Histogram(histogram.bounds)
+                copy.counts, copy.count, copy.sum = (
+                    list(histogram.counts),
+                    histogram.count,
+                    histogram.sum,
+                )
+                histograms[key] = copy
+            return dict(self._counters), histograms
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _emit(self, name: str, labels: Dict[str, str], value: float) -> None:
+        for sink in self._sinks:
+            try:
+                sink(name, labels, value)
+            except Exception:
+                logger.exception("Metrics sink %r failed", sink)
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, *extra: Tuple[str, str]) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def to_prometheus(registry: MetricsRegistry) -> str:
+    """
+    Export `registry` in the Prometheus text exposition format.
+    """
+    counters, histograms = registry.collect()
+    lines = []
+    for name, (kind, description, _) in METRICS.items():
+        if kind == COUNTER:
+            samples = sorted(item for item in counters.items() if item[0][0] == name)
+            if not samples:
+                continue
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+            for (_, labels), value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+        else:
+            observed = sorted(
+                (item for item in histograms.items() if item[0][0] == name), key=lambda i: i[0]
+            )
+            if not observed:
+                continue
+            lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+            for (_, labels), histogram in observed:
+                for le, count in histogram.cumulative():
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', le))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_number(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n" if lines else ""
@@ -0,0 +1,241 @@
+import inspect
+import sys
+from typing import Any, AsyncGenerator, Dict, FrozenSet, Iterable, Iterator, Tuple, Type, TypeVar
+
+RecordT = TypeVar("RecordT", bound="Record")
+
+
+class Record:
+    """
+    Compact, typed alternative to the dictionaries returned by Belvo API.
+
+    Known fields are stored in `__slots__`, so records don't carry a `__dict__`
+    nor a copy of every key, and low-cardinality strings (currencies, types,
+    categories...) are interned so all records share the same string objects.
+    Unknown keys are kept apart, so `to_dict()` always returns exactly the
+    dictionary the record was built from.
+
+    Fields that were not present in the response read as `None`.
+    """
+
+    __slots__ = ("_extra",)
+
+    # Fields whose values are interned.
+    _interned: Iterable[str] = frozenset()
+    # Filled in by `__init_subclass__` from the `__slots__` of the class.
+    _fields: Tuple[str, ...] = ()
+    _field_set: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._fields = tuple(
+            field
+            for klass in reversed(cls.__mro__)
+            for field in klass.__dict__.get("__slots__", ())
+            if field != "_extra"
+        )
+        cls._field_set = frozenset(cls._fields)
+        cls._interned = frozenset(cls._interned)
+
+    @classmethod
+    def from_dict(cls: Type[RecordT], data: Dict[str, Any]) -> RecordT:
+        record = cls.__new__(cls)
+        record._load(data)
+        return record
+
+    def _load(self, data: Dict[str, Any]) -> None:
+        extra = None
+        for key, value in data.items():
+            if key in self._interned and isinstance(value, str):
+                value = sys.intern(value)
+            if key in self._field_set:
+                object.__setattr__(self, key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        object.__setattr__(self, "_extra", extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for field in self._fields:
+            try:
+                data[field] = object.__getattribute__(self, field)
+            except AttributeError:
+                continue
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called when a slot has not been set or the attribute is unknown.
+        if name in type(self)._field_set:
+            return None
+        if name != "_extra" and self._extra and name in self._extra:
+            return self._extra[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Record):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return "{}(id={!r})".format(type(self).__name__, self.id)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._load(state)
+
+
+class Account(Record):
+    __slots__ = (
+        "id",
+        "link",
+        "institution",
+        "collected_at",
+        "created_at",
+        "category",
+        "type",
+        "name",
+        "number",
+        "balance",
+        "currency",
+        "bank_product_id",
+        "internal_identification",
+        "public_identification_name",
+        "public_identification_value",
+        "last_accessed_at",
+        "credit_data",
+        "loan_data",
+        "funds_data",
+        "receivables_data",
+    )
+    _interned = ("category", "type", "currency", "public_identification_name")
+
+
+class Transaction(Record):
+    __slots__ = (
+        "id",
+        "account",
+        "collected_at",
+        "created_at",
+        "value_date",
+        "accounting_date",
+        "amount",
+        "balance",
+        "currency",
+        "description",
+        "observations",
+        "merchant",
+        "category",
+        "subcategory",
+        "reference",
+        "type",
+        "status",
+        "internal_identification",
+        "credit_card_data",
+    )
+    _interned = ("currency", "category", "subcategory", "type", "status")
+
+
+class Balance(Record):
+    __slots__ = (
+        "id",
+        "account",
+        "collected_at",
+        "created_at",
+        "value_date",
+        "balance",
+        "current_balance",
+        "currency",
+    )
+    _interned = ("currency",)
+
+
+class Invoice(Record):
+    __slots__ = (
+        "id",
+        "link",
+        "collected_at",
+        "created_at",
+        "invoice_identification",
+        "invoice_date",
+        "status",
+        "invoice_type",
+        "type",
+        "sender_id",
+        "sender_name",
+        "receiver_id",
+        "receiver_name",
+        "cancelation_status",
+        "cancelation_update_date",
+        "certification_date",
+        "certification_authority",
+        "payment_type",
+        "payment_method",
+        "usage",
+        "version",
+        "place_of_issue",
+        "invoice_details",
+        "currency",
+        "subtotal_amount",
+        "exchange_rate",
+        "tax_amount",
+        "discount_amount",
+        "total_amount",
+        "xml",
+    )
+    _interned = ("status", "invoice_type", "type", "payment_type", "payment_method", "currency")
+
+
+class Owner(Record):
+    __slots__ = (
+        "id",
+        "link",
+        "collected_at",
+        "created_at",
+        "display_name",
+        "first_name",
+        "last_name",
+        "second_last_name",
+        "email",
+        "phone_number",
+        "address",
+        "internal_identification",
+    )
+
+
+class Income(Record):
+    __slots__ = ("id", "account", "collected_at", "created_at", "currency", "sources")
+    _interned = ("currency",)
+
+
+def as_records(record_class: Type[RecordT], results: Iterable[Dict[str, Any]]) -> Iterator[RecordT]:
+    for result in results:
+        yield record_class.from_dict(result)
+
+
+async def _as_records_async(record_class: Type[RecordT], results: AsyncGenerator) -> AsyncGenerator:
+    async for result in results:
+        yield record_class.from_dict(result)
+
+
+async def _as_record_async(record_class: Type[RecordT], result: Any) -> RecordT:
+    return record_class.from_dict(await result)
+
+
+def to_records(record_class: Type[RecordT], results: Any) -> Any:
+    """
+    Convert what a session returned (a dictionary, an iterable of them, or their
+    asynchronous counterparts) into records of `record_class`.
+    """
+    if inspect.isasyncgen(results):
+        return _as_records_async(record_class, results)
+    if inspect.isawaitable(results):
+        return _as_record_async(record_class, results)
+    if isinstance(results, dict):
+        return record_class.from_dict(results)
+    return as_records(record_class, results)
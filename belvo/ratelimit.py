@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+# A bucket state is the number of available tokens and when it was computed.
+BucketState = Tuple[float, float]
+
+# A bucket to take a token from: its name, rate and burst.
+Bucket = Tuple[str, float, float]
+
+
+def take_token(
+    state: Optional[BucketState], now: float, rate: float, burst: float
+) -> Tuple[BucketState, float]:
+    """
+    Take one token from a bucket refilled at `rate` tokens per second that
+    holds up to `burst` tokens. Returns the new state of the bucket and how many
+    seconds the caller has to wait before using the token.
+
+    Tokens are reserved even if they are not available yet (the bucket goes
+    negative), so concurrent callers queue up instead of racing each other.
+    """
+    tokens, updated_at = state if state is not None else (burst, now)
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate) - 1
+    wait = -tokens / rate if tokens < 0 else 0.0
+    return (tokens, now), wait
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the number of requests per second made with the same
+    secret key. `endpoint_rates` gives some endpoints (e.g.
+    `{"/api/transactions/": 2}`) a bucket of their own, with bursts of up to
+    `endpoint_bursts` requests, on top of the one of the secret key: their
+    requests take a token from both.
+
+    Subclasses define where buckets are stored.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        *,
+        endpoint_rates: Optional[Dict[str, float]] = None,
+        endpoint_bursts: Optional[Dict[str, float]] = None,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.endpoint_rates = endpoint_rates or {}
+        self.endpoint_bursts = endpoint_bursts or {}
+
+    def reserve(self, key_id: str, endpoint: str) -> float:
+        """
+        Reserve a token to make a request to `endpoint` with `key_id` and return
+        the number of seconds to wait before making it.
+        """
+        buckets = [(key_id, self.rate, self.burst)]
+        if endpoint in self.endpoint_rates:
+            rate = self.endpoint_rates[endpoint]
+            burst = self.endpoint_bursts.get(endpoint, max(1.0, rate))
+            buckets.append((f"{key_id}:{endpoint}", rate, burst))
+        return self._reserve(buckets)
+
+    def _reserve(self, buckets: List[Bucket]) -> float:
+        """
+        Take a token from every bucket at once and return the longest wait.
+        """
+        raise NotImplementedError()
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """
+    Rate limiter for all the threads (and clients) of one process.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._buckets: Dict[str, BucketState] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, buckets: List[Bucket]) -> float:
+        wait = 0.0
+        with self._lock:
+            now = time.monotonic()
+            for bucket, rate, burst in buckets:
+                self._buckets[bucket], bucket_wait = take_token(
+                    self._buckets.get(bucket), now, rate, burst
+                )
+                wait = max(wait, bucket_wait)
+        return wait
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    Rate limiter for several processes running on the same host. Buckets are
+    stored as JSON in `path`, which is locked with `flock` while being updated.
+    """
+
+    def __init__(self, path: str, *args, **kwargs) -> None:
+        if fcntl is None:  # pragma: no cover
+            raise RuntimeError("FileRateLimiter is only available on POSIX systems.")
+
+        super().__init__(*args, **kwargs)
+        self.path = path
+
+    def _reserve(self, buckets: List[Bucket]) -> float:
+        wait = 0.0
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+") as fp:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            try:
+                try:
+                    states = json.loads(fp.read() or "{}")
+                except ValueError:
+                    states = {}
+
+                now = time.time()
+                for bucket, rate, burst in buckets:
+                    states[bucket], bucket_wait = take_token(states.get(bucket), now, rate, burst)
+                    wait = max(wait, bucket_wait)
+
+                fp.seek(0)
+                fp.truncate()
+                fp.write(json.dumps(states))
+                fp.flush()
+            finally:
+                fcntl.flock(fp, fcntl.LOCK_UN)
+        return wait
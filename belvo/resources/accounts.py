@@ -1,10 +1,25 @@
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Union
 
+from belvo.columnar import CATEGORY, DATETIME, FLOAT, STRING
+from belvo.models import Account
 from belvo.resources.base import Resource
 
 
 class Accounts(Resource):
     endpoint = "/api/accounts/"
+    record_class = Account
+    columns = {
+        "id": STRING,
+        "link": STRING,
+        "institution.name": CATEGORY,
+        "category": CATEGORY,
+        "type": CATEGORY,
+        "name": STRING,
+        "currency": CATEGORY,
+        "balance.current": FLOAT,
+        "balance.available": FLOAT,
+        "collected_at": DATETIME,
+    }
 
     def create(
         self,
@@ -13,7 +28,7 @@ class Accounts(Resource):
         token: str = None,
         save_data: bool = True,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Union[List[Dict], Dict]:
 
         data = {"link": link, "save_data": save_data}
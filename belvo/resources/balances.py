@@ -1,11 +1,24 @@
 from datetime import date
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Union
 
+from belvo.columnar import CATEGORY, DATE, DATETIME, FLOAT, STRING
+from belvo.models import Balance
 from belvo.resources.base import Resource
+from belvo.utils import date_windows
 
 
 class Balances(Resource):
     endpoint = "/api/balances/"
+    record_class = Balance
+    columns = {
+        "id": STRING,
+        "account.id": STRING,
+        "value_date": DATE,
+        "collected_at": DATETIME,
+        "balance": FLOAT,
+        "current_balance": FLOAT,
+        "currency": CATEGORY,
+    }
 
     def create(
         self,
@@ -17,11 +30,29 @@ class Balances(Resource):
         token: str = None,
         save_data: bool = True,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        window: Union[str, int] = None,
+        concurrency: int = 4,
+        window_attempts: int = 3,
+        window_backoff: float = 1.0,
+        **kwargs: Any,
     ) -> Union[List[Dict], Dict]:
 
         date_to = date_to or date.today().isoformat()
 
+        if window:
+            return self._create_in_windows(
+                date_windows(date_from, date_to, window),
+                concurrency=concurrency,
+                window_attempts=window_attempts,
+                window_backoff=window_backoff,
+                raise_exception=raise_exception,
+                link=link,
+                account=account,
+                token=token,
+                save_data=save_data,
+                **kwargs,
+            )
+
         data = {"link": link, "date_from": date_from, "date_to": date_to, "save_data": save_data}
 
         if account:
@@ -1,10 +1,84 @@
-from typing import Dict, Generator, List, Union
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, Generator, Iterable, List, Optional, Tuple, Type, Union
 
+from belvo.batch import BatchItem, BatchResult, run_batch, run_batch_async
+from belvo.columnar import Columns, Schema, to_columns
+from belvo.exceptions import PartialResultError, RequestError
 from belvo.http import APISession
+from belvo.models import Record, to_records
+from belvo.retry import RetryPolicy
+
+
+def _collect_windows(
+    batch: BatchResult, pending: List[int], results: Dict[int, Any], failed: Dict[int, BatchItem]
+) -> List[int]:
+    """
+    Record the outcome of each pending window and return the ones to retry.
+    """
+    for index, item in zip(pending, batch):
+        if item.ok:
+            results[index] = item.result
+            failed.pop(index, None)
+        else:
+            failed[index] = item
+    return [index for index in pending if index in failed]
+
+
+def _merge_windows(
+    windows: List[Tuple[str, str]],
+    results: Dict[int, Any],
+    failed: Dict[int, BatchItem],
+    raise_exception: bool,
+) -> List[Dict]:
+    """
+    Concatenate the results of every window, in date order, dropping records
+    whose id was already seen (e.g. returned by two adjacent windows).
+
+    If some windows failed, raise a `PartialResultError` with them, unless
+    `raise_exception` is `False` and they all failed with an error response: the
+    error payloads are then appended to the results, like `create()` returns
+    them for a single request.
+    """
+    merged = []
+    seen = set()
+    for index in sorted(results):
+        result = results[index]
+        for record in result if isinstance(result, list) else [result]:
+            id = record.get("id")
+            if id is not None:
+                if id in seen:
+                    continue
+                seen.add(id)
+            merged.append(record)
+
+    if not failed:
+        return merged
+
+    indexes = sorted(failed)
+    errors: List[BaseException] = [failed[index].error for index in indexes]  # type: ignore
+    if raise_exception or not all(isinstance(error, RequestError) for error in errors):
+        raise PartialResultError(merged, [windows[index] for index in indexes], errors) from errors[
+            0
+        ]
+
+    for error in errors:
+        detail = error.detail  # type: ignore
+        merged.extend(detail if isinstance(detail, list) else [detail])
+    return merged
+
+
+def _deadline(deadline: Optional[float]) -> Dict[str, float]:
+    # Only given when set, so sessions without deadlines keep working.
+    return {"deadline": deadline} if deadline is not None else {}
 
 
 class Resource:
     endpoint: str
+    record_class: Optional[Type[Record]] = None
+    # Default columns of `list_columnar()`.
+    columns: Optional[Schema] = None
 
     def __init__(self, session: APISession) -> None:
         self._session = session
@@ -13,12 +87,173 @@ class Resource:
     def session(self) -> APISession:
         return self._session
 
-    def list(self, **kwargs) -> Generator:
+    def _check_models(self, model: bool) -> None:
+        # Before making the request, which would be wasted otherwise.
+        if model and self.record_class is None:
+            raise ValueError(f"{type(self).__name__} results can not be returned as models.")
+
+    def _to_records(self, results):
+        return to_records(self.record_class, results)
+
+    def list(
+        self,
+        *,
+        prefetch: int = 0,
+        stream: bool = False,
+        model: bool = False,
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> Generator:
+        self._check_models(model)
         endpoint = self.endpoint
-        return self.session.list(endpoint, params=kwargs)
+        results = self.session.list(
+            endpoint, params=kwargs, prefetch=prefetch, stream=stream, **_deadline(deadline)
+        )
+        return self._to_records(results) if model else results
+
+    def list_columnar(
+        self,
+        *,
+        columns: Optional[Schema] = None,
+        prefetch: int = 0,
+        stream: bool = False,
+        deadline: Optional[float] = None,
+        **kwargs,
+    ) -> Columns:
+        """
+        Same as `list()`, but results are accumulated into typed column buffers
+        (see `belvo.columnar`) which can be turned into NumPy arrays, a pandas
+        DataFrame or an Arrow table.
+        """
+        columns = columns or self.columns
+        if columns is None:
+            raise ValueError(f"Columns are required to list {type(self).__name__} as columns.")
+
+        results = self.session.list(
+            self.endpoint, params=kwargs, prefetch=prefetch, stream=stream, **_deadline(deadline)
+        )
+        return to_columns(results, columns)
+
+    def create_many(
+        self,
+        calls: Iterable[Any],
+        *,
+        concurrency: int = 8,
+        ordered: bool = True,
+        on_result: Optional[Callable[[BatchItem], None]] = None,
+        raise_exception: bool = True,
+        **kwargs,
+    ) -> BatchResult:
+        """
+        Call `create()` once per item of `calls` (a dictionary of keyword
+        arguments, a tuple of positional arguments or a single argument such as a
+        link id) using up to `concurrency` workers. Extra keyword arguments are
+        given to every call.
+
+        By default every call raises on error responses, so failures are captured
+        in their `BatchItem` instead of being mixed with results.
+        """
+        create = getattr(self, "create", None)
+        if create is None:
+            raise ValueError(f"{type(self).__name__} can not be created.")
+
+        run = run_batch_async if inspect.iscoroutinefunction(self.session.post) else run_batch
+        return run(  # type: ignore
+            create,
+            calls,
+            concurrency=concurrency,
+            ordered=ordered,
+            on_result=on_result,
+            raise_exception=raise_exception,
+            **kwargs,
+        )
+
+    def _create_in_windows(
+        self,
+        windows: List[Tuple[str, str]],
+        *,
+        concurrency: int,
+        window_attempts: int,
+        window_backoff: float,
+        raise_exception: bool,
+        **kwargs,
+    ) -> List[Dict]:
+        """
+        Call `create()` once per `(date_from, date_to)` window, concurrently, and
+        merge the results. Failed windows are retried, after an exponential
+        backoff of `window_backoff` seconds, up to `window_attempts` times in
+        total without redoing the windows that succeeded. Windows that kept
+        failing raise a `PartialResultError` holding the results of the others,
+        see `_merge_windows()` for when `raise_exception` is `False`.
+        """
+        if inspect.iscoroutinefunction(self.session.post):
+            return self._create_in_windows_async(  # type: ignore
+                windows,
+                concurrency=concurrency,
+                window_attempts=window_attempts,
+                window_backoff=window_backoff,
+                raise_exception=raise_exception,
+                **kwargs,
+            )
+
+        policy = RetryPolicy(window_attempts, backoff_factor=window_backoff)
+        calls = [{"date_from": date_from, "date_to": date_to} for date_from, date_to in windows]
+        results: Dict[int, Any] = {}
+        failed: Dict[int, BatchItem] = {}
+        pending = list(range(len(calls)))
+        for attempt in range(1, window_attempts + 1):
+            if attempt > 1:
+                time.sleep(policy.delay(attempt - 1))
+            batch = run_batch(
+                self.create,  # type: ignore
+                [calls[index] for index in pending],
+                concurrency=concurrency,
+                raise_exception=True,
+                **kwargs,
+            )
+            pending = _collect_windows(batch, pending, results, failed)
+            if not pending:
+                break
+
+        return _merge_windows(windows, results, failed, raise_exception)
+
+    async def _create_in_windows_async(
+        self,
+        windows: List[Tuple[str, str]],
+        *,
+        concurrency: int,
+        window_attempts: int,
+        window_backoff: float,
+        raise_exception: bool,
+        **kwargs,
+    ) -> List[Dict]:
+        policy = RetryPolicy(window_attempts, backoff_factor=window_backoff)
+        calls = [{"date_from": date_from, "date_to": date_to} for date_from, date_to in windows]
+        results: Dict[int, Any] = {}
+        failed: Dict[int, BatchItem] = {}
+        pending = list(range(len(calls)))
+        for attempt in range(1, window_attempts + 1):
+            if attempt > 1:
+                await asyncio.sleep(policy.delay(attempt - 1))
+            batch = await run_batch_async(
+                self.create,  # type: ignore
+                [calls[index] for index in pending],
+                concurrency=concurrency,
+                raise_exception=True,
+                **kwargs,
+            )
+            pending = _collect_windows(batch, pending, results, failed)
+            if not pending:
+                break
+
+        return _merge_windows(windows, results, failed, raise_exception)
 
-    def get(self, id: str, **kwargs) -> Dict:
-        return self.session.get(self.endpoint, id, params=kwargs)
+    def get(
+        self, id: str, *, model: bool = False, deadline: Optional[float] = None, **kwargs
+    ) -> Dict:
+        self._check_models(model)
+        result = self.session.get(self.endpoint, id, params=kwargs, **_deadline(deadline))
+        return self._to_records(result) if model else result
 
     def delete(self, id: str) -> bool:
         return self.session.delete(self.endpoint, id)
@@ -1,10 +1,12 @@
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Union
 
+from belvo.models import Income
 from belvo.resources.base import Resource
 
 
 class Incomes(Resource):
     endpoint = "/api/incomes/"
+    record_class = Income
 
     def create(
         self,
@@ -13,7 +15,7 @@ class Incomes(Resource):
         token: str = None,
         save_data: bool = True,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Union[List[Dict], Dict]:
 
         data = {"link": link, "save_data": save_data}
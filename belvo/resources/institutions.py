@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Any, Dict
 
 from belvo.resources.base import Resource
 
@@ -16,6 +16,6 @@ class Institutions(Resource):
         *,
         link: str = None,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Dict:
         raise NotImplementedError()
@@ -1,10 +1,29 @@
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Union
 
+from belvo.columnar import CATEGORY, DATE, FLOAT, STRING
+from belvo.models import Invoice
 from belvo.resources.base import Resource
 
 
 class Invoices(Resource):
     endpoint = "/api/invoices/"
+    record_class = Invoice
+    columns = {
+        "id": STRING,
+        "link": STRING,
+        "invoice_identification": STRING,
+        "invoice_date": DATE,
+        "type": CATEGORY,
+        "invoice_type": CATEGORY,
+        "status": CATEGORY,
+        "sender_id": CATEGORY,
+        "receiver_id": CATEGORY,
+        "currency": CATEGORY,
+        "subtotal_amount": FLOAT,
+        "tax_amount": FLOAT,
+        "discount_amount": FLOAT,
+        "total_amount": FLOAT,
+    }
 
     def create(
         self,
@@ -16,7 +35,7 @@ class Invoices(Resource):
         attach_xml: bool = False,
         save_data: bool = True,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Union[List[Dict], Dict]:
 
         data = {
@@ -39,6 +58,6 @@ class Invoices(Resource):
         *,
         link: str = None,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Dict:
         raise NotImplementedError()
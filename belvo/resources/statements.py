@@ -1,4 +1,4 @@
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Union
 
 from belvo.resources.base import Resource
 
@@ -16,7 +16,7 @@ class Statements(Resource):
         attach_pdf: bool = False,
         save_data: bool = True,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Union[List[Dict], Dict]:
 
         data = {
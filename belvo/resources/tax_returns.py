@@ -1,5 +1,5 @@
 from datetime import date
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 from belvo.enums import TaxReturnType
 from belvo.resources.base import Resource
@@ -20,7 +20,7 @@ class TaxReturns(Resource):
         type_: Optional[TaxReturnType] = None,
         date_from: str = None,
         date_to: str = None,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Union[List[Dict], Dict]:
 
         type_ = type_ if type_ else TaxReturnType.YEARLY
@@ -44,6 +44,6 @@ class TaxReturns(Resource):
         *,
         link: str = None,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Dict:
         raise NotImplementedError()
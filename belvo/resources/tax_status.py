@@ -1,4 +1,4 @@
-from typing import Dict, List, Union
+from typing import Any, Dict, List, Union
 
 from belvo.resources.base import Resource
 
@@ -13,7 +13,7 @@ class TaxStatus(Resource):
         attach_pdf: bool = False,
         save_data: bool = True,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Union[List[Dict], Dict]:
 
         data = {"link": link, "attach_pdf": attach_pdf, "save_data": save_data}
@@ -29,6 +29,6 @@ class TaxStatus(Resource):
         *,
         link: str = None,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        **kwargs: Any,
     ) -> Dict:
         raise NotImplementedError()
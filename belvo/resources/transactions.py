@@ -1,11 +1,33 @@
+import inspect
 from datetime import date
-from typing import Dict, List, Union
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Union
 
+from belvo.columnar import CATEGORY, DATE, DATETIME, FLOAT, STRING
+from belvo.exceptions import RequestError
+from belvo.models import Transaction
 from belvo.resources.base import Resource
+from belvo.sync import WatermarkStore, latest_date, window_start
+from belvo.utils import date_windows
 
 
 class Transactions(Resource):
     endpoint = "/api/transactions/"
+    record_class = Transaction
+    columns = {
+        "id": STRING,
+        "account.id": STRING,
+        "value_date": DATE,
+        "accounting_date": DATETIME,
+        "collected_at": DATETIME,
+        "amount": FLOAT,
+        "balance": FLOAT,
+        "currency": CATEGORY,
+        "category": CATEGORY,
+        "type": CATEGORY,
+        "status": CATEGORY,
+        "description": STRING,
+    }
 
     def create(
         self,
@@ -17,11 +39,29 @@ class Transactions(Resource):
         token: str = None,
         save_data: bool = True,
         raise_exception: bool = False,
-        **kwargs: Dict,
+        window: Union[str, int] = None,
+        concurrency: int = 4,
+        window_attempts: int = 3,
+        window_backoff: float = 1.0,
+        **kwargs: Any,
     ) -> Union[List[Dict], Dict]:
 
         date_to = date_to or date.today().isoformat()
 
+        if window:
+            return self._create_in_windows(
+                date_windows(date_from, date_to, window),
+                concurrency=concurrency,
+                window_attempts=window_attempts,
+                window_backoff=window_backoff,
+                raise_exception=raise_exception,
+                link=link,
+                account=account,
+                token=token,
+                save_data=save_data,
+                **kwargs,
+            )
+
         data = {"link": link, "date_from": date_from, "date_to": date_to, "save_data": save_data}
 
         if account:
@@ -32,3 +72,77 @@ class Transactions(Resource):
         return self.session.post(
             self.endpoint, data=data, raise_exception=raise_exception, **kwargs
         )
+
+    def sync(
+        self,
+        link: str,
+        store: WatermarkStore,
+        *,
+        date_from: str = None,
+        account: str = None,
+        overlap: int = 3,
+        raise_exception: bool = False,
+        **kwargs: Any,
+    ) -> Union[List[Dict], Dict]:
+        """
+        Retrieve the transactions of `link` (or of one of its accounts) that are
+        newer than the watermark kept in `store`, going back `overlap` days to
+        catch late updates, and advance the watermark.
+
+        `date_from` is only used when `store` has no watermark yet. Other keyword
+        arguments are given to `create()`.
+        """
+        watermark = store.get(link, account)
+        if watermark:
+            date_from = window_start(watermark, overlap)
+        elif not date_from:
+            raise ValueError("date_from is required to sync a link for the first time")
+
+        create = partial(
+            self.create, link, date_from, account=account, raise_exception=True, **kwargs
+        )
+        if inspect.iscoroutinefunction(self.session.post):
+            return self._sync_async(  # type: ignore
+                create, store, link, account, watermark, raise_exception
+            )
+
+        try:
+            result = create()
+        except RequestError as exc:
+            if raise_exception:
+                raise
+            return exc.detail
+
+        _advance_watermark(result, store, link, account, watermark)
+        return result
+
+    async def _sync_async(
+        self,
+        create: Callable,
+        store: WatermarkStore,
+        link: str,
+        account: Optional[str],
+        watermark: Optional[str],
+        raise_exception: bool,
+    ) -> Union[List[Dict], Dict]:
+        try:
+            result = await create()
+        except RequestError as exc:
+            if raise_exception:
+                raise
+            return exc.detail
+
+        _advance_watermark(result, store, link, account, watermark)
+        return result
+
+
+def _advance_watermark(
+    result: Union[List[Dict], Dict],
+    store: WatermarkStore,
+    link: str,
+    account: Optional[str],
+    watermark: Optional[str],
+) -> None:
+    latest = latest_date(result if isinstance(result, list) else [])
+    if latest and (watermark is None or latest > watermark):
+        store.set(link, latest, account=account)
@@ -0,0 +1,107 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Return the number of seconds to wait given the value of a `Retry-After`
+    header, which can be either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed request has to be retried (`should_retry()`) and
+    how many seconds to wait before doing it (`delay()`).
+
+    * `max_attempts`: total number of attempts, including the first one.
+    * `backoff_factor` / `max_delay`: attempt `n` waits up to
+      `backoff_factor * 2 ** (n - 1)` seconds, capped by `max_delay`.
+    * `jitter`: wait a random time between 0 and the computed backoff ("full
+      jitter"), so many workers failing at once don't retry in lockstep.
+    * `respect_retry_after`: honour the `Retry-After` header (capped by
+      `max_delay`) instead of the computed backoff.
+    * `retry_non_idempotent`: by default POST and PATCH requests are only
+      retried when the server did not process them (HTTP 429 or a failure to
+      connect), since retrying them on a 5xx could register data twice.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        *,
+        backoff_factor: float = 0.5,
+        max_delay: float = 30.0,
+        jitter: bool = True,
+        statuses: Iterable[int] = RETRY_STATUSES,
+        respect_retry_after: bool = True,
+        retry_non_idempotent: bool = False,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.respect_retry_after = respect_retry_after
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def _allows(self, method: str) -> bool:
+        return self.retry_non_idempotent or method.upper() in IDEMPOTENT_METHODS
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        *,
+        status: Optional[int] = None,
+        request_sent: bool = True,
+    ) -> bool:
+        """
+        `status` is the status code of the response, or `None` when the request
+        failed at the network level, in that case `request_sent` tells whether
+        the request could have reached the server.
+        """
+        if attempt >= self.max_attempts:
+            return False
+
+        if status is None:
+            return not request_sent or self._allows(method)
+
+        if status not in self.statuses:
+            return False
+        return status == 429 or self._allows(method)
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if self.respect_retry_after:
+            seconds = parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_delay)
+
+        backoff = min(self.max_delay, self.backoff_factor * (2 ** (attempt - 1)))
+        if self.jitter:
+            return random.uniform(0, backoff)
+        return backoff
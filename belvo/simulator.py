@@ -0,0 +1,567 @@
+"""
+Local simulator of Belvo API, to test and benchmark integrations without
+network access or real credentials.
+
+    with Simulator(links=3, transactions_per_account=1000) as simulator:
+        client = Client("secret-key-id", "secret-key-password", simulator.url)
+"""
+
+import base64
+import gzip
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union, cast
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from belvo.http import endpoint_of
+from belvo.ratelimit import BucketState, take_token
+
+# Returns how many seconds a request waits before being answered.
+Latency = Callable[[random.Random], float]
+Response = Tuple[int, Dict[str, str], bytes]
+
+INSTITUTIONS = [
+    {
+        "id": 1,
+        "name": "erebor_mx_retail",
+        "type": "bank",
+        "display_name": "Erebor Mexico",
+        "country_code": "MX",
+        "website": "https://www.erebor.com/",
+        "primary_color": "#056dae",
+        "resources": ["ACCOUNTS", "TRANSACTIONS", "BALANCES", "OWNERS"],
+    },
+    {
+        "id": 2,
+        "name": "gringotts_mx_retail",
+        "type": "bank",
+        "display_name": "Gringotts Mexico",
+        "country_code": "MX",
+        "website": "https://www.gringotts.com/",
+        "primary_color": "#f0b400",
+        "resources": ["ACCOUNTS", "TRANSACTIONS", "BALANCES", "OWNERS"],
+    },
+]
+# Institutions asking for a token (e.g. sent by SMS) on every request.
+TOKEN_INSTITUTIONS = ("gringotts_mx_retail",)
+MAX_PAGE_SIZE = 1000
+COMPRESSION_MIN_SIZE = 1024
+
+
+def constant(seconds: float) -> Latency:
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Latency:
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, sigma: float = 0.5) -> Latency:
+    """
+    Long-tailed latency, as usually observed for real APIs.
+    """
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+def _errors(status: int, code: str, message: str, **extra: Any) -> Tuple[int, Any]:
+    return status, [{"code": code, "message": message, "request_id": uuid.uuid4().hex, **extra}]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class Simulator:
+    """
+    Answers like Belvo API from an in-process HTTP server, with generated
+    links, accounts and transactions:
+
+    * `links`, `accounts_per_link` and `transactions_per_account` set the data
+      volume, and `page_size` the default page size of lists.
+    * Links of `gringotts_mx_retail` need a token: requests return 428 with a
+      session to `resume()` with any token.
+    * `latency` (a function of a `random.Random`, see `constant`, `uniform`
+      and `lognormal`), and `error_rate` (probability of answering one of
+      `error_statuses`) can be given for every endpoint or as a dictionary by
+      endpoint (e.g. `/api/transactions/`), with `"*"` for the other ones.
+    * `rate_limit` answers 429, with a `Retry-After`, to requests over that
+      number per second (with bursts of `burst` requests).
+    * When `credentials` are given, requests using other ones get a 401.
+    * With `compression`, bodies of at least 1 KB are gzipped for clients
+      accepting it; gzipped request bodies are always accepted.
+    """
+
+    def __init__(
+        self,
+        *,
+        links: int = 1,
+        accounts_per_link: int = 2,
+        transactions_per_account: int = 100,
+        page_size: int = 100,
+        end_date: Optional[date] = None,
+        latency: Union[Latency, Dict[str, Latency], None] = None,
+        error_rate: Union[float, Dict[str, float]] = 0.0,
+        error_statuses: Tuple[int, ...] = (500, 502, 503),
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        credentials: Optional[Tuple[str, str]] = None,
+        compression: bool = False,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.page_size = page_size
+        self.end_date = end_date or date.today()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else max(1.0, rate_limit or 1.0)
+        self.credentials = credentials
+        self.compression = compression
+        self.requests: List[Tuple[str, str]] = []
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._bucket: Optional[BucketState] = None
+        self._sessions: Dict[str, Tuple[str, str, Dict]] = {}
+        self._encoded: Dict[str, bytes] = {}
+        self.data: Dict[str, List[Dict]] = {
+            "institutions": [dict(institution) for institution in INSTITUTIONS],
+            "links": [],
+            "accounts": [],
+            "transactions": [],
+            "owners": [],
+        }
+        for _ in range(links):
+            self.add_link(
+                accounts=accounts_per_link, transactions_per_account=transactions_per_account
+            )
+
+        self._server = _Server((host, port), _Handler)
+        self._server.simulator = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = cast(Tuple[str, int], self._server.server_address[:2])
+        return f"http://{host}:{port}"
+
+    def start(self) -> "Simulator":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "Simulator":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def request_count(self, method: str = None, endpoint: str = None) -> int:
+        with self._lock:
+            return sum(
+                1
+                for request_method, request_endpoint in self.requests
+                if method in (None, request_method) and endpoint in (None, request_endpoint)
+            )
+
+    # Data
+
+    def _id(self) -> str:
+        return str(uuid.UUID(int=self._random.getrandbits(128), version=4))
+
+    def add_link(
+        self,
+        institution: str = "erebor_mx_retail",
+        *,
+        accounts: int = 2,
+        transactions_per_account: int = 100,
+        **fields: Any,
+    ) -> Dict:
+        """
+        Add a link with generated accounts, transactions and owner.
+        """
+        with self._lock:
+            link = {
+                "id": self._id(),
+                "institution": institution,
+                "access_mode": "single",
+                "status": "valid",
+                "created_by": self._id(),
+                "external_id": None,
+                "last_accessed_at": _now(),
+                "created_at": _now(),
+                **fields,
+            }
+            self.data["links"].append(link)
+            for number in range(accounts):
+                account = self._make_account(link, number)
+                self.data["accounts"].append(account)
+                for index in range(transactions_per_account):
+                    self.data["transactions"].append(
+                        self._make_transaction(account, index, transactions_per_account)
+                    )
+            self.data["owners"].append(
+                {
+                    "id": self._id(),
+                    "link": link["id"],
+                    "display_name": "John Doe",
+                    "email": "johndoe@belvo.com",
+                    "phone_number": "+52-XXX-XXX-XXXX",
+                    "address": "Carrer de la Llacuna, 162, 08018 Barcelona",
+                    "collected_at": _now(),
+                }
+            )
+            self._encoded.clear()
+        return link
+
+    def _make_account(self, link: Dict, number: int) -> Dict:
+        current = round(self._random.uniform(100, 100000), 2)
+        return {
+            "id": self._id(),
+            "link": link["id"],
+            "institution": {"name": link["institution"], "type": "bank"},
+            "collected_at": _now(),
+            "category": "CHECKING_ACCOUNT" if number % 2 == 0 else "CREDIT_CARD",
+            "type": "Cuentas de efectivo",
+            "name": f"Cuenta Perfiles {number}",
+            "number": str(self._random.randrange(10**12, 10**13)),
+            "balance": {"current": current, "available": current},
+            "currency": "MXN",
+            "bank_product_id": str(number),
+            "internal_identification": str(number),
+            "public_identification_name": "CLABE",
+            "public_identification_value": str(self._random.randrange(10**17, 10**18)),
+        }
+
+    def _make_transaction(self, account: Dict, index: int, total: int) -> Dict:
+        value_date = self.end_date - timedelta(days=(total - 1 - index) * 365 // max(total, 1))
+        amount = round(self._random.uniform(1, 5000), 2)
+        return {
+            "id": self._id(),
+            "account": {
+                key: account[key]
+                for key in ("id", "link", "institution", "category", "name", "number", "currency")
+            },
+            "collected_at": _now(),
+            "value_date": value_date.isoformat(),
+            "accounting_date": f"{value_date.isoformat()}T00:00:00Z",
+            "amount": amount,
+            "balance": round(self._random.uniform(0, 100000), 2),
+            "currency": "MXN",
+            "description": f"CARGO A TERCEROS {index}",
+            "observations": None,
+            "merchant": {"logo": None, "website": None, "name": "Merchant"},
+            "category": self._random.choice(
+                ["Transfer", "Online Platforms & Leisure", "Income & Payments"]
+            ),
+            "subcategory": None,
+            "reference": str(index),
+            "type": self._random.choice(["INFLOW", "OUTFLOW"]),
+            "status": "PROCESSED",
+            "internal_identification": str(index),
+        }
+
+    # Requests
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        authorization: str = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Response:
+        """
+        Return the status, headers and body Belvo API would answer with.
+        """
+        headers = headers or {}
+        if headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        status, response_headers, payload = self._respond(method, path, body, authorization)
+        if (
+            self.compression
+            and len(payload) >= COMPRESSION_MIN_SIZE
+            and "gzip" in headers.get("Accept-Encoding", "")
+        ):
+            payload = gzip.compress(payload, 1)
+            response_headers = {**response_headers, "Content-Encoding": "gzip"}
+        return status, response_headers, payload
+
+    def _respond(
+        self, method: str, path: str, body: bytes, authorization: Optional[str]
+    ) -> Response:
+        parts = urlsplit(path)
+        endpoint = endpoint_of(parts.path)
+        with self._lock:
+            self.requests.append((method, endpoint))
+            latency = self._for_endpoint(self.latency, endpoint)
+            delay = latency(self._random) if latency is not None else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            if not self._authorized(authorization):
+                return self._json(401, {"detail": "Invalid credentials."})
+
+            if self.rate_limit is not None:
+                state, wait = take_token(
+                    self._bucket, time.monotonic(), self.rate_limit, self.burst
+                )
+                if wait > 0:
+                    return self._json(
+                        429,
+                        {"detail": "Request was throttled."},
+                        {"Retry-After": str(math.ceil(wait))},
+                    )
+                self._bucket = state
+
+            if self._random.random() < (self._for_endpoint(self.error_rate, endpoint) or 0.0):
+                status = self._random.choice(self.error_statuses)
+                return self._json(status, {"detail": "Simulated failure."})
+
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                return self._json(400, {"detail": "JSON parse error."})
+
+            if method == "GET" and parts.path.rstrip("/") != "/api":
+                cached = self._encoded.get(path)
+                if cached is None:
+                    status, payload = self._route(
+                        method, parts.path, dict(parse_qsl(parts.query)), data
+                    )
+                    if status != 200:
+                        return self._json(status, payload)
+                    cached = self._encoded[path] = json.dumps(payload).encode()
+                return 200, {"Content-Type": "application/json"}, cached
+
+            status, payload = self._route(method, parts.path, dict(parse_qsl(parts.query)), data)
+            if method != "GET" and status < 400:
+                self._encoded.clear()
+            return self._json(status, payload)
+
+    def _for_endpoint(self, setting: Any, endpoint: str) -> Any:
+        if isinstance(setting, dict):
+            return setting.get(endpoint, setting.get("*"))
+        return setting
+
+    def _authorized(self, authorization: Optional[str]) -> bool:
+        if self.credentials is None:
+            return True
+        expected = base64.b64encode(":".join(self.credentials).encode()).decode()
+        return authorization == f"Basic {expected}"
+
+    def _json(self, status: int, payload: Any, headers: Dict[str, str] = None) -> Response:
+        body = b"" if status == 204 else json.dumps(payload).encode()
+        return status, {"Content-Type": "application/json", **(headers or {})}, body
+
+    def _route(self, method: str, path: str, query: Dict[str, str], data: Dict) -> Tuple[int, Any]:
+        segments = [segment for segment in path.split("/") if segment]
+        if segments == ["api"]:
+            return 200, {}
+        if len(segments) not in (2, 3) or segments[0] != "api" or segments[1] not in self.data:
+            return 404, {"detail": "Not found."}
+
+        resource = segments[1]
+        if len(segments) == 3:
+            return self._detail(method, resource, segments[2], data)
+        if method == "GET":
+            return self._list(path, resource, query)
+        if method == "POST":
+            return self._create(resource, data)
+        if method == "PATCH":
+            return self._resume(resource, data)
+        return 405, {"detail": f'Method "{method}" not allowed.'}
+
+    def _find(self, resource: str, id: str) -> Optional[Dict]:
+        for item in self.data[resource]:
+            if str(item["id"]) == id:
+                return item
+        return None
+
+    def _detail(self, method: str, resource: str, id: str, data: Dict) -> Tuple[int, Any]:
+        item = self._find(resource, id)
+        if item is None:
+            return 404, {"detail": "Not found."}
+        if method == "GET":
+            return 200, item
+        if method == "DELETE":
+            self.data[resource].remove(item)
+            if resource == "links":
+                for related in ("accounts", "owners"):
+                    self.data[related] = [i for i in self.data[related] if i["link"] != id]
+                self.data["transactions"] = [
+                    i for i in self.data["transactions"] if i["account"]["link"] != id
+                ]
+            return 204, None
+        if method in ("PUT", "PATCH") and resource == "links":
+            if method == "PUT" and self._needs_token(item, data):
+                return self._token_required("links", item, {"update": data})
+            item.update(
+                {key: value for key, value in data.items() if key == "access_mode" and value}
+            )
+            item["status"] = "valid"
+            return 200, item
+        return 405, {"detail": f'Method "{method}" not allowed.'}
+
+    def _list(self, path: str, resource: str, query: Dict[str, str]) -> Tuple[int, Any]:
+        page = int(query.pop("page", 1))
+        page_size = min(int(query.pop("page_size", self.page_size)), MAX_PAGE_SIZE)
+
+        items = self.data[resource]
+        for field, value in query.items():
+            if field == "link" and resource == "transactions":
+                items = [item for item in items if item["account"]["link"] == value]
+            elif field == "account" and resource == "transactions":
+                items = [item for item in items if item["account"]["id"] == value]
+            elif field.endswith("__gte"):
+                items = [item for item in items if str(item.get(field[:-5])) >= value]
+            elif field.endswith("__lte"):
+                items = [item for item in items if str(item.get(field[:-5])) <= value]
+            else:
+                items = [item for item in items if str(item.get(field)) == value]
+
+        start, end = (page - 1) * page_size, page * page_size
+        if page < 1 or (start >= len(items) and page > 1):
+            return 404, {"detail": "Invalid page."}
+
+        def page_url(number: int) -> str:
+            return (
+                f"{self.url}{path}?{urlencode({**query, 'page': number, 'page_size': page_size})}"
+            )
+
+        return 200, {
+            "count": len(items),
+            "next": page_url(page + 1) if end < len(items) else None,
+            "previous": page_url(page - 1) if page > 1 else None,
+            "results": items[start:end],
+        }
+
+    def _needs_token(self, link: Dict, data: Dict) -> bool:
+        return link["institution"] in TOKEN_INSTITUTIONS and not data.get("token")
+
+    def _token_required(self, resource: str, link: Optional[Dict], data: Dict) -> Tuple[int, Any]:
+        session = uuid.uuid4().hex
+        self._sessions[session] = (resource, link["id"] if link else "", data)
+        extra = {"session": session, "expiry": 9}
+        if link is not None:
+            extra["link"] = link["id"]
+        return _errors(
+            428, "token_required", "A MFA token is required by the institution to login", **extra
+        )
+
+    def _create(self, resource: str, data: Dict) -> Tuple[int, Any]:
+        if resource == "links":
+            names = [institution["name"] for institution in self.data["institutions"]]
+            if data.get("institution") not in names:
+                return _errors(400, "does_not_exist", "Institution does not exist")
+            if data["institution"] in TOKEN_INSTITUTIONS and not data.get("token"):
+                return self._token_required("links", None, data)
+            return 201, self._create_link(data)
+
+        if resource not in ("accounts", "transactions", "owners"):
+            return 405, {"detail": 'Method "POST" not allowed.'}
+
+        link = self._find("links", str(data.get("link")))
+        if link is None:
+            return _errors(400, "does_not_exist", "Link does not exist")
+        if self._needs_token(link, data):
+            return self._token_required(resource, link, data)
+        return 201, self._retrieve(resource, link, data)
+
+    def _create_link(self, data: Dict) -> Dict:
+        fields: Dict[str, Any] = {"external_id": data.get("external_id")}
+        if data.get("access_mode"):
+            fields["access_mode"] = data["access_mode"]
+        return self.add_link(data["institution"], **fields)
+
+    def _retrieve(self, resource: str, link: Dict, data: Dict) -> List[Dict]:
+        if resource == "transactions":
+            items = [item for item in self.data[resource] if item["account"]["link"] == link["id"]]
+            if data.get("account"):
+                items = [item for item in items if item["account"]["id"] == data["account"]]
+            date_from = data.get("date_from") or "0000-00-00"
+            date_to = data.get("date_to") or "9999-99-99"
+            return [item for item in items if date_from <= item["value_date"] <= date_to]
+        return [item for item in self.data[resource] if item["link"] == link["id"]]
+
+    def _resume(self, resource: str, data: Dict) -> Tuple[int, Any]:
+        pending = self._sessions.get(str(data.get("session")))
+        if pending is None or pending[0] != resource:
+            return _errors(400, "invalid", "Invalid session")
+        if not data.get("token"):
+            return _errors(400, "required", "This field is required.", field="token")
+
+        del self._sessions[data["session"]]
+        _, link_id, original = pending
+        if resource == "links" and not link_id:
+            return 201, self._create_link(original)
+
+        link = self._find("links", link_id)
+        if link is None:
+            return _errors(400, "does_not_exist", "Link does not exist")
+        if "update" in original:
+            link["status"] = "valid"
+            return 200, link
+        return 201, self._retrieve(resource, link, original)
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    simulator: Simulator
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        # Clients closing their connection early (e.g. on a timeout) are expected.
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which Nagle's algorithm would delay.
+    disable_nagle_algorithm = True
+    server: _Server
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _handle(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        status, headers, payload = self.server.simulator.handle(
+            self.command,
+            self.path,
+            body,
+            self.headers.get("Authorization"),
+            # So that headers are looked up regardless of their case.
+            CaseInsensitiveDict(self.headers.items()),
+        )
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
@@ -0,0 +1,177 @@
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from belvo.models import Record
+
+KINDS = ("links", "accounts", "transactions")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS {kind} (
+    id TEXT PRIMARY KEY,
+    link TEXT,
+    account TEXT,
+    date TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {kind}_link ON {kind} (link, date);
+CREATE INDEX IF NOT EXISTS {kind}_account ON {kind} (account, date);
+CREATE INDEX IF NOT EXISTS {kind}_date ON {kind} (date);
+"""
+
+
+def _check_kind(kind: str) -> None:
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of {KINDS}")
+
+
+def _id_of(value: Any) -> Optional[str]:
+    return value.get("id") if isinstance(value, dict) else value
+
+
+def _date_of(record: Dict, *fields: str) -> Optional[str]:
+    for field in fields:
+        if record.get(field):
+            return record[field][:10]
+    return None
+
+
+def _columns(kind: str, record: Dict) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    Return the link, account and date a record is indexed by.
+    """
+    if kind == "links":
+        return record.get("id"), None, _date_of(record, "created_at")
+    if kind == "accounts":
+        return _id_of(record.get("link")), record.get("id"), _date_of(record, "collected_at")
+
+    account = record.get("account")
+    link = account.get("link") if isinstance(account, dict) else None
+    return (
+        _id_of(link or record.get("link")),
+        _id_of(account),
+        _date_of(record, "value_date", "accounting_date", "collected_at"),
+    )
+
+
+class Store:
+    """
+    Local SQLite mirror of links, accounts and transactions, so they can be
+    read again without requesting Belvo API.
+
+    Records are upserted by id and indexed by link, account and date (ISO
+    `YYYY-MM-DD`). `path` defaults to an in-memory database.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            for kind in KINDS:
+                self._connection.executescript(SCHEMA.format(kind=kind))
+
+    def upsert(self, kind: str, records: Iterable[Any]) -> int:
+        """
+        Insert or replace `records` (dictionaries or models, e.g. what `list()`
+        or `create()` return) and return how many were stored.
+        """
+        _check_kind(kind)
+        if isinstance(records, (dict, Record)):
+            records = [records]
+
+        rows = []
+        for record in records:
+            if isinstance(record, Record):
+                record = record.to_dict()
+            rows.append((record["id"], *_columns(kind, record), json.dumps(record)))
+
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO {kind} (id, link, account, date, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def get(self, kind: str, id: str) -> Optional[Dict]:
+        rows = self._select(kind, "id = ?", [id])
+        return rows[0] if rows else None
+
+    def delete(self, kind: str, id: str) -> bool:
+        _check_kind(kind)
+        with self._lock, self._connection:
+            cursor = self._connection.execute(f"DELETE FROM {kind} WHERE id = ?", (id,))
+        return cursor.rowcount > 0
+
+    def count(self, kind: str) -> int:
+        _check_kind(kind)
+        with self._lock:
+            return self._connection.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
+
+    def links(self) -> List[Dict]:
+        return self._select("links")
+
+    def accounts(self, *, link: str = None) -> List[Dict]:
+        return self._select("accounts", *self._filters(link=link))
+
+    def transactions(
+        self,
+        *,
+        link: str = None,
+        account: str = None,
+        date_from: str = None,
+        date_to: str = None,
+        limit: int = None,
+    ) -> List[Dict]:
+        """
+        Transactions matching every given filter, newest first.
+        """
+        return self._select(
+            "transactions",
+            *self._filters(link=link, account=account, date_from=date_from, date_to=date_to),
+            order="date DESC, id",
+            limit=limit,
+        )
+
+    def _filters(
+        self, *, link: str = None, account: str = None, date_from: str = None, date_to: str = None
+    ) -> Tuple[str, List[str]]:
+        conditions, parameters = [], []
+        for condition, value in (
+            ("link = ?", link),
+            ("account = ?", account),
+            ("date >= ?", date_from),
+            ("date <= ?", date_to),
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        return " AND ".join(conditions), parameters
+
+    def _select(
+        self,
+        kind: str,
+        where: str = "",
+        parameters: List[str] = None,
+        *,
+        order: str = "id",
+        limit: int = None,
+    ) -> List[Dict]:
+        _check_kind(kind)
+
+        query = f"SELECT data FROM {kind}"
+        if where:
+            query += f" WHERE {where}"
+        query += f" ORDER BY {order}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+
+        with self._lock:
+            rows = self._connection.execute(query, parameters or []).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def close(self) -> None:
+        self._connection.close()
@@ -0,0 +1,154 @@
+import codecs
+import json
+from typing import Any, Dict, List, Tuple
+
+_WHITESPACE = " \t\n\r"
+
+# Parser states, named after what is expected next.
+_START = "start"
+_FIRST_KEY = "first-key"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_RESULTS = "results"
+_FIRST_ITEM = "first-item"
+_ITEM = "item"
+_ITEM_SEPARATOR = "item-separator"
+_KEY_SEPARATOR = "key-separator"
+_END = "end"
+
+
+class PageDecoder:
+    """
+    Incremental decoder for a page of a paginated response, i.e.
+    `{"count": ..., "next": ..., "previous": ..., "results": [...]}`.
+
+    Bytes are given to `feed()` as they arrive and it returns the items of
+    `results` that have been completely received, so memory is bounded by the
+    size of a single item (plus the chunk being decoded) instead of the size of
+    the page. Once the whole page has been fed, `close()` checks that it was
+    complete and the other keys of the page are available in `page`.
+    """
+
+    def __init__(self) -> None:
+        self.page: Dict[str, Any] = {}
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._key = ""
+
+    def feed(self, data: bytes) -> List[Any]:
+        self._append(self._decoder.decode(data))
+        return self._parse(final=False)
+
+    def close(self) -> Dict[str, Any]:
+        self._append(self._decoder.decode(b"", final=True))
+        self._parse(final=True)
+
+        if self._state != _END:
+            raise json.JSONDecodeError("Incomplete page", self._buffer, self._pos)
+        return self.page
+
+    def _append(self, text: str) -> None:
+        # Drop what has already been parsed, so the buffer doesn't grow with the page.
+        pos = self._pos
+        self._buffer = self._buffer[pos:] + text
+        self._pos = 0
+
+    def _error(self, message: str) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, self._pos)
+
+    def _next_char(self) -> str:
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else ""
+
+    def _value(self, final: bool) -> Tuple[bool, Any]:
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return False, None
+
+        if not final:
+            # A value at the end of the buffer may continue in the next chunk, and
+            # so may a number cut right before its fraction or exponent.
+            if end == len(self._buffer):
+                return False, None
+            if isinstance(value, (int, float)) and self._buffer[end] in ".eE+-":
+                return False, None
+
+        self._pos = end
+        return True, value
+
+    def _expect(self, char: str, expected: str) -> None:
+        if char != expected:
+            raise self._error(f"Expecting '{expected}'")
+        self._pos += 1
+
+    def _parse(self, final: bool) -> List[Any]:  # noqa: C901
+        items: List[Any] = []
+        while True:
+            char = self._next_char()
+            if not char:
+                return items
+
+            if self._state == _START:
+                self._expect(char, "{")
+                self._state = _FIRST_KEY
+
+            elif self._state in (_FIRST_KEY, _KEY):
+                if char == "}" and self._state == _FIRST_KEY:
+                    self._pos += 1
+                    self._state = _END
+                    continue
+                if char != '"':
+                    raise self._error("Expecting property name enclosed in double quotes")
+                complete, self._key = self._value(final)
+                if not complete:
+                    return items
+                self._state = _COLON
+
+            elif self._state == _COLON:
+                self._expect(char, ":")
+                self._state = _RESULTS if self._key == "results" else _VALUE
+
+            elif self._state == _RESULTS and char == "[":
+                self._pos += 1
+                self._state = _FIRST_ITEM
+
+            elif self._state in (_VALUE, _RESULTS):
+                complete, value = self._value(final)
+                if not complete:
+                    return items
+                self.page[self._key] = value
+                self._state = _KEY_SEPARATOR
+
+            elif self._state in (_FIRST_ITEM, _ITEM):
+                if char == "]" and self._state == _FIRST_ITEM:
+                    self._pos += 1
+                    self._state = _KEY_SEPARATOR
+                    continue
+                complete, value = self._value(final)
+                if not complete:
+                    return items
+                items.append(value)
+                self._state = _ITEM_SEPARATOR
+
+            elif self._state == _ITEM_SEPARATOR:
+                if char not in ",]":
+                    raise self._error("Expecting ',' delimiter")
+                self._pos += 1
+                self._state = _ITEM if char == "," else _KEY_SEPARATOR
+
+            elif self._state == _KEY_SEPARATOR:
+                if char not in ",}":
+                    raise self._error("Expecting ',' delimiter")
+                self._pos += 1
+                self._state = _KEY if char == "," else _END
+
+            else:
+                raise self._error("Extra data")
@@ -0,0 +1,137 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+# Fields giving the date of a transaction, by preference.
+DATE_FIELDS = ("value_date", "collected_at")
+
+
+class WatermarkStore:
+    """
+    Persists the latest date (ISO `YYYY-MM-DD`) already retrieved for a link,
+    or for one of its accounts.
+    """
+
+    def get(self, link: str, account: str = None) -> Optional[str]:
+        raise NotImplementedError()
+
+    def set(self, link: str, watermark: str, account: str = None) -> None:
+        raise NotImplementedError()
+
+
+class InMemoryWatermarkStore(WatermarkStore):
+    """
+    Watermarks for the lifetime of the process.
+    """
+
+    def __init__(self) -> None:
+        self._watermarks: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, link: str, account: str = None) -> Optional[str]:
+        with self._lock:
+            return self._watermarks.get(_key(link, account))
+
+    def set(self, link: str, watermark: str, account: str = None) -> None:
+        with self._lock:
+            self._watermarks[_key(link, account)] = watermark
+
+
+class FileWatermarkStore(WatermarkStore):
+    """
+    Watermarks stored as JSON in `path`, which is replaced atomically on every
+    update.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict[str, str]:
+        try:
+            with open(self.path) as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, link: str, account: str = None) -> Optional[str]:
+        with self._lock:
+            return self._read().get(_key(link, account))
+
+    def set(self, link: str, watermark: str, account: str = None) -> None:
+        with self._lock:
+            watermarks = self._read()
+            watermarks[_key(link, account)] = watermark
+
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary, "w") as fp:
+                json.dump(watermarks, fp)
+            os.replace(temporary, self.path)
+
+
+class SQLiteWatermarkStore(WatermarkStore):
+    """
+    Watermarks stored in the `watermarks` table of the SQLite database at
+    `path`, which may be shared with other tables of the application.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS watermarks ("
+                "link TEXT NOT NULL, account TEXT NOT NULL, watermark TEXT NOT NULL, "
+                "PRIMARY KEY (link, account))"
+            )
+
+    def get(self, link: str, account: str = None) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT watermark FROM watermarks WHERE link = ? AND account = ?",
+                (link, account or ""),
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, link: str, watermark: str, account: str = None) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO watermarks (link, account, watermark) VALUES (?, ?, ?)",
+                (link, account or "", watermark),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def _key(link: str, account: Optional[str]) -> str:
+    return f"{link}:{account}" if account else link
+
+
+def latest_date(transactions: Iterable[Dict]) -> Optional[str]:
+    """
+    Return the latest date of `transactions`, using the first field of
+    `DATE_FIELDS` each of them has.
+    """
+    latest = None
+    for transaction in transactions:
+        for field in DATE_FIELDS:
+            value = transaction.get(field)
+            if value:
+                value = value[:10]
+                if latest is None or value > latest:
+                    latest = value
+                break
+    return latest
+
+
+def window_start(watermark: str, overlap: int) -> str:
+    """
+    Return the date from which to request data already retrieved up to
+    `watermark`, going back `overlap` days to catch late updates.
+    """
+    start = datetime.strptime(watermark, "%Y-%m-%d").date() - timedelta(days=overlap)
+    return start.isoformat()
@@ -0,0 +1,133 @@
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Generator, List, Optional
+
+_current_span: ContextVar = ContextVar("belvo_current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation (e.g. a request or a page of `list()`) with attributes,
+    belonging to a trace.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_time",
+        "end_time",
+        "status",
+        "_tracer",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        *,
+        parent: Optional["Span"] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.trace_id: str = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.end_time: Optional[float] = None
+        self.status = "ok"
+
+    @property
+    def traceparent(self) -> str:
+        """
+        W3C Trace Context header making the server side part of this trace.
+        """
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end_time is None else self.end_time - self.start_time
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_time is not None:
+            return
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = repr(error)
+        self.end_time = time.time()
+        self._tracer.export(self)
+
+    def __repr__(self) -> str:
+        return f"Span({self.name!r}, trace_id={self.trace_id!r}, span_id={self.span_id!r})"
+
+
+class InMemoryExporter:
+    """
+    Keeps finished spans in `spans`, e.g. to inspect them in tests.
+    """
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+
+class Tracer:
+    """
+    Creates spans and gives the finished ones to `exporter`, any object with an
+    `export(span)` method.
+    """
+
+    def __init__(self, exporter: Any = None) -> None:
+        self.exporter = exporter
+
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def start_span(
+        self, name: str, *, parent: Optional[Span] = None, attributes: Dict[str, Any] = None
+    ) -> Span:
+        """
+        Start a span that has to be ended by the caller, child of `parent` or of
+        the current span.
+        """
+        return Span(self, name, parent=parent or self.current(), attributes=attributes)
+
+    @contextmanager
+    def span(
+        self, name: str, *, parent: Optional[Span] = None, **attributes: Any
+    ) -> Generator[Span, None, None]:
+        """
+        Run the block in a span, which is the current span meanwhile.
+        """
+        span = self.start_span(name, parent=parent, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.end(error=exc)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def export(self, span: Span) -> None:
+        if self.exporter is not None:
+            self.exporter.export(span)
@@ -1,11 +1,140 @@
+import binascii
+import hashlib
+import mmap
 import pathlib
+import threading
 from base64 import b64encode
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple, Union
 
+WINDOWS = ("week", "month", "year")
 
-def read_file_to_b64(path: str):
-    file = pathlib.Path(path)
-    if file.exists() and file.is_file():
-        with open(path, "rb") as fr:
-            return b64encode(fr.read())
-    else:
-        raise ValueError("Invalid file path")
+# Files at least this large are mapped in memory and encoded in chunks.
+MMAP_THRESHOLD = 1024 * 1024
+# A multiple of 3, so that every chunk is encoded without padding.
+ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+
+
+def _encode_file(path: pathlib.Path, size: int) -> Tuple[str, str]:
+    """
+    Return the SHA-256 digest and the base64 encoded content of a file.
+    """
+    digest = hashlib.sha256()
+    with open(str(path), "rb") as fr:
+        if size < MMAP_THRESHOLD:
+            content = fr.read()
+            digest.update(content)
+            return digest.hexdigest(), b64encode(content).decode("ascii")
+
+        parts = []
+        with mmap.mmap(fr.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, len(mapped), ENCODE_CHUNK_SIZE):
+                end = start + ENCODE_CHUNK_SIZE
+                chunk = mapped[start:end]
+                digest.update(chunk)
+                parts.append(binascii.b2a_base64(chunk, newline=False))
+        return digest.hexdigest(), b"".join(parts).decode("ascii")
+
+
+class EncodedFileCache:
+    """
+    Base64 encoded content of files (e.g. the certificates and private keys of
+    links), addressed by their digest so that identical files are kept once.
+
+    A file is only read again when its modification time or size change, and
+    up to `maxsize` files are remembered.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._encoded: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def encode(self, path: Union[str, pathlib.Path]) -> str:
+        file = pathlib.Path(path)
+        key = self._key(file)
+        with self._lock:
+            digest = self._digests.get(key)
+            if digest is not None:
+                self._digests.move_to_end(key)
+                self.hits += 1
+                return self._encoded[digest]
+
+        digest, encoded = _encode_file(file, key[2])
+        with self._lock:
+            self.misses += 1
+            # A file modified while it was read is not cached, as `key` is outdated.
+            if self._key(file) == key:
+                encoded = self._encoded.setdefault(digest, encoded)
+                self._add(key, digest)
+        return encoded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._digests.clear()
+            self._encoded.clear()
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    @staticmethod
+    def _key(file: pathlib.Path) -> Tuple[str, int, int]:
+        if not file.is_file():
+            raise ValueError("Invalid file path")
+        stat = file.stat()
+        return str(file.resolve()), stat.st_mtime_ns, stat.st_size
+
+    def _add(self, key: Tuple[str, int, int], digest: str) -> None:
+        # Older versions of the same file won't be requested again.
+        for outdated in [cached for cached in self._digests if cached[0] == key[0]]:
+            del self._digests[outdated]
+        self._digests[key] = digest
+        while len(self._digests) > self.maxsize:
+            self._digests.popitem(last=False)
+        for unused in set(self._encoded) - set(self._digests.values()):
+            del self._encoded[unused]
+
+
+encoded_files = EncodedFileCache()
+
+
+def read_file_to_b64(path: str) -> str:
+    """
+    Return the content of a file encoded in base64, cached in `encoded_files`.
+    """
+    return encoded_files.encode(path)
+
+
+def _window_end(start: date, window: Union[str, int]) -> date:
+    if window == "month":
+        next_month = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        return next_month - timedelta(days=1)
+    if window == "year":
+        return date(start.year, 12, 31)
+    days = 7 if window == "week" else window
+    return start + timedelta(days=days - 1)  # type: ignore
+
+
+def date_windows(date_from: str, date_to: str, window: Union[str, int]) -> List[Tuple[str, str]]:
+    """
+    Split the inclusive `date_from..date_to` range (ISO dates) into consecutive,
+    non-overlapping windows of `window` days, weeks, calendar months or years.
+    """
+    if window not in WINDOWS and not (isinstance(window, int) and window > 0):
+        raise ValueError(f"window must be a positive number of days or one of {WINDOWS}")
+
+    start = datetime.strptime(date_from, "%Y-%m-%d").date()
+    end = datetime.strptime(date_to, "%Y-%m-%d").date()
+    if start > end:
+        raise ValueError("date_from must not be after date_to")
+
+    windows = []
+    while start <= end:
+        window_end = min(_window_end(start, window), end)
+        windows.append((start.isoformat(), window_end.isoformat()))
+        start = window_end + timedelta(days=1)
+    return windows
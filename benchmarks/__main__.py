@@ -0,0 +1,101 @@
+"""
+Run the benchmarks and compare them with a baseline:
+
+    python -m benchmarks [--quick] [--only list,decode] [--save-baseline]
+
+Exits with status 1 when a result is worse than the baseline by more than
+`--tolerance`.
+"""
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from belvo import __version__
+
+from .suite import BENCHMARKS, Result
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def to_json(results: List[Result], quick: bool) -> Dict:
+    return {
+        "meta": {
+            "belvo": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "quick": quick,
+        },
+        "results": {
+            result.name: {
+                "value": round(result.value, 3),
+                "unit": result.unit,
+                "higher_is_better": result.higher_is_better,
+            }
+            for result in results
+        },
+    }
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Print every result next to its baseline and return the regressions.
+    """
+    regressions = []
+    for name, result in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None or not previous["value"]:
+            print(f"{name:<50} {result['value']:>14,.1f} {result['unit']}")
+            continue
+
+        change = result["value"] / previous["value"] - 1
+        if not result["higher_is_better"]:
+            change = -change
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<50} {result['value']:>14,.1f} {result['unit']:<10} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions and smaller data")
+    parser.add_argument("--only", help="comma separated benchmarks: " + ",".join(BENCHMARKS))
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", default=str(BASELINE), help="baseline to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="replace the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative change")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    results: List[Result] = []
+    for name in names:
+        results += BENCHMARKS[name](args.quick)
+    data = to_json(results, args.quick)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(data, indent=2) + "\n")
+    if args.save_baseline:
+        if args.only and Path(args.baseline).exists():
+            # Only replace the results of the benchmarks that were run.
+            previous = json.loads(Path(args.baseline).read_text())
+            data["results"] = {**previous["results"], **data["results"]}
+        Path(args.baseline).write_text(json.dumps(data, indent=2) + "\n")
+        return 0
+
+    try:
+        baseline = json.loads(Path(args.baseline).read_text())
+    except FileNotFoundError:
+        baseline = {"results": {}}
+    return 1 if compare(data, baseline, args.tolerance) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Benchmarks of the SDK hot paths, run against the local Belvo API simulator.
+"""
+
+import gc
+import json
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple
+
+from belvo import codec
+from belvo.client import Client
+from belvo.http import STREAM_CHUNK_SIZE
+from belvo.models import Transaction
+from belvo.simulator import Simulator
+from belvo.streaming import PageDecoder
+
+
+class Result(NamedTuple):
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def best_time(function: Callable, repeat: int) -> float:
+    """
+    Return the fastest of `repeat` runs of `function`, in seconds, after a
+    warm-up run.
+    """
+    function()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench_list(quick: bool) -> List[Result]:
+    cases = (
+        [(1, 100), (10, 100), (10, 1000)]
+        if quick
+        else [(1, 100), (10, 100), (100, 100), (10, 1000), (50, 1000)]
+    )
+    results = []
+    for pages, page_size in cases:
+        with Simulator(
+            accounts_per_link=1, transactions_per_account=pages * page_size, page_size=page_size
+        ) as simulator:
+            client = Client("secret-key-id", "secret-key-password", simulator.url)
+            for mode, options in (
+                ("default", {}),
+                ("prefetch", {"prefetch": 4}),
+                ("stream", {"stream": True}),
+            ):
+                elapsed = best_time(
+                    lambda: sum(1 for _ in client.Transactions.list(**options)), 1 if quick else 3
+                )
+                results.append(
+                    Result(
+                        f"list[{mode}] pages={pages} page_size={page_size}",
+                        pages * page_size / elapsed,
+                        "records/s",
+                        True,
+                    )
+                )
+    return results
+
+
+def bench_create(quick: bool) -> List[Result]:
+    calls = 100 if quick else 500
+    results = []
+    with Simulator(accounts_per_link=1, transactions_per_account=10) as simulator:
+        client = Client(
+            "secret-key-id", "secret-key-password", simulator.url, pool_maxsize=32, pool_block=True
+        )
+        link = simulator.data["links"][0]["id"]
+        for concurrency in (1, 8, 32):
+            batch = client.Transactions.create_many(
+                [{"link": link, "date_from": "2000-01-01"}] * calls, concurrency=concurrency
+            )
+            if batch.failed:
+                raise RuntimeError(f"{batch.failed} create calls failed: {batch.errors[0].error!r}")
+            results.append(
+                Result(f"create concurrency={concurrency}", batch.throughput, "calls/s", True)
+            )
+    return results
+
+
+def make_transactions(count: int) -> List[Dict]:
+    with Simulator(accounts_per_link=1, transactions_per_account=count) as simulator:
+        return simulator.data["transactions"]
+
+
+def bench_decode(quick: bool) -> List[Result]:
+    page = json.dumps(
+        {"count": 1000, "next": None, "previous": None, "results": make_transactions(1000)}
+    ).encode()
+    repeat = 5 if quick else 20
+    megabytes = len(page) / 1e6
+
+    def decode_streaming() -> None:
+        decoder = PageDecoder()
+        for start in range(0, len(page), STREAM_CHUNK_SIZE):
+            end = start + STREAM_CHUNK_SIZE
+            decoder.feed(page[start:end])
+        decoder.close()
+
+    def decode_models() -> None:
+        [Transaction.from_dict(result) for result in json.loads(page)["results"]]
+
+    codecs = [codec.JSONCodec()] + ([codec.OrjsonCodec()] if codec.orjson is not None else [])
+    return [
+        Result(
+            f"decode {json_codec.name} codec",
+            megabytes / best_time(lambda: json_codec.loads(page), repeat),
+            "MB/s",
+            True,
+        )
+        for json_codec in codecs
+    ] + [
+        Result("decode PageDecoder", megabytes / best_time(decode_streaming, repeat), "MB/s", True),
+        Result(
+            "decode json.loads + models", megabytes / best_time(decode_models, repeat), "MB/s", True
+        ),
+    ]
+
+
+def bench_memory(quick: bool) -> List[Result]:
+    records = 20_000 if quick else 100_000
+    page = json.dumps(make_transactions(records))
+
+    def retained(function: Callable) -> float:
+        # Memory still held once the results are built, not the peak, which would
+        # count the dictionaries that models are built from.
+        gc.collect()
+        tracemalloc.start()
+        kept = function()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return current
+
+    dicts = retained(lambda: json.loads(page))
+    models = retained(lambda: [Transaction.from_dict(result) for result in json.loads(page)])
+    # Normalised to 100k records so quick and full runs can be compared.
+    scale = 100_000 / records
+    return [
+        Result("memory per 100k records (dicts)", dicts * scale / 1e6, "MB", False),
+        Result("memory per 100k records (models)", models * scale / 1e6, "MB", False),
+    ]
+
+
+BENCHMARKS: Dict[str, Callable[[bool], List[Result]]] = {
+    "list": bench_list,
+    "create": bench_create,
+    "decode": bench_decode,
+    "memory": bench_memory,
+}
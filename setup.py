@@ -13,6 +13,9 @@ with open(os.path.join(here, "README.md"), encoding="utf-8") as f:
 with open(os.path.join(here, "requirements/base.txt")) as f:
     requirements = f.read().splitlines()
 
+with open(os.path.join(here, "requirements/async.txt")) as f:
+    async_requirements = f.read().splitlines()
+
 
 def get_packages():
     """
@@ -32,6 +35,7 @@ setup(
     description="Belvo Python SDK",
     python_requires=">=3.6, <4",
     install_requires=requirements,
+    extras_require={"async": async_requirements},
     long_description=long_description,
     long_description_content_type="text/markdown",
     packages=get_packages(),
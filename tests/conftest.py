@@ -1,3 +1,6 @@
+import asyncio
+
+import httpx
 import pytest
 
 from belvo.http import APISession
@@ -27,3 +30,41 @@ def unauthorized_response(responses, fake_url):
         responses.GET, "{}/api/".format(fake_url), json={"detail": "Unauthorized."}, status=401
     )
     yield
+
+
+@pytest.fixture
+def async_transport():
+    """
+    Routes requests made by an `AsyncAPISession` to `(method, path)` handlers,
+    mimicking what `responses` does for the synchronous session.
+    """
+    routes = {}
+
+    def handler(request):
+        key = (request.method, request.url.path, request.url.query.decode() or None)
+        if key not in routes:
+            key = (request.method, request.url.path, None)
+        status, body = routes[key]
+        return httpx.Response(status, json=body)
+
+    transport = httpx.MockTransport(handler)
+    transport.routes = routes
+    yield transport
+
+
+@pytest.fixture
+def run_async():
+    """
+    Run a coroutine in a new event loop, like `asyncio.run()` (which requires
+    Python 3.7) does.
+    """
+
+    def run(coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    return run
@@ -0,0 +1,148 @@
+import base64
+import io
+import json
+
+import pytest
+
+from belvo.attachments import AttachmentDecoder, AttachmentSink, DirectorySink
+from belvo.client import AsyncClient, Client
+from belvo.exceptions import RequestError
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 40
+
+
+class MemorySink(AttachmentSink):
+    def __init__(self):
+        self.aborted = []
+
+    def open(self, field):
+        return io.BytesIO()
+
+    def close(self, file, record, field):
+        return file.getvalue()
+
+    def abort(self, file):
+        self.aborted.append(file)
+
+
+def decode(body, sink=None, chunk_size=None):
+    decoder = AttachmentDecoder(sink or MemorySink())
+    chunk_size = chunk_size or len(body)
+    for start in range(0, len(body), chunk_size):
+        end = start + chunk_size
+        decoder.feed(body[start:end])
+    return decoder.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024, None])
+def test_decoder_writes_attachments_to_sink(chunk_size):
+    invoices = [
+        {"id": "one", "xml": base64.b64encode(PDF).decode(), "notes": 'a "quoted" \\ pdf:'},
+        {
+            "id": "two",
+            "xml": None,
+            "pdf": "",
+            "sender": {"xml": base64.b64encode(b"<x/>").decode()},
+        },
+    ]
+    body = json.dumps(invoices).encode()
+
+    assert decode(body, chunk_size=chunk_size) == [
+        {"id": "one", "xml": PDF, "notes": 'a "quoted" \\ pdf:'},
+        {"id": "two", "xml": None, "pdf": b"", "sender": {"xml": b"<x/>"}},
+    ]
+
+
+def test_decoder_ignores_field_names_outside_keys():
+    body = json.dumps({"pdf": "JVBERg==", "name": "pdf", "tags": ["xml", "pdf"]}).encode()
+
+    assert decode(body, chunk_size=2) == {"pdf": b"%PDF", "name": "pdf", "tags": ["xml", "pdf"]}
+
+
+def test_decoder_unescapes_slashes():
+    encoded = base64.b64encode(PDF).decode().replace("/", "\\/")
+    body = ('{"id": "statement", "pdf": "%s"}' % encoded).encode()
+
+    assert decode(body, chunk_size=5) == {"id": "statement", "pdf": PDF}
+
+
+def test_decoder_aborts_attachments_of_invalid_bodies():
+    sink = MemorySink()
+
+    with pytest.raises(json.JSONDecodeError):
+        decode(b'{"pdf": "JVBERg==", }', sink)
+    with pytest.raises(json.JSONDecodeError):
+        decode(b'{"pdf": "JVBE', sink)
+
+    assert len(sink.aborted) == 2
+
+
+def test_directory_sink_names_files_after_records(tmp_path):
+    body = json.dumps([{"id": "statement", "pdf": base64.b64encode(PDF).decode()}]).encode()
+
+    [statement] = decode(body, DirectorySink(tmp_path), chunk_size=100)
+
+    assert statement["pdf"] == str(tmp_path / "statement.pdf")
+    assert (tmp_path / "statement.pdf").read_bytes() == PDF
+    assert [path.name for path in tmp_path.iterdir()] == ["statement.pdf"]
+
+
+def test_directory_sink_removes_aborted_files(tmp_path):
+    with pytest.raises(json.JSONDecodeError):
+        decode(b'[{"pdf": "JVBERg=="', DirectorySink(tmp_path))
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_statements_create_writes_pdf_to_directory(fake_url, responses, tmp_path):
+    responses.add(
+        responses.POST,
+        f"{fake_url}/api/statements/",
+        json={"id": "statement", "pdf": base64.b64encode(PDF).decode()},
+        status=201,
+    )
+    client = Client("id", "password", fake_url, lazy=True)
+
+    statement = client.Statements.create(
+        "link", "account", "2019", "12", attach_pdf=True, attachments=tmp_path
+    )
+
+    assert statement == {"id": "statement", "pdf": str(tmp_path / "statement.pdf")}
+    assert (tmp_path / "statement.pdf").read_bytes() == PDF
+
+
+def test_attachments_are_not_written_for_errors(fake_url, responses, tmp_path):
+    responses.add(
+        responses.POST,
+        f"{fake_url}/api/tax-returns/",
+        json=[{"code": "login_error"}],
+        status=400,
+    )
+    client = Client("id", "password", fake_url, lazy=True)
+
+    with pytest.raises(RequestError):
+        client.TaxReturns.create(
+            "link", attach_pdf=True, attachments=tmp_path, raise_exception=True
+        )
+
+    assert client.TaxReturns.create("link", attach_pdf=True, attachments=tmp_path) == [
+        {"code": "login_error"}
+    ]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_async_invoices_create_writes_xml_to_directory(run_async, async_transport, tmp_path):
+    async_transport.routes[("POST", "/api/invoices/", None)] = (
+        201,
+        [{"id": "invoice", "xml": base64.b64encode(b"<cfdi/>").decode()}],
+    )
+
+    async def create():
+        client = AsyncClient("a", "b", "http://fake.url", lazy=True, transport=async_transport)
+        async with client:
+            return await client.Invoices.create(
+                "link", "2019-10-01", "2019-11-30", "INFLOW", attach_xml=True, attachments=tmp_path
+            )
+
+    assert run_async(create()) == [{"id": "invoice", "xml": str(tmp_path / "invoice.xml")}]
+    assert (tmp_path / "invoice.xml").read_bytes() == b"<cfdi/>"
@@ -57,3 +57,14 @@ def test_balances_create_sends_account_if_given(api_session):
         },
         raise_exception=False,
     )
+
+
+def test_balances_create_in_windows(api_session):
+    balances = resources.Balances(api_session)
+    balances.session.post = MagicMock(
+        side_effect=lambda endpoint, data, **kwargs: [{"id": data["date_to"]}]
+    )
+
+    result = balances.create("fake-link-uuid", "2020-01-01", date_to="2020-01-20", window="week")
+
+    assert result == [{"id": "2020-01-07"}, {"id": "2020-01-14"}, {"id": "2020-01-20"}]
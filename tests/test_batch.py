@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from belvo import resources
+from belvo.batch import run_batch, run_batch_async
+from belvo.client import AsyncClient
+from belvo.exceptions import RequestError
+
+
+def test_run_batch_returns_results_in_input_order():
+    def call(value):
+        time.sleep(0.01 * (3 - value))
+        return value * 2
+
+    result = run_batch(call, [0, 1, 2], concurrency=3)
+
+    assert result.results == [0, 2, 4]
+    assert [item.index for item in result] == [0, 1, 2]
+
+
+def test_run_batch_returns_results_as_they_complete_when_not_ordered():
+    def call(value):
+        time.sleep(0.02 * (3 - value))
+        return value
+
+    seen = []
+    result = run_batch(call, [0, 1, 2], concurrency=3, ordered=False, on_result=seen.append)
+
+    assert result.results == [2, 1, 0]
+    assert seen == list(result)
+
+
+def test_run_batch_captures_errors_instead_of_aborting():
+    def call(value):
+        if value == 1:
+            raise ValueError("boom")
+        return value
+
+    result = run_batch(call, [0, 1, 2])
+
+    assert result.succeeded == 2
+    assert result.failed == 1
+    assert str(result[1].error) == "boom"
+    assert result.results == [0, None, 2]
+    assert result.throughput > 0
+
+
+def test_run_batch_accepts_dicts_and_tuples_of_arguments_and_common_kwargs():
+    def call(link, date_from=None, save_data=True):
+        return (link, date_from, save_data)
+
+    result = run_batch(
+        call, [{"link": "a", "date_from": "2020-01-01"}, ("b", "2020-02-01")], save_data=False
+    )
+
+    assert result.results == [("a", "2020-01-01", False), ("b", "2020-02-01", False)]
+
+
+def test_run_batch_never_exceeds_concurrency():
+    lock = threading.Lock()
+    running = []
+    peak = []
+
+    def call(value):
+        with lock:
+            running.append(value)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(value)
+
+    run_batch(call, range(10), concurrency=3)
+
+    assert max(peak) <= 3
+
+
+def test_run_batch_async_never_exceeds_concurrency_and_keeps_order(run_async):
+    running = []
+    peak = []
+
+    async def call(value):
+        running.append(value)
+        peak.append(len(running))
+        await asyncio.sleep(0.01 * (5 - value))
+        running.remove(value)
+        return value
+
+    result = run_async(run_batch_async(call, range(5), concurrency=2))
+
+    assert result.results == [0, 1, 2, 3, 4]
+    assert max(peak) <= 2
+
+
+def test_create_many_captures_failed_links(responses, api_session):
+    def callback(request):
+        link = json.loads(request.body)["link"]
+        if link == "bad-link":
+            return 400, {}, json.dumps([{"code": "invalid", "message": "Invalid link"}])
+        return 201, {}, json.dumps([{"id": f"{link}-account"}])
+
+    responses.add_callback(
+        responses.POST, "http://fake.url/api/accounts/", callback=callback, content_type="json"
+    )
+    accounts = resources.Accounts(api_session)
+
+    result = accounts.create_many(["link-1", "bad-link", "link-2"], save_data=False)
+
+    assert result.results == [[{"id": "link-1-account"}], None, [{"id": "link-2-account"}]]
+    assert isinstance(result[1].error, RequestError)
+    assert result.failed == 1
+
+
+def test_create_many_runs_on_async_client(run_async, async_transport):
+    async_transport.routes[("GET", "/api/", None)] = (200, {})
+    async_transport.routes[("POST", "/api/accounts/", None)] = (201, [{"id": "account"}])
+
+    async def run():
+        async with AsyncClient("a", "b", "http://fake.url", transport=async_transport) as client:
+            return await client.Accounts.create_many(["link-1", "link-2"], concurrency=2)
+
+    result = run_async(run())
+
+    assert result.results == [[{"id": "account"}], [{"id": "account"}]]
+
+
+def test_create_many_is_not_available_without_create(api_session):
+    with pytest.raises(ValueError, match="Institutions can not be created."):
+        resources.Institutions(api_session).create_many([{}])
@@ -0,0 +1,58 @@
+from belvo.cache import CacheEntry, ResponseCache
+
+
+def _entry(endpoint="/api/institutions/", expires_at=0.0, **kwargs):
+    return CacheEntry(endpoint, b"{}", expires_at, **kwargs)
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = ResponseCache(maxsize=2, ttl=60)
+    cache.set("one", _entry())
+    cache.set("two", _entry())
+    cache.get("one")
+
+    cache.set("three", _entry())
+
+    assert cache.get("one") is not None
+    assert cache.get("two") is None
+    assert cache.get("three") is not None
+
+
+def test_cache_uses_endpoint_ttls_and_skips_other_endpoints_by_default():
+    cache = ResponseCache(ttls={"/api/institutions/": 3600})
+
+    assert cache.ttl_for("/api/institutions/") == 3600
+    assert cache.ttl_for("/api/transactions/") is None
+
+
+def test_cache_invalidates_a_single_endpoint_or_everything():
+    cache = ResponseCache(ttl=60)
+    cache.set("institutions", _entry("/api/institutions/"))
+    cache.set("links", _entry("/api/links/"))
+
+    cache.invalidate("/api/institutions/")
+    assert cache.get("institutions") is None
+    assert cache.get("links") is not None
+
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_cache_refresh_makes_entry_fresh_again():
+    cache = ResponseCache(ttls={"/api/institutions/": 60})
+    entry = _entry()
+    assert not entry.is_fresh
+
+    cache.refresh(entry)
+
+    assert entry.is_fresh
+
+
+def test_cache_entry_validators():
+    entry = _entry(etag='"abc"', last_modified="Wed, 21 Oct 2015 07:28:00 GMT")
+
+    assert entry.validators() == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+    assert _entry().validators() == {}
@@ -0,0 +1,155 @@
+import httpx
+import pytest
+from requests import HTTPError
+
+from belvo.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, by_institution
+from belvo.client import AsyncClient, Client
+from belvo.exceptions import CircuitOpenError
+from belvo.simulator import Simulator, constant
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_circuit_opens_when_failure_rate_is_reached(clock):
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4, clock=clock)
+
+    for status in (200, 500, 200):
+        breaker.before_request("/api/transactions/")
+        breaker.after_request("/api/transactions/", 0.1, status)
+    assert breaker.state("/api/transactions/") == CLOSED
+
+    breaker.after_request("/api/transactions/", 0.1)
+    assert breaker.state("/api/transactions/") == OPEN
+    assert breaker.state("/api/accounts/") == CLOSED
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_request("/api/transactions/")
+    assert exc.value.circuit == "/api/transactions/"
+    assert exc.value.retry_after == 30.0
+
+
+def test_circuit_opens_when_slow_call_rate_is_reached(clock):
+    breaker = CircuitBreaker(
+        slow_call_duration=2.0, slow_call_rate=0.5, window=2, min_calls=2, clock=clock
+    )
+
+    breaker.after_request("/api/transactions/", 1.0, 200)
+    breaker.after_request("/api/transactions/", 3.0, 200)
+
+    assert breaker.state("/api/transactions/") == OPEN
+
+
+def test_half_open_circuit_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(window=1, min_calls=1, reset_timeout=10, clock=clock)
+    breaker.after_request("/api/links/", 0.1, 503)
+
+    clock.now = 10
+    assert breaker.state("/api/links/") == HALF_OPEN
+    breaker.before_request("/api/links/")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("/api/links/")
+
+    breaker.after_request("/api/links/", 0.1, 503)
+    assert breaker.state("/api/links/") == OPEN
+
+    clock.now = 20
+    breaker.before_request("/api/links/")
+    breaker.after_request("/api/links/", 0.1, 201)
+    assert breaker.state("/api/links/") == CLOSED
+    breaker.before_request("/api/links/")
+
+
+def test_half_open_circuit_gives_up_lost_trials(clock):
+    breaker = CircuitBreaker(window=1, min_calls=1, reset_timeout=10, clock=clock)
+    breaker.after_request("/api/links/", 0.1)
+
+    clock.now = 10
+    breaker.before_request("/api/links/")
+    clock.now = 20
+    breaker.before_request("/api/links/")
+
+
+def test_circuits_by_institution():
+    key = by_institution({"link-id": "erebor_mx_retail"})
+
+    assert key("/api/links/", {"institution": "gringotts_mx_retail"}) == (
+        "/api/links/",
+        "gringotts_mx_retail",
+    )
+    assert key("/api/transactions/", {"link": "link-id"}) == (
+        "/api/transactions/",
+        "erebor_mx_retail",
+    )
+    assert key("/api/transactions/", {"link": "other"}) == "/api/transactions/"
+
+
+def test_circuit_breaker_rejects_invalid_settings():
+    with pytest.raises(ValueError):
+        CircuitBreaker(failure_rate=0)
+    with pytest.raises(ValueError):
+        CircuitBreaker(window=5, min_calls=10)
+
+
+@pytest.fixture
+def simulator():
+    with Simulator(error_rate={"/api/transactions/": 1.0, "*": 0.0}) as simulator:
+        yield simulator
+
+
+def test_session_fails_fast_while_circuit_is_open(simulator, responses):
+    responses.add_passthru(simulator.url)
+    breaker = CircuitBreaker(window=3, min_calls=3)
+    client = Client("id", "password", simulator.url, circuit_breaker=breaker)
+
+    for _ in range(3):
+        with pytest.raises(HTTPError):
+            list(client.Transactions.list())
+    with pytest.raises(CircuitOpenError):
+        list(client.Transactions.list())
+
+    assert simulator.request_count("GET", "/api/transactions/") == 3
+    assert len(list(client.Accounts.list())) == 2
+    assert breaker.state("/api/transactions/") == OPEN
+
+
+def test_session_opens_circuits_of_slow_institutions(responses):
+    with Simulator(latency={"/api/links/": constant(0.05), "*": None}) as simulator:
+        responses.add_passthru(simulator.url)
+        breaker = CircuitBreaker(
+            slow_call_duration=0.04, window=1, min_calls=1, key=by_institution()
+        )
+        client = Client("id", "password", simulator.url, circuit_breaker=breaker)
+
+        client.Links.create("erebor_mx_retail", "username", "password")
+        with pytest.raises(CircuitOpenError):
+            client.Links.create("erebor_mx_retail", "username", "password")
+
+        assert breaker.state(("/api/links/", "erebor_mx_retail")) == OPEN
+        assert breaker.state(("/api/links/", "gringotts_mx_retail")) == CLOSED
+
+
+def test_async_session_fails_fast_while_circuit_is_open(run_async, simulator):
+    breaker = CircuitBreaker(window=2, min_calls=2)
+    account = simulator.data["accounts"][0]["id"]
+
+    async def main():
+        async with AsyncClient("id", "password", simulator.url, circuit_breaker=breaker) as client:
+            for _ in range(2):
+                with pytest.raises(httpx.HTTPStatusError):
+                    [transaction async for transaction in client.Transactions.list()]
+            with pytest.raises(CircuitOpenError):
+                [transaction async for transaction in client.Transactions.list()]
+            return await client.Accounts.get(account)
+
+    assert run_async(main())["id"] == account
+    assert simulator.request_count("GET", "/api/transactions/") == 2
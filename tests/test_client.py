@@ -1,9 +1,11 @@
 import os
+import subprocess
+import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from belvo.client import Client
+from belvo.client import AsyncClient, Client
 from belvo.exceptions import BelvoAPIException
 
 
@@ -47,7 +49,7 @@ def test_client_resources_uses_same_session_as_client(resource_name):
 
 
 def test_client_passes_params_as_querystring_when_given(api_session):
-    api_session.session.get = MagicMock()
+    api_session.session.get = MagicMock(return_value=MagicMock(content=b"{}"))
     api_session.get("/api/fake-endpoint/", "fake-id", params={"foo": "bar"})
 
     api_session.session.get.assert_called_with(
@@ -94,3 +96,104 @@ def test_client_url_is_ok_when_environment_is_set_as_variable_variable(
         client = Client("secret-key", "secret-password")
 
     assert client.session.url == expected_url
+
+
+def test_async_client_logs_in_when_entering_context_and_awaits_resources(
+    run_async, async_transport
+):
+    async_transport.routes[("GET", "/api/", None)] = (200, {})
+    async_transport.routes[("GET", "/api/accounts/fake-id/", None)] = (200, {"id": "fake-id"})
+
+    async def run():
+        async with AsyncClient("a", "b", "http://fake.url", transport=async_transport) as client:
+            return await client.Accounts.get("fake-id")
+
+    assert run_async(run()) == {"id": "fake-id"}
+
+
+def test_async_client_will_raise_exception_when_login_has_failed(run_async, async_transport):
+    async_transport.routes[("GET", "/api/", None)] = (401, {"detail": "Unauthorized."})
+
+    async def run():
+        async with AsyncClient("a", "b", "http://fake.url", transport=async_transport):
+            pass
+
+    with pytest.raises(BelvoAPIException) as exc:
+        run_async(run())
+
+    assert str(exc.value) == "Login failed."
+
+
+@pytest.mark.usefixtures("authorized_response")
+def test_client_passes_session_options_to_api_session():
+    c = Client(secret_key_id="a", secret_key_password="b", url="http://fake.url", pool_maxsize=30)
+
+    assert c.session.session.get_adapter("http://fake.url")._pool_maxsize == 30
+
+
+def test_lazy_client_does_not_login_on_creation(responses):
+    Client(secret_key_id="a", secret_key_password="b", url="http://fake.url", lazy=True)
+
+    assert len(responses.calls) == 0
+
+
+def test_lazy_client_raises_login_failed_when_first_request_is_unauthorized(responses):
+    responses.add(
+        responses.GET,
+        "http://fake.url/api/accounts/fake-id/",
+        json={"detail": "Unauthorized."},
+        status=401,
+    )
+    c = Client(secret_key_id="a", secret_key_password="b", url="http://fake.url", lazy=True)
+
+    with pytest.raises(BelvoAPIException) as exc:
+        c.Accounts.get("fake-id")
+
+    assert str(exc.value) == "Login failed."
+
+
+@pytest.mark.usefixtures("unauthorized_response")
+def test_lazy_client_verify_raises_exception_when_credentials_are_invalid():
+    c = Client(secret_key_id="a", secret_key_password="b", url="http://fake.url", lazy=True)
+
+    with pytest.raises(BelvoAPIException) as exc:
+        c.verify()
+
+    assert str(exc.value) == "Login failed."
+
+
+def test_lazy_async_client_does_not_login_when_entering_context(run_async, async_transport):
+    async_transport.routes[("GET", "/api/accounts/fake-id/", None)] = (401, {})
+
+    async def run():
+        async with AsyncClient(
+            "a", "b", "http://fake.url", lazy=True, transport=async_transport
+        ) as client:
+            await client.Accounts.get("fake-id")
+
+    with pytest.raises(BelvoAPIException) as exc:
+        run_async(run())
+
+    assert str(exc.value) == "Login failed."
+
+
+def test_client_can_be_used_without_httpx():
+    script = "\n".join(
+        [
+            "import sys",
+            "sys.modules['httpx'] = None",
+            "from belvo.client import AsyncClient, Client",
+            "from belvo.exceptions import BelvoAPIException",
+            "try:",
+            "    AsyncClient('a', 'b', 'http://fake.url', lazy=True)",
+            "except BelvoAPIException as exc:",
+            "    print(exc)",
+        ]
+    )
+
+    result = subprocess.run(
+        [sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    assert result.returncode == 0, result.stderr.decode()
+    assert b"AsyncAPISession requires httpx" in result.stdout
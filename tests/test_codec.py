@@ -0,0 +1,32 @@
+import pytest
+
+from belvo import codec
+from belvo.codec import JSONCodec, OrjsonCodec, default_codec
+
+CODECS = [JSONCodec]
+if codec.orjson is not None:
+    CODECS.append(OrjsonCodec)
+
+
+@pytest.mark.parametrize("codec_class", CODECS)
+def test_codec_round_trips_through_bytes(codec_class):
+    data = {"id": "1", "amount": 10.5, "description": "Café", "tags": [None, True]}
+
+    encoded = codec_class().dumps(data)
+
+    assert isinstance(encoded, bytes)
+    assert codec_class().loads(encoded) == data
+
+
+@pytest.mark.parametrize("codec_class", CODECS)
+def test_codec_raises_value_error_on_invalid_json(codec_class):
+    with pytest.raises(ValueError):
+        codec_class().loads(b'{"id": ')
+
+
+def test_default_codec_prefers_orjson(monkeypatch):
+    monkeypatch.setattr(codec, "orjson", None)
+    assert type(default_codec()) is JSONCodec
+
+    with pytest.raises(RuntimeError):
+        OrjsonCodec()
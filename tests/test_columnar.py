@@ -0,0 +1,107 @@
+import math
+
+import pytest
+
+from belvo.columnar import (
+    CATEGORY,
+    DATE,
+    DATETIME,
+    FLOAT,
+    NAT,
+    STRING,
+    ColumnBuilder,
+    _parse_datetime,
+    to_columns,
+)
+
+SCHEMA = {
+    "id": STRING,
+    "account.id": STRING,
+    "value_date": DATE,
+    "collected_at": DATETIME,
+    "amount": FLOAT,
+    "currency": CATEGORY,
+}
+RESULTS = [
+    {
+        "id": "1",
+        "account": {"id": "account-1"},
+        "value_date": "1970-01-02",
+        "collected_at": "1970-01-01T00:00:01.5Z",
+        "amount": 10.5,
+        "currency": "MXN",
+    },
+    {
+        "id": "2",
+        "account": None,
+        "value_date": None,
+        "collected_at": "1970-01-01T01:00:00+01:00",
+        "amount": None,
+        "currency": "BRL",
+    },
+    {"id": "3", "amount": "7", "currency": "MXN"},
+]
+
+
+def test_to_columns_builds_typed_buffers():
+    columns = to_columns(RESULTS, SCHEMA)
+
+    assert len(columns) == 3
+    assert columns.data["id"] == ["1", "2", "3"]
+    assert columns.data["account.id"] == ["account-1", None, None]
+    assert columns.data["value_date"].typecode == "q"
+    assert list(columns.data["value_date"]) == [1, NAT, NAT]
+    assert list(columns.data["collected_at"]) == [1_500_000, 0, NAT]
+    assert columns.data["amount"].typecode == "d"
+    assert columns.data["amount"][0] == 10.5
+    assert math.isnan(columns.data["amount"][1])
+    assert columns.data["amount"][2] == 7.0
+
+
+def test_to_columns_dictionary_encodes_categories():
+    columns = to_columns(RESULTS + [{"currency": None}], SCHEMA)
+
+    assert columns.categories["currency"] == ["MXN", "BRL"]
+    assert list(columns.data["currency"]) == [0, 1, 0, -1]
+
+
+def test_to_columns_consumes_async_generators(run_async):
+    async def results():
+        for result in RESULTS:
+            yield result
+
+    columns = run_async(to_columns(results(), SCHEMA))
+
+    assert columns.data["id"] == ["1", "2", "3"]
+
+
+@pytest.mark.parametrize(
+    "value, kind, expected",
+    [
+        ("2019-10-23", DATE, 18192),
+        ("2019-10-23T13:01:41.941Z", DATE, 18192),
+        ("2019-10-23T00:00:00Z", DATETIME, 18192 * 86_400_000_000),
+        ("2019-10-23T02:30:00+02:30", DATETIME, 18192 * 86_400_000_000),
+        ("2019-10-23 00:00", DATETIME, 18192 * 86_400_000_000),
+        ("23/10/2019", DATE, NAT),
+        (None, DATETIME, NAT),
+    ],
+)
+def test_parse_datetime(value, kind, expected):
+    assert _parse_datetime(value, kind) == expected
+
+
+def test_column_builder_rejects_unknown_kinds():
+    with pytest.raises(ValueError):
+        ColumnBuilder({"amount": "decimal"})
+
+
+def test_columns_to_numpy_shares_typed_arrays():
+    np = pytest.importorskip("numpy")
+
+    arrays = to_columns(RESULTS, SCHEMA).to_numpy()
+
+    assert arrays["amount"].dtype == np.float64
+    assert arrays["value_date"][0] == np.datetime64("1970-01-02")
+    assert np.isnat(arrays["value_date"][1])
+    assert arrays["currency"].tolist() == [0, 1, 0]
@@ -0,0 +1,112 @@
+import gzip
+
+import pytest
+
+from belvo.client import AsyncClient, Client
+from belvo.compression import Compression, TransferStats, httpx_encodings
+from belvo.metrics import MetricsRegistry
+from belvo.simulator import Simulator
+
+
+@pytest.fixture
+def simulator():
+    with Simulator(transactions_per_account=50, compression=True) as simulator:
+        yield simulator
+
+
+def test_accept_encoding_only_lists_supported_codings():
+    assert Compression().accept_encoding(["gzip", "deflate"]) == "gzip, deflate"
+    assert Compression().accept_encoding(["deflate", "br", "zstd"]) == "zstd, br, deflate"
+    assert Compression(encodings=["gzip"]).accept_encoding(["gzip", "br"]) == "gzip"
+    assert Compression(encodings=["br"]).accept_encoding(["gzip"]) == "identity"
+
+
+def test_httpx_encodings_depend_on_installed_packages(monkeypatch):
+    installed = {"brotli"}
+    monkeypatch.setattr("belvo.compression._installed", installed.__contains__)
+    monkeypatch.setattr("httpx.__version__", "0.22.0")
+    assert httpx_encodings() == ("gzip", "deflate", "br")
+
+    installed.add("zstandard")
+    assert httpx_encodings() == ("gzip", "deflate", "br")
+
+    monkeypatch.setattr("httpx.__version__", "0.27.0")
+    assert httpx_encodings() == ("gzip", "deflate", "br", "zstd")
+
+
+def test_compress_only_large_bodies_when_enabled():
+    body = b"x" * 2048
+
+    assert Compression().compress(body) == (body, None)
+    assert Compression(compress_requests=True).compress(b"small") == (b"small", None)
+
+    compressed, encoding = Compression(compress_requests=True).compress(body)
+    assert encoding == "gzip"
+    assert gzip.decompress(compressed) == body
+
+
+def test_transfer_stats_ratio():
+    stats = TransferStats()
+    assert stats.ratio() == 1.0
+
+    stats.record("response", 1000, 200)
+    stats.record("response", 1000, 300)
+    stats.record("request", 100, 100)
+
+    assert stats.raw_bytes() == 2000
+    assert stats.wire_bytes() == 500
+    assert stats.ratio() == 0.25
+    assert stats.ratio("request") == 1.0
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_session_counts_compressed_responses(simulator, responses, stream):
+    responses.add_passthru(simulator.url)
+    compression = Compression()
+    metrics = MetricsRegistry()
+    client = Client("id", "password", simulator.url, compression=compression, metrics=metrics)
+
+    transactions = list(client.Transactions.list(stream=stream))
+
+    assert len(transactions) == 100
+    assert client.session.session.headers["Accept-Encoding"].startswith("gzip")
+    assert 0 < compression.stats.wire_bytes() < compression.stats.raw_bytes() / 2
+    labels = {"direction": "response", "endpoint": "/api/transactions/"}
+    assert metrics.counter("belvo_raw_bytes_total", **labels) > metrics.counter(
+        "belvo_wire_bytes_total", **labels
+    )
+
+
+def test_session_compresses_large_request_bodies(simulator, responses):
+    responses.add_passthru(simulator.url)
+    compression = Compression(compress_requests=True)
+    client = Client("id", "password", simulator.url, compression=compression)
+
+    link = client.Links.create("erebor_mx_retail", "username", "password" * 512)
+
+    assert link["institution"] == "erebor_mx_retail"
+    assert 0 < compression.stats.wire_bytes("request") < compression.stats.raw_bytes("request")
+
+
+def test_session_counts_request_bodies_without_compression(simulator, responses):
+    responses.add_passthru(simulator.url)
+    metrics = MetricsRegistry()
+    client = Client("id", "password", simulator.url, metrics=metrics)
+
+    client.Links.create("erebor_mx_retail", "username", "password")
+
+    labels = {"direction": "request", "endpoint": "/api/links/"}
+    raw = metrics.counter("belvo_raw_bytes_total", **labels)
+    assert raw > 0
+    assert metrics.counter("belvo_wire_bytes_total", **labels) == raw
+
+
+def test_async_session_counts_compressed_responses(run_async, simulator):
+    compression = Compression()
+
+    async def consume():
+        async with AsyncClient("id", "password", simulator.url, compression=compression) as client:
+            return [transaction async for transaction in client.Transactions.list()]
+
+    assert len(run_async(consume())) == 100
+    assert 0 < compression.stats.wire_bytes() < compression.stats.raw_bytes() / 2
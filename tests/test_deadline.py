@@ -0,0 +1,170 @@
+import time
+
+import httpx
+import pytest
+from requests.exceptions import ReadTimeout
+
+from belvo.client import AsyncClient, Client
+from belvo.deadline import Deadline, Timeouts
+from belvo.exceptions import DeadlineExceeded
+from belvo.retry import RetryPolicy
+from belvo.simulator import Simulator, constant
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_limits_timeouts():
+    clock = Clock()
+    deadline = Deadline(10, clock=clock)
+
+    clock.now = 4
+    assert deadline.remaining() == 6
+    assert deadline.limit(None) == 6
+    assert deadline.limit(5) == 5
+    assert deadline.limit((3, None)) == (3, 6)
+
+    clock.now = 11
+    assert deadline.expired
+    assert deadline.limit((3, 30)) == (0, 0)
+
+
+def test_deadline_must_be_positive():
+    with pytest.raises(ValueError):
+        Deadline(0)
+
+
+def test_timeouts_by_endpoint():
+    timeouts = Timeouts(2, 10, endpoints={"/api/transactions/": (2, 60)})
+
+    assert timeouts.for_endpoint("/api/accounts/") == (2, 10)
+    assert timeouts.for_endpoint("/api/transactions/") == (2, 60)
+
+
+def test_deadline_exceeded_reports_progress():
+    exc = DeadlineExceeded(30, "/api/transactions/", pages=3, results=300)
+
+    assert (
+        str(exc) == "Deadline of 30s exceeded for /api/transactions/ after 3 pages and 300 results."
+    )
+    assert str(DeadlineExceeded(1.5, "/api/links/")) == "Deadline of 1.5s exceeded for /api/links/."
+
+
+@pytest.fixture
+def simulator():
+    with Simulator(
+        transactions_per_account=50,
+        page_size=10,
+        latency={"/api/transactions/": constant(0.05), "*": None},
+    ) as simulator:
+        yield simulator
+
+
+@pytest.fixture
+def client(simulator, responses):
+    responses.add_passthru(simulator.url)
+    return Client("id", "password", simulator.url)
+
+
+@pytest.mark.parametrize("options", [{}, {"prefetch": 2}, {"stream": True}])
+def test_list_stops_at_deadline(client, options):
+    received = []
+
+    with pytest.raises(DeadlineExceeded) as exc:
+        for transaction in client.Transactions.list(deadline=0.12, **options):
+            received.append(transaction)
+
+    assert exc.value.endpoint == "/api/transactions/"
+    assert 1 <= exc.value.pages < 10
+    assert exc.value.results == len(received)
+
+
+def test_list_within_deadline(client):
+    assert len(list(client.Transactions.list(deadline=5))) == 100
+
+
+def test_deadline_covers_retries(responses):
+    with Simulator(error_rate={"/api/links/": 1.0, "*": 0.0}) as simulator:
+        responses.add_passthru(simulator.url)
+        retry = RetryPolicy(10, backoff_factor=0.1, jitter=False, retry_non_idempotent=True)
+        client = Client("id", "password", simulator.url, retry=retry)
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            client.session.post("/api/links/", {"institution": "erebor_mx_retail"}, deadline=0.5)
+
+        assert time.monotonic() - started < 0.5
+        assert simulator.request_count("POST", "/api/links/") < 10
+
+
+def test_timeouts_by_endpoint_apply_to_writes(responses):
+    with Simulator(latency={"/api/links/": constant(0.2), "*": None}) as simulator:
+        responses.add_passthru(simulator.url)
+        timeouts = Timeouts(endpoints={"/api/links/": (1, 0.05)})
+        client = Client("id", "password", simulator.url, timeouts=timeouts)
+
+        with pytest.raises(ReadTimeout):
+            client.Links.create("erebor_mx_retail", "username", "password")
+        assert len(list(client.Accounts.list())) == 2
+
+
+def test_async_list_stops_at_deadline(run_async, simulator):
+    received = []
+
+    async def main():
+        async with AsyncClient("id", "password", simulator.url) as client:
+            async for transaction in client.Transactions.list(deadline=0.12):
+                received.append(transaction)
+
+    with pytest.raises(DeadlineExceeded) as exc:
+        run_async(main())
+
+    assert 1 <= exc.value.pages < 10
+    assert exc.value.results == len(received)
+
+
+def test_async_timeouts_by_endpoint(run_async, responses):
+    with Simulator(latency={"/api/links/": constant(0.2), "*": None}) as simulator:
+        timeouts = Timeouts(endpoints={"/api/links/": (1, 0.05)})
+
+        async def main():
+            async with AsyncClient("id", "password", simulator.url, timeouts=timeouts) as client:
+                await client.Links.create("erebor_mx_retail", "username", "password")
+
+        with pytest.raises(httpx.ReadTimeout):
+            run_async(main())
+
+
+def test_timeouts_by_endpoint_apply_to_login_and_deletes(responses):
+    latency = {"/api/": constant(0.2), "/api/links/": constant(0.2), "*": None}
+    with Simulator(latency=latency) as simulator:
+        responses.add_passthru(simulator.url)
+
+        with pytest.raises(ReadTimeout):
+            Client(
+                "id", "password", simulator.url, timeouts=Timeouts(endpoints={"/api/": (1, 0.05)})
+            )
+
+        timeouts = Timeouts(endpoints={"/api/links/": (1, 0.05)})
+        client = Client("id", "password", simulator.url, timeouts=timeouts)
+        with pytest.raises(ReadTimeout):
+            client.Links.delete("link-id")
+
+
+def test_get_stops_at_deadline(responses):
+    with Simulator(latency={"/api/accounts/": constant(0.2), "*": None}) as simulator:
+        responses.add_passthru(simulator.url)
+        client = Client("id", "password", simulator.url)
+        account = simulator.data["accounts"][0]["id"]
+
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            client.Accounts.get(account, deadline=0.05)
+        assert time.monotonic() - started < 0.2
+
+        assert client.Accounts.get(account, deadline=5)["id"] == account
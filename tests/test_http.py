@@ -1,8 +1,20 @@
+import base64
+import json
+import socket
+
+import httpx
 import pytest
+from requests.exceptions import ConnectionError, HTTPError, TooManyRedirects
 
 from belvo import __version__
-from belvo.exceptions import RequestError
-from belvo.http import APISession
+from belvo.cache import ResponseCache
+from belvo.codec import JSONCodec
+from belvo.exceptions import BelvoAPIException, RequestError
+from belvo.http import APISession, AsyncAPISession, PoolAdapter
+from belvo.metrics import MetricsRegistry
+from belvo.ratelimit import InMemoryRateLimiter
+from belvo.retry import RetryPolicy
+from belvo.tracing import InMemoryExporter, Tracer
 
 
 @pytest.mark.parametrize("wrong_http_code", [400, 401, 403, 500])
@@ -168,3 +180,683 @@ def test_patch_doesnt_raise_exception_on_error_by_default(responses, fake_url):
 
     assert result == [{"code": "unsupported", "message": "Wait, that's illegal!"}]
     assert responses.calls[0].request.headers["Content-Type"] == "application/json"
+
+
+def test_async_session_list_yields_all_results_when_response_contains_next_page(
+    run_async, fake_url, async_transport
+):
+    async_transport.routes[("GET", "/api/resources/", None)] = (
+        200,
+        {"next": f"{fake_url}/api/resources/?page=2", "count": 4, "results": ["one", "two"]},
+    )
+    async_transport.routes[("GET", "/api/resources/", "page=2")] = (
+        200,
+        {"next": None, "count": 4, "results": ["three", "four"]},
+    )
+    session = AsyncAPISession(fake_url, transport=async_transport)
+
+    async def consume():
+        return [result async for result in session.list("/api/resources/")]
+
+    assert run_async(consume()) == ["one", "two", "three", "four"]
+
+
+def test_async_session_post_raises_exception_on_error_if_raises_exception_is_true(
+    run_async, fake_url, async_transport
+):
+    async_transport.routes[("POST", "/fake-resource/", None)] = (
+        400,
+        [{"code": "unsupported", "message": "Wait, that's illegal!"}],
+    )
+    session = AsyncAPISession(fake_url, transport=async_transport)
+
+    with pytest.raises(RequestError) as exc:
+        run_async(session.post("/fake-resource/", {}, raise_exception=True))
+
+    assert exc.value.status_code == 400
+    assert exc.value.detail == [{"code": "unsupported", "message": "Wait, that's illegal!"}]
+
+
+@pytest.mark.parametrize("wrong_http_code", [400, 401, 403, 500])
+def test_async_session_delete_returns_false_when_bad_response(
+    run_async, wrong_http_code, fake_url, async_transport
+):
+    async_transport.routes[("DELETE", "/api/resource/666/", None)] = (wrong_http_code, {})
+    session = AsyncAPISession(fake_url, transport=async_transport)
+
+    assert not run_async(session.delete("/api/resource/", 666))
+
+
+@pytest.mark.parametrize("prefetch", [1, 2, 5])
+def test_list_with_prefetch_shards_pages_using_count_and_yields_in_order(
+    prefetch, responses, fake_url, api_session
+):
+    resource_url = "{}/api/resources/".format(fake_url)
+    for page in range(1, 5):
+        responses.add(
+            responses.GET,
+            resource_url if page == 1 else "{}?link=fake&page={}".format(resource_url, page),
+            json={
+                "next": "{}?link=fake&page={}".format(resource_url, page + 1) if page < 4 else None,
+                "count": 7,
+                "results": [page * 10 + 1, page * 10 + 2] if page < 4 else [41],
+            },
+            status=200,
+            match_querystring=page > 1,
+        )
+
+    results = list(api_session.list("/api/resources/", params={"link": "fake"}, prefetch=prefetch))
+
+    assert results == [11, 12, 21, 22, 31, 32, 41]
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_list_with_prefetch_starts_from_the_requested_page(
+    prefetch, responses, fake_url, api_session
+):
+    resource_url = "{}/api/resources/".format(fake_url)
+    for page in range(3, 5):
+        responses.add(
+            responses.GET,
+            "{}?link=fake&page={}".format(resource_url, page),
+            json={
+                "next": "{}?link=fake&page={}".format(resource_url, page + 1) if page < 4 else None,
+                "count": 7,
+                "results": [page * 10 + 1, page * 10 + 2] if page < 4 else [41],
+            },
+            status=200,
+            match_querystring=True,
+        )
+
+    results = list(
+        api_session.list("/api/resources/", params={"link": "fake", "page": 3}, prefetch=prefetch)
+    )
+
+    assert results == [31, 32, 41]
+
+
+def test_list_with_prefetch_follows_next_when_pages_can_not_be_computed(
+    responses, fake_url, api_session
+):
+    resource_url = "{}/api/resources/".format(fake_url)
+    responses.add(
+        responses.GET,
+        resource_url,
+        json={"next": "{}?cursor=abc".format(resource_url), "results": ["one", "two"]},
+        status=200,
+        match_querystring=True,
+    )
+    responses.add(
+        responses.GET,
+        "{}?cursor=abc".format(resource_url),
+        json={"next": None, "results": ["three"]},
+        status=200,
+        match_querystring=True,
+    )
+
+    results = list(api_session.list("/api/resources/", prefetch=2))
+
+    assert results == ["one", "two", "three"]
+
+
+def test_async_session_list_with_prefetch_yields_in_order(run_async, fake_url, async_transport):
+    for page in range(1, 4):
+        async_transport.routes[("GET", "/api/resources/", f"page={page}" if page > 1 else None)] = (
+            200,
+            {
+                "next": f"{fake_url}/api/resources/?page={page + 1}" if page < 3 else None,
+                "count": 6,
+                "results": [page * 10 + 1, page * 10 + 2],
+            },
+        )
+    session = AsyncAPISession(fake_url, transport=async_transport)
+
+    async def consume():
+        return [result async for result in session.list("/api/resources/", prefetch=2)]
+
+    assert run_async(consume()) == [11, 12, 21, 22, 31, 32]
+
+
+def test_session_mounts_pool_adapter_with_given_pool_settings(fake_url):
+    session = APISession(fake_url, pool_maxsize=50, pool_block=True, keepalive_idle=30)
+    adapter = session.session.get_adapter("https://api.belvo.com/api/")
+
+    assert isinstance(adapter, PoolAdapter)
+    assert adapter._pool_maxsize == 50
+    assert adapter._pool_block is True
+    assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in adapter.poolmanager.connection_pool_kw[
+        "socket_options"
+    ]
+
+
+def test_sessions_can_share_the_same_connection_pool(fake_url):
+    adapter = PoolAdapter(pool_maxsize=20)
+    session_one = APISession(fake_url, adapter=adapter)
+    session_two = APISession(fake_url, adapter=adapter)
+
+    assert session_one.session.get_adapter(fake_url) is session_two.session.get_adapter(fake_url)
+
+
+def test_get_retries_retryable_status_codes(responses, fake_url):
+    url = "{}/api/resources/some-id/".format(fake_url)
+    responses.add(responses.GET, url, json={}, status=503)
+    responses.add(responses.GET, url, json={}, status=429, headers={"Retry-After": "0"})
+    responses.add(responses.GET, url, json={"id": "some-id"}, status=200)
+    session = APISession(fake_url, retry=RetryPolicy(max_attempts=3, backoff_factor=0))
+
+    assert session.get("/api/resources/", "some-id") == {"id": "some-id"}
+    assert len(responses.calls) == 3
+
+
+def test_post_is_not_retried_on_server_errors(responses, fake_url):
+    responses.add(responses.POST, "{}/fake-resource/".format(fake_url), json={}, status=500)
+    session = APISession(fake_url, retry=RetryPolicy(max_attempts=3, backoff_factor=0))
+
+    with pytest.raises(RequestError):
+        session.post("/fake-resource/", {}, raise_exception=True)
+
+    assert len(responses.calls) == 1
+
+
+def test_post_is_retried_when_throttled(responses, fake_url):
+    url = "{}/fake-resource/".format(fake_url)
+    responses.add(responses.POST, url, json={}, status=429)
+    responses.add(responses.POST, url, json={"id": "created"}, status=201)
+    session = APISession(fake_url, retry=RetryPolicy(max_attempts=3, backoff_factor=0))
+
+    assert session.post("/fake-resource/", {}) == {"id": "created"}
+
+
+def test_get_retries_connection_errors(responses, fake_url):
+    url = "{}/api/resources/some-id/".format(fake_url)
+    responses.add(responses.GET, url, body=ConnectionError("Connection reset by peer"))
+    responses.add(responses.GET, url, json={"id": "some-id"}, status=200)
+    session = APISession(fake_url, retry=RetryPolicy(max_attempts=2, backoff_factor=0))
+
+    assert session.get("/api/resources/", "some-id") == {"id": "some-id"}
+
+
+def test_list_retries_only_the_failed_page(responses, fake_url, api_session):
+    resource_url = "{}/api/resources/".format(fake_url)
+    responses.add(
+        responses.GET,
+        resource_url,
+        json={"next": "{}?page=2".format(resource_url), "results": ["one", "two"]},
+        status=200,
+        match_querystring=True,
+    )
+    responses.add(
+        responses.GET, "{}?page=2".format(resource_url), status=502, match_querystring=True
+    )
+    responses.add(
+        responses.GET,
+        "{}?page=2".format(resource_url),
+        json={"next": None, "results": ["three"]},
+        status=200,
+        match_querystring=True,
+    )
+    api_session._retry = RetryPolicy(max_attempts=2, backoff_factor=0)
+
+    results = list(api_session.list("/api/resources/"))
+
+    assert results == ["one", "two", "three"]
+    assert [call.request.url for call in responses.calls[1:]] == [
+        resource_url,
+        "{}?page=2".format(resource_url),
+        "{}?page=2".format(resource_url),
+    ]
+
+
+def test_async_session_retries_retryable_status_codes(run_async, fake_url):
+    statuses = [503, 200]
+
+    def handler(request):
+        return httpx.Response(statuses.pop(0), json={"id": "some-id"})
+
+    session = AsyncAPISession(
+        fake_url,
+        transport=httpx.MockTransport(handler),
+        retry=RetryPolicy(max_attempts=2, backoff_factor=0),
+    )
+
+    assert run_async(session.get("/api/resources/", "some-id")) == {"id": "some-id"}
+    assert statuses == []
+
+
+def test_session_waits_for_rate_limiter_before_each_request(responses, fake_url, monkeypatch):
+    url = "{}/api/resources/some-id/".format(fake_url)
+    responses.add(responses.GET, url, json={}, status=200)
+    sleeps = []
+    monkeypatch.setattr("belvo.http.time.sleep", sleeps.append)
+    session = APISession(fake_url, rate_limiter=InMemoryRateLimiter(rate=1, burst=1))
+
+    session.get("/api/resources/", "some-id")
+    session.get("/api/resources/", "some-id")
+
+    assert len(sleeps) == 1 and 0 < sleeps[0] <= 1
+
+
+def test_lazy_login_sets_credentials_without_requests(responses, fake_url):
+    session = APISession(fake_url)
+
+    assert session.login(secret_key_id="monty", secret_key_password="python", lazy=True)
+    assert session.key_id == "monty"
+    assert len(responses.calls) == 0
+
+
+def test_lazy_login_only_checks_credentials_on_first_response(responses, fake_url):
+    url = "{}/api/resources/some-id/".format(fake_url)
+    responses.add(responses.GET, url, json={"id": "some-id"}, status=200)
+    responses.add(responses.GET, url, json={"detail": "Unauthorized."}, status=401)
+    session = APISession(fake_url)
+    session.login(secret_key_id="monty", secret_key_password="python", lazy=True)
+
+    session.get("/api/resources/", "some-id")
+
+    with pytest.raises(HTTPError):
+        session.get("/api/resources/", "some-id")
+
+
+def test_list_with_stream_yields_results_of_all_pages(responses, fake_url, api_session):
+    resource_url = "{}/api/resources/".format(fake_url)
+    responses.add(
+        responses.GET,
+        resource_url,
+        json={"results": [{"id": 1}, {"id": 2}], "next": "{}?page=2".format(resource_url)},
+        status=200,
+        match_querystring=True,
+    )
+    responses.add(
+        responses.GET,
+        "{}?page=2".format(resource_url),
+        json={"results": [{"id": 3}], "next": None},
+        status=200,
+        match_querystring=True,
+    )
+
+    results = list(api_session.list("/api/resources/", stream=True))
+
+    assert results == [{"id": 1}, {"id": 2}, {"id": 3}]
+
+
+def test_list_can_not_stream_and_prefetch_at_the_same_time(api_session):
+    with pytest.raises(ValueError):
+        list(api_session.list("/api/resources/", stream=True, prefetch=2))
+
+
+def test_async_session_list_with_stream_yields_results_of_all_pages(
+    run_async, fake_url, async_transport
+):
+    async_transport.routes[("GET", "/api/resources/", None)] = (
+        200,
+        {"next": f"{fake_url}/api/resources/?page=2", "results": ["one", "two"]},
+    )
+    async_transport.routes[("GET", "/api/resources/", "page=2")] = (
+        200,
+        {"next": None, "results": ["three"]},
+    )
+    session = AsyncAPISession(fake_url, transport=async_transport)
+
+    async def consume():
+        return [result async for result in session.list("/api/resources/", stream=True)]
+
+    assert run_async(consume()) == ["one", "two", "three"]
+
+
+def test_cached_get_is_served_from_cache_while_fresh(responses, fake_url):
+    url = "{}/api/institutions/banamex/".format(fake_url)
+    responses.add(responses.GET, url, json={"name": "banamex"}, status=200)
+    session = APISession(fake_url, cache=ResponseCache(ttls={"/api/institutions/": 60}))
+
+    first = session.get("/api/institutions/", "banamex")
+    first["name"] = "modified by the caller"
+
+    assert session.get("/api/institutions/", "banamex") == {"name": "banamex"}
+    assert len(responses.calls) == 1
+
+
+def test_cached_get_is_revalidated_with_etag_once_stale(responses, fake_url):
+    url = "{}/api/institutions/banamex/".format(fake_url)
+    responses.add(
+        responses.GET, url, json={"name": "banamex"}, status=200, headers={"ETag": '"v1"'}
+    )
+    responses.add(responses.GET, url, status=304)
+    session = APISession(fake_url, cache=ResponseCache(ttls={"/api/institutions/": 0}))
+
+    session.get("/api/institutions/", "banamex")
+
+    assert session.get("/api/institutions/", "banamex") == {"name": "banamex"}
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+
+
+def test_endpoints_without_ttl_are_not_cached(responses, fake_url):
+    url = "{}/api/accounts/some-id/".format(fake_url)
+    responses.add(responses.GET, url, json={"id": "some-id"}, status=200)
+    session = APISession(fake_url, cache=ResponseCache(ttls={"/api/institutions/": 60}))
+
+    session.get("/api/accounts/", "some-id")
+    session.get("/api/accounts/", "some-id")
+
+    assert len(responses.calls) == 2
+
+
+def test_writes_invalidate_cached_responses_of_the_endpoint(responses, fake_url):
+    url = "{}/api/links/some-id/".format(fake_url)
+    responses.add(responses.GET, url, json={"id": "some-id"}, status=200)
+    responses.add(responses.DELETE, url, status=204)
+    session = APISession(fake_url, cache=ResponseCache(ttl=60))
+
+    session.get("/api/links/", "some-id")
+    session.delete("/api/links/", "some-id")
+    session.get("/api/links/", "some-id")
+
+    assert len(responses.calls) == 3
+
+
+def test_async_session_uses_cache(run_async, fake_url, async_transport):
+    async_transport.routes[("GET", "/api/institutions/banamex/", None)] = (200, {"id": "banamex"})
+    session = AsyncAPISession(
+        fake_url, transport=async_transport, cache=ResponseCache(ttls={"/api/institutions/": 60})
+    )
+
+    async def get_twice():
+        await session.get("/api/institutions/", "banamex")
+        async_transport.routes.clear()
+        return await session.get("/api/institutions/", "banamex")
+
+    assert run_async(get_twice()) == {"id": "banamex"}
+
+
+def test_cached_responses_are_not_shared_between_different_credentials(responses, fake_url):
+    valid = "Basic " + base64.b64encode(b"monty:python").decode()
+
+    def callback(request):
+        if request.headers["Authorization"] != valid:
+            return 401, {}, json.dumps({"detail": "Invalid credentials"})
+        return 200, {}, json.dumps({"name": "banamex"})
+
+    responses.add_callback(
+        responses.GET, "{}/api/institutions/banamex/".format(fake_url), callback=callback
+    )
+    cache = ResponseCache(ttls={"/api/institutions/": 60})
+    session = APISession(fake_url, cache=cache)
+    session.login("monty", "python", lazy=True)
+    other = APISession(fake_url, cache=cache)
+    other.login("monty", "wrong-password", lazy=True)
+
+    assert session.get("/api/institutions/", "banamex") == {"name": "banamex"}
+    with pytest.raises(BelvoAPIException):
+        other.get("/api/institutions/", "banamex")
+    assert len(responses.calls) == 2
+
+
+def test_metrics_record_requests_sizes_and_pages(responses, fake_url):
+    resource_url = "{}/api/resources/".format(fake_url)
+    responses.add(
+        responses.GET,
+        resource_url,
+        json={"results": [{"id": 1}], "next": "{}?page=2".format(resource_url)},
+        status=200,
+        match_querystring=True,
+    )
+    responses.add(
+        responses.GET,
+        "{}?page=2".format(resource_url),
+        json={"results": [{"id": 2}], "next": None},
+        status=200,
+        match_querystring=True,
+    )
+    responses.add(responses.POST, resource_url, json={"id": 3}, status=201)
+    metrics = MetricsRegistry()
+    session = APISession(fake_url, metrics=metrics)
+
+    list(session.list("/api/resources/"))
+    session.post("/api/resources/", data={"name": "three"})
+
+    assert (
+        metrics.counter(
+            "belvo_requests_total", method="GET", endpoint="/api/resources/", status="200"
+        )
+        == 2
+    )
+    assert metrics.histogram("belvo_list_pages", endpoint="/api/resources/").sum == 2
+    request_sizes = metrics.histogram(
+        "belvo_request_size_bytes", method="POST", endpoint="/api/resources/"
+    )
+    assert request_sizes.sum == len(session.codec.dumps({"name": "three"}))
+    response_sizes = metrics.histogram(
+        "belvo_response_size_bytes", method="POST", endpoint="/api/resources/"
+    )
+    assert response_sizes.sum == len(b'{"id": 3}')
+
+
+def test_metrics_record_network_errors(fake_url, responses):
+    metrics = MetricsRegistry()
+    session = APISession(fake_url, metrics=metrics)
+    responses.add(
+        responses.GET, "{}/api/resources/1/".format(fake_url), body=ConnectionError("boom")
+    )
+
+    with pytest.raises(ConnectionError):
+        session.get("/api/resources/", "1")
+
+    assert (
+        metrics.counter(
+            "belvo_requests_total",
+            method="GET",
+            endpoint="/api/resources/",
+            status="ConnectionError",
+        )
+        == 1
+    )
+
+
+def test_metrics_record_pages_of_streamed_and_async_lists(run_async, fake_url, async_transport):
+    async_transport.routes[("GET", "/api/resources/", None)] = (
+        200,
+        {"next": f"{fake_url}/api/resources/?page=2", "results": ["one"]},
+    )
+    async_transport.routes[("GET", "/api/resources/", "page=2")] = (
+        200,
+        {"next": None, "results": ["two"]},
+    )
+    metrics = MetricsRegistry()
+    session = AsyncAPISession(fake_url, transport=async_transport, metrics=metrics)
+
+    async def consume():
+        return [result async for result in session.list("/api/resources/", stream=True)]
+
+    run_async(consume())
+
+    assert metrics.histogram("belvo_list_pages", endpoint="/api/resources/").sum == 2
+    assert (
+        metrics.counter(
+            "belvo_requests_total", method="GET", endpoint="/api/resources/", status="200"
+        )
+        == 2
+    )
+
+
+def test_hooks_are_called_around_requests_and_pages(responses, fake_url):
+    resource_url = "{}/api/resources/".format(fake_url)
+    responses.add(
+        responses.GET,
+        resource_url,
+        json={"results": [{"id": 1}], "next": "{}?page=2".format(resource_url)},
+        status=200,
+        match_querystring=True,
+    )
+    responses.add(
+        responses.GET,
+        "{}?page=2".format(resource_url),
+        json={"results": [{"id": 2}], "next": None},
+        status=200,
+        match_querystring=True,
+    )
+    events = []
+
+    def before_request(method, url, headers):
+        headers["X-Request-Id"] = "fake-id"
+        events.append(("before_request", method, url))
+
+    session = APISession(
+        fake_url,
+        hooks={
+            "before_request": [before_request],
+            "on_page": [lambda endpoint, number, page: events.append(("on_page", number))],
+        },
+    )
+    session.add_hook("after_response", lambda method, url, r, elapsed: events.append(r.status_code))
+
+    list(session.list("/api/resources/"))
+
+    assert events == [
+        ("before_request", "GET", resource_url),
+        200,
+        ("on_page", 1),
+        ("before_request", "GET", "{}?page=2".format(resource_url)),
+        200,
+        ("on_page", 2),
+    ]
+    assert responses.calls[0].request.headers["X-Request-Id"] == "fake-id"
+
+
+def test_on_error_hook_is_called_when_no_response_is_received(responses, fake_url):
+    responses.add(
+        responses.GET, "{}/api/resources/1/".format(fake_url), body=ConnectionError("boom")
+    )
+    errors = []
+    session = APISession(fake_url, hooks={"on_error": [lambda *args: errors.append(args)]})
+
+    with pytest.raises(ConnectionError):
+        session.get("/api/resources/", "1")
+
+    assert errors[0][:2] == ("GET", "{}/api/resources/1/".format(fake_url))
+    assert isinstance(errors[0][2], ConnectionError)
+
+
+@pytest.mark.parametrize("error", [TooManyRedirects("boom"), RuntimeError("boom")])
+def test_other_errors_end_the_request_span_and_call_on_error_hook(error, responses, fake_url):
+    responses.add(responses.GET, "{}/api/resources/1/".format(fake_url), body=error)
+    exporter = InMemoryExporter()
+    errors = []
+    session = APISession(
+        fake_url,
+        retry=RetryPolicy(3),
+        tracer=Tracer(exporter),
+        hooks={"on_error": [lambda *args: errors.append(args[2])]},
+    )
+
+    with pytest.raises(type(error)):
+        session.get("/api/resources/", "1")
+
+    assert errors == [error]
+    assert [(span.name, span.status) for span in exporter.spans] == [("belvo.http", "error")]
+    assert len(responses.calls) == 1
+
+
+def test_request_span_is_ended_when_a_hook_raises(responses, fake_url):
+    responses.add(responses.GET, "{}/api/resources/1/".format(fake_url), json={}, status=200)
+    exporter = InMemoryExporter()
+
+    def after_response(*args):
+        raise RuntimeError("boom")
+
+    session = APISession(
+        fake_url, tracer=Tracer(exporter), hooks={"after_response": [after_response]}
+    )
+
+    with pytest.raises(RuntimeError):
+        session.get("/api/resources/", "1")
+
+    assert [span.attributes["http.status_code"] for span in exporter.spans] == [200]
+
+
+def test_unknown_hook_events_are_rejected(fake_url):
+    with pytest.raises(ValueError):
+        APISession(fake_url).add_hook("on_login", print)
+
+
+def test_tracer_traces_login_creations_and_pages(responses, fake_url):
+    responses.add(responses.GET, "{}/api/".format(fake_url), json={}, status=200)
+    responses.add(
+        responses.POST, "{}/api/transactions/".format(fake_url), json=[{"id": 1}], status=201
+    )
+    responses.add(
+        responses.GET,
+        "{}/api/transactions/".format(fake_url),
+        json={"results": [{"id": 1}], "next": None},
+        status=200,
+    )
+    exporter = InMemoryExporter()
+    session = APISession(fake_url, tracer=Tracer(exporter))
+
+    session.login("monty", "python")
+    session.post("/api/transactions/", data={"link": "fake-link-uuid"})
+    list(session.list("/api/transactions/", prefetch=2))
+
+    spans = {span.name: [] for span in exporter.spans}
+    for span in exporter.spans:
+        spans[span.name].append(span)
+    login, create, page = spans["belvo.login"][0], spans["belvo.create"][0], spans["belvo.page"][0]
+    assert create.attributes["belvo.link"] == "fake-link-uuid"
+    assert page.attributes == {"belvo.endpoint": "/api/transactions/", "belvo.page": 1}
+    assert [http.parent_id for http in spans["belvo.http"]] == [
+        login.span_id,
+        create.span_id,
+        page.span_id,
+    ]
+    assert spans["belvo.http"][1].attributes["http.status_code"] == 201
+    assert responses.calls[1].request.headers["traceparent"] == spans["belvo.http"][1].traceparent
+
+
+def test_tracer_traces_streamed_pages_of_async_session(run_async, fake_url, async_transport):
+    async_transport.routes[("GET", "/api/resources/", None)] = (
+        200,
+        {"next": f"{fake_url}/api/resources/?page=2", "results": ["one"]},
+    )
+    async_transport.routes[("GET", "/api/resources/", "page=2")] = (
+        200,
+        {"next": None, "results": ["two"]},
+    )
+    exporter = InMemoryExporter()
+    session = AsyncAPISession(fake_url, transport=async_transport, tracer=Tracer(exporter))
+
+    async def consume():
+        return [result async for result in session.list("/api/resources/", stream=True)]
+
+    run_async(consume())
+
+    pages = [span for span in exporter.spans if span.name == "belvo.page"]
+    requests = [span for span in exporter.spans if span.name == "belvo.http"]
+    assert [page.attributes["belvo.page"] for page in pages] == [1, 2]
+    assert [request.parent_id for request in requests] == [page.span_id for page in pages]
+
+
+class UpperCaseCodec(JSONCodec):
+    def loads(self, content):
+        return super().loads(content.upper())
+
+
+def test_session_encodes_and_decodes_bodies_with_its_codec(responses, fake_url):
+    responses.add(
+        responses.POST, "{}/api/resources/".format(fake_url), json={"id": "abc"}, status=201
+    )
+    session = APISession(fake_url, codec=UpperCaseCodec())
+
+    assert session.post("/api/resources/", data={"name": "one"}) == {"ID": "ABC"}
+    request = responses.calls[0].request
+    assert request.headers["Content-Type"] == "application/json"
+    assert request.body == b'{"name": "one"}'
+
+
+def test_async_session_encodes_and_decodes_bodies_with_its_codec(run_async, fake_url):
+    def handler(request):
+        assert request.headers["Content-Type"] == "application/json"
+        return httpx.Response(201, content=request.content)
+
+    session = AsyncAPISession(
+        fake_url, transport=httpx.MockTransport(handler), codec=UpperCaseCodec()
+    )
+
+    assert run_async(session.post("/api/resources/", data={"name": "one"})) == {"NAME": "ONE"}
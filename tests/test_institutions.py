@@ -11,3 +11,10 @@ def test_institutions_raises_not_implemented(method, params, api_session):
     with pytest.raises(NotImplementedError):
         func = getattr(institutions, method)
         assert func(*params)
+
+
+def test_institutions_can_not_be_listed_as_models(api_session):
+    institutions = resources.Institutions(api_session)
+
+    with pytest.raises(ValueError):
+        institutions.list(model=True)
@@ -1,3 +1,5 @@
+import base64
+import json
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -151,6 +153,26 @@ def test_links_create_with_key_cert(api_session):
         )
 
 
+def test_links_create_sends_encoded_key_cert(api_session, responses, tmp_path):
+    certificate = tmp_path / "certificate.cer"
+    certificate.write_bytes(b"certificate")
+    private_key = tmp_path / "private.key"
+    private_key.write_bytes(b"private key")
+    responses.add(responses.POST, "http://fake.url/api/links/", json={"id": "link"}, status=201)
+
+    resources.Links(api_session).create(
+        "fake-bank",
+        "fake-user",
+        "fake-password",
+        certificate=str(certificate),
+        private_key=str(private_key),
+    )
+
+    body = json.loads(responses.calls[-1].request.body)
+    assert base64.b64decode(body["certificate"]) == b"certificate"
+    assert base64.b64decode(body["private_key"]) == b"private key"
+
+
 def test_links_update_password(api_session):
     link = resources.Links(api_session)
     link.session.put = MagicMock()
@@ -0,0 +1,75 @@
+from belvo.metrics import MetricsRegistry, to_prometheus
+
+
+def test_registry_counts_requests_per_method_endpoint_and_status():
+    registry = MetricsRegistry()
+
+    registry.observe_request("GET", "/api/accounts/", 200, 0.2, 0, 512)
+    registry.observe_request("GET", "/api/accounts/", 200, 0.4, 0, 1024)
+    registry.observe_request("GET", "/api/accounts/", 500, 0.1)
+
+    assert (
+        registry.counter(
+            "belvo_requests_total", method="GET", endpoint="/api/accounts/", status="200"
+        )
+        == 2
+    )
+    latency = registry.histogram(
+        "belvo_request_duration_seconds", method="GET", endpoint="/api/accounts/"
+    )
+    assert latency.count == 3
+    assert round(latency.sum, 6) == 0.7
+    sizes = registry.histogram("belvo_response_size_bytes", method="GET", endpoint="/api/accounts/")
+    assert sizes.count == 2
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(page_buckets=(1, 5))
+
+    for pages in (1, 3, 10):
+        registry.observe_pages("/api/transactions/", pages)
+
+    histogram = registry.histogram("belvo_list_pages", endpoint="/api/transactions/")
+    assert histogram.cumulative() == [("1", 1), ("5", 2), ("+Inf", 3)]
+
+
+def test_to_prometheus_exports_text_format():
+    registry = MetricsRegistry(latency_buckets=(0.5,))
+    registry.observe_request("POST", "/api/links/", 201, 0.25)
+
+    assert to_prometheus(registry) == (
+        "# HELP belvo_requests_total Requests sent to Belvo API.\n"
+        "# TYPE belvo_requests_total counter\n"
+        'belvo_requests_total{endpoint="/api/links/",method="POST",status="201"} 1\n'
+        "# HELP belvo_request_duration_seconds Time until Belvo API responded "
+        "(or the request failed).\n"
+        "# TYPE belvo_request_duration_seconds histogram\n"
+        'belvo_request_duration_seconds_bucket{endpoint="/api/links/",method="POST",le="0.5"} 1\n'
+        'belvo_request_duration_seconds_bucket{endpoint="/api/links/",method="POST",le="+Inf"} 1\n'
+        'belvo_request_duration_seconds_sum{endpoint="/api/links/",method="POST"} 0.25\n'
+        'belvo_request_duration_seconds_count{endpoint="/api/links/",method="POST"} 1\n'
+    )
+    assert to_prometheus(MetricsRegistry()) == ""
+
+
+def test_observations_are_forwarded_to_sinks_even_if_one_fails():
+    observations = []
+
+    def failing_sink(name, labels, value):
+        raise RuntimeError()
+
+    registry = MetricsRegistry(sinks=[failing_sink])
+    registry.add_sink(lambda name, labels, value: observations.append((name, value)))
+
+    registry.observe_pages("/api/transactions/", 3)
+
+    assert observations == [("belvo_list_pages", 3)]
+
+
+def test_reset_clears_metrics():
+    registry = MetricsRegistry()
+    registry.observe_pages("/api/transactions/", 3)
+
+    registry.reset()
+
+    assert registry.histogram("belvo_list_pages", endpoint="/api/transactions/") is None
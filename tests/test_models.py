@@ -0,0 +1,103 @@
+import pickle
+from unittest.mock import MagicMock
+
+import pytest
+
+from belvo import resources
+from belvo.models import Account, Transaction, to_records
+from belvo.simulator import Simulator
+
+TRANSACTION = {
+    "id": "transaction-id",
+    "account": {"id": "account-id", "name": "Cuenta Perfiles"},
+    "amount": 2145.45,
+    "currency": "MXN",
+    "value_date": "2019-10-23",
+    "description": None,
+    "category": "Income & Payments",
+    "some_new_field": "kept as is",
+}
+
+
+def test_record_converts_losslessly_back_to_dict():
+    transaction = Transaction.from_dict(TRANSACTION)
+
+    assert transaction.to_dict() == TRANSACTION
+
+
+def test_record_exposes_fields_as_attributes():
+    transaction = Transaction.from_dict(TRANSACTION)
+
+    assert transaction.id == "transaction-id"
+    assert transaction.amount == 2145.45
+    assert transaction.account == {"id": "account-id", "name": "Cuenta Perfiles"}
+    assert transaction.some_new_field == "kept as is"
+
+
+def test_record_missing_fields_read_as_none_but_are_not_added_to_dict():
+    transaction = Transaction.from_dict({"id": "transaction-id"})
+
+    assert transaction.merchant is None
+    assert transaction.to_dict() == {"id": "transaction-id"}
+
+
+def test_record_raises_attribute_error_for_unknown_attributes():
+    with pytest.raises(AttributeError):
+        Transaction.from_dict(TRANSACTION).unknown
+
+
+def test_record_has_no_instance_dict():
+    transaction = Transaction.from_dict(TRANSACTION)
+
+    assert not hasattr(transaction, "__dict__")
+
+
+def test_record_interns_low_cardinality_strings():
+    first = Transaction.from_dict({"id": "1", "currency": "".join(["M", "X", "N"])})
+    second = Transaction.from_dict({"id": "2", "currency": "".join(["M", "X", "N"])})
+
+    assert first.currency is second.currency
+
+
+def test_records_know_every_field_returned_by_the_api():
+    data = Simulator(transactions_per_account=5).data
+
+    for record_class, resource in ((Account, "accounts"), (Transaction, "transactions")):
+        for item in data[resource]:
+            assert record_class.from_dict(item)._extra is None
+
+
+def test_records_can_be_compared_and_pickled():
+    transaction = Transaction.from_dict(TRANSACTION)
+
+    assert pickle.loads(pickle.dumps(transaction)) == transaction
+    assert transaction != Account.from_dict(TRANSACTION)
+
+
+def test_to_records_converts_dicts_iterables_and_awaitables(run_async):
+    async def get():
+        return {"id": "account-id"}
+
+    async def list_():
+        yield {"id": "account-id"}
+
+    async def consume():
+        return [record async for record in to_records(Account, list_())]
+
+    assert to_records(Account, {"id": "account-id"}).id == "account-id"
+    assert [a.id for a in to_records(Account, [{"id": "account-id"}])] == ["account-id"]
+    assert run_async(to_records(Account, get())).id == "account-id"
+    assert [a.id for a in run_async(consume())] == ["account-id"]
+
+
+def test_resources_without_models_raise_before_making_a_request(api_session):
+    api_session.get = MagicMock()
+    api_session.list = MagicMock()
+    institutions = resources.Institutions(api_session)
+
+    with pytest.raises(ValueError):
+        institutions.get("banamex", model=True)
+    with pytest.raises(ValueError):
+        institutions.list(model=True)
+
+    assert not api_session.get.called and not api_session.list.called
@@ -0,0 +1,114 @@
+import threading
+
+import pytest
+
+from belvo.ratelimit import FileRateLimiter, InMemoryRateLimiter, take_token
+
+
+def test_take_token_starts_with_a_full_bucket():
+    state, wait = take_token(None, 100.0, rate=2, burst=3)
+
+    assert state == (2, 100.0)
+    assert wait == 0
+
+
+def test_take_token_reserves_future_tokens_when_bucket_is_empty():
+    state, wait = take_token((0, 100.0), 100.0, rate=2, burst=3)
+
+    assert state == (-1, 100.0)
+    assert wait == 0.5
+
+
+def test_take_token_refills_bucket_up_to_burst():
+    state, wait = take_token((0, 100.0), 200.0, rate=2, burst=3)
+
+    assert state == (2, 200.0)
+    assert wait == 0
+
+
+def test_in_memory_rate_limiter_makes_requests_wait_once_burst_is_exhausted():
+    limiter = InMemoryRateLimiter(rate=10, burst=2)
+
+    waits = [limiter.reserve("key", "/api/transactions/") for _ in range(4)]
+
+    assert waits[:2] == [0, 0]
+    assert 0.05 < waits[2] <= 0.1
+    assert 0.15 < waits[3] <= 0.2
+
+
+def test_in_memory_rate_limiter_uses_one_bucket_per_secret_key():
+    limiter = InMemoryRateLimiter(rate=1, burst=1)
+
+    assert limiter.reserve("key-one", "/api/links/") == 0
+    assert limiter.reserve("key-two", "/api/links/") == 0
+    assert limiter.reserve("key-one", "/api/links/") > 0
+
+
+def test_in_memory_rate_limiter_can_limit_endpoints_on_their_own():
+    limiter = InMemoryRateLimiter(rate=10, burst=10, endpoint_rates={"/api/transactions/": 1})
+
+    assert limiter.reserve("key", "/api/transactions/") == 0
+    assert limiter.reserve("key", "/api/institutions/") == 0
+    assert limiter.reserve("key", "/api/transactions/") > 0.9
+    assert limiter.reserve("key", "/api/links/") == 0
+
+
+def test_in_memory_rate_limiter_keeps_endpoints_within_the_secret_key_rate():
+    limiter = InMemoryRateLimiter(rate=1, burst=1, endpoint_rates={"/api/transactions/": 5})
+
+    assert limiter.reserve("key", "/api/transactions/") == 0
+    assert limiter.reserve("key", "/api/transactions/") > 0.9
+    assert limiter.reserve("key", "/api/links/") > 1.9
+
+
+def test_in_memory_rate_limiter_endpoint_bursts():
+    limiter = InMemoryRateLimiter(
+        rate=100,
+        burst=100,
+        endpoint_rates={"/api/transactions/": 1},
+        endpoint_bursts={"/api/transactions/": 3},
+    )
+
+    waits = [limiter.reserve("key", "/api/transactions/") for _ in range(4)]
+
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3] > 0.9
+
+
+def test_in_memory_rate_limiter_is_thread_safe():
+    limiter = InMemoryRateLimiter(rate=1, burst=100)
+    waits = []
+
+    def reserve():
+        for _ in range(50):
+            waits.append(limiter.reserve("key", "/api/links/"))
+
+    threads = [threading.Thread(target=reserve) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(1 for wait in waits if wait == 0) == 100
+
+
+def test_file_rate_limiter_shares_buckets_between_instances(tmp_path):
+    path = str(tmp_path / "belvo-rate-limit.json")
+    limiter_one = FileRateLimiter(path, rate=1, burst=1)
+    limiter_two = FileRateLimiter(path, rate=1, burst=1)
+
+    assert limiter_one.reserve("key", "/api/links/") == 0
+    assert limiter_two.reserve("key", "/api/links/") > 0
+
+
+def test_file_rate_limiter_takes_tokens_from_the_endpoint_and_secret_key(tmp_path):
+    path = str(tmp_path / "belvo-rate-limit.json")
+    limiter = FileRateLimiter(path, rate=1, burst=1, endpoint_rates={"/api/transactions/": 5})
+
+    assert limiter.reserve("key", "/api/transactions/") == 0
+    assert limiter.reserve("key", "/api/transactions/") > 0.9
+
+
+def test_rate_limiter_requires_a_positive_rate():
+    with pytest.raises(ValueError):
+        InMemoryRateLimiter(rate=0)
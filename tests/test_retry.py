@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from belvo.retry import RetryPolicy, parse_retry_after
+
+
+@pytest.mark.parametrize("method", ["GET", "PUT", "DELETE", "POST", "PATCH"])
+def test_retry_policy_retries_throttled_requests_for_any_method(method):
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.should_retry(method, 1, status=429)
+
+
+@pytest.mark.parametrize("method, expected", [("GET", True), ("POST", False), ("PATCH", False)])
+def test_retry_policy_only_retries_server_errors_for_idempotent_methods(method, expected):
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.should_retry(method, 1, status=503) is expected
+
+
+def test_retry_policy_retries_post_when_request_was_never_sent():
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.should_retry("POST", 1, request_sent=False)
+    assert not policy.should_retry("POST", 1, request_sent=True)
+
+
+def test_retry_policy_can_retry_non_idempotent_methods_when_allowed():
+    policy = RetryPolicy(max_attempts=3, retry_non_idempotent=True)
+
+    assert policy.should_retry("POST", 1, status=503)
+
+
+@pytest.mark.parametrize("status", [400, 401, 404])
+def test_retry_policy_does_not_retry_client_errors(status):
+    assert not RetryPolicy().should_retry("GET", 1, status=status)
+
+
+def test_retry_policy_stops_after_max_attempts():
+    policy = RetryPolicy(max_attempts=2)
+
+    assert policy.should_retry("GET", 1, status=503)
+    assert not policy.should_retry("GET", 2, status=503)
+
+
+def test_retry_policy_backoff_grows_exponentially_up_to_max_delay():
+    policy = RetryPolicy(backoff_factor=1, max_delay=5, jitter=False)
+
+    assert [policy.delay(attempt) for attempt in range(1, 5)] == [1, 2, 4, 5]
+
+
+def test_retry_policy_jitter_stays_within_backoff():
+    policy = RetryPolicy(backoff_factor=1, max_delay=5)
+
+    assert all(0 <= policy.delay(3) <= 4 for _ in range(100))
+
+
+def test_retry_policy_honours_retry_after_capped_by_max_delay():
+    policy = RetryPolicy(max_delay=10)
+
+    assert policy.delay(1, "7") == 7
+    assert policy.delay(1, "120") == 10
+
+
+def test_parse_retry_after_accepts_http_dates():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert 25 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+
+
+@pytest.mark.parametrize("value", [None, "", "not a date"])
+def test_parse_retry_after_returns_none_for_invalid_values(value):
+    assert parse_retry_after(value) is None
@@ -0,0 +1,109 @@
+import pytest
+
+from belvo.client import Client
+from belvo.exceptions import BelvoAPIException
+from belvo.retry import RetryPolicy
+from belvo.simulator import Simulator, constant
+
+
+@pytest.fixture
+def simulator():
+    with Simulator(links=2, transactions_per_account=30, page_size=20) as simulator:
+        yield simulator
+
+
+@pytest.fixture
+def client(simulator, responses):
+    responses.add_passthru(simulator.url)
+    yield Client("secret-key-id", "secret-key-password", simulator.url)
+
+
+def test_simulator_paginates_lists(simulator, client):
+    transactions = list(client.Transactions.list())
+
+    assert len(transactions) == 120
+    assert len({transaction["id"] for transaction in transactions}) == 120
+    assert simulator.request_count("GET", "/api/transactions/") == 6
+
+
+def test_simulator_filters_lists(simulator, client):
+    link = simulator.data["links"][0]["id"]
+
+    transactions = list(client.Transactions.list(link=link))
+    accounts = list(client.Accounts.list(link=link))
+
+    assert len(transactions) == 60
+    assert {account["link"] for account in accounts} == {link}
+
+
+def test_simulator_retrieves_transactions_of_a_date_range(simulator, client):
+    link = simulator.data["links"][0]
+    end_date = simulator.end_date.isoformat()
+
+    transactions = client.Transactions.create(link["id"], end_date, date_to=end_date)
+
+    assert transactions
+    assert {transaction["value_date"] for transaction in transactions} == {end_date}
+
+
+def test_simulator_asks_for_tokens_and_resumes_sessions(simulator, client):
+    link = simulator.add_link("gringotts_mx_retail", accounts=1, transactions_per_account=5)
+
+    response = client.Transactions.create(link["id"], "2000-01-01")
+    assert response[0]["code"] == "token_required"
+
+    transactions = client.Transactions.resume(response[0]["session"], "123456", link=link["id"])
+    assert len(transactions) == 5
+
+
+def test_simulator_creates_and_deletes_links(simulator, client):
+    link = client.Links.create("erebor_mx_retail", "username", "password")
+
+    assert client.Links.get(link["id"])["institution"] == "erebor_mx_retail"
+    assert client.Links.delete(link["id"])
+    assert len(list(client.Links.list())) == 2
+
+
+def test_simulator_injects_failures_that_can_be_retried(responses):
+    with Simulator(error_rate={"/api/institutions/": 0.5}, seed=1) as simulator:
+        responses.add_passthru(simulator.url)
+        client = Client(
+            "id",
+            "password",
+            simulator.url,
+            retry=RetryPolicy(max_attempts=20, backoff_factor=0, jitter=False),
+        )
+
+        assert len(list(client.Institutions.list())) == 2
+        assert simulator.request_count("GET", "/api/institutions/") > 1
+
+
+def test_simulator_throttles_requests():
+    simulator = Simulator(rate_limit=1, burst=1)
+
+    assert simulator.handle("GET", "/api/institutions/")[0] == 200
+    status, headers, _ = simulator.handle("GET", "/api/institutions/")
+    assert status == 429
+    assert headers["Retry-After"] == "1"
+    simulator.stop()
+
+
+def test_simulator_checks_credentials_and_waits_for_latency(responses):
+    with Simulator(credentials=("id", "password"), latency=constant(0.01)) as simulator:
+        responses.add_passthru(simulator.url)
+
+        with pytest.raises(BelvoAPIException):
+            Client("id", "wrong-password", simulator.url)
+
+        assert Client("id", "password", simulator.url).session.key_id == "id"
+
+
+@pytest.mark.parametrize("error", [BrokenPipeError, ConnectionResetError, ValueError])
+def test_simulator_only_reports_errors_of_requests_still_connected(simulator, capsys, error):
+    try:
+        raise error("boom")
+    except error:
+        simulator._server.handle_error(None, ("127.0.0.1", 12345))
+
+    reported = capsys.readouterr().err
+    assert ("ValueError: boom" in reported) == (error is ValueError)
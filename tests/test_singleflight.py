@@ -0,0 +1,113 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from belvo.client import AsyncClient, Client
+from belvo.simulator import Simulator, constant
+from belvo.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_concurrent_calls():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        leader = executor.submit(flights.do, "key", call)
+        started.wait()
+        followers = [executor.submit(flights.do, "key", call) for _ in range(3)]
+        other = executor.submit(flights.do, "other", lambda: "other")
+        assert other.result() == "other"
+        while flights.shared < 3:
+            pass
+        release.set()
+
+        assert [future.result() for future in [leader, *followers]] == ["result"] * 4
+    assert len(calls) == 1
+    assert len(flights) == 0
+
+
+def test_single_flight_shares_exceptions_and_forgets_them():
+    flights = SingleFlight()
+
+    with pytest.raises(ZeroDivisionError):
+        flights.do("key", lambda: 1 / 0)
+
+    assert flights.do("key", lambda: "retried") == "retried"
+
+
+def test_async_single_flight_shares_concurrent_calls(run_async):
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", call) for _ in range(5)))
+
+    assert run_async(main()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flights.shared == 4
+    assert len(flights) == 0
+
+
+def test_async_single_flight_survives_cancelled_leader(run_async):
+    flights = AsyncSingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do("key", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await follower
+
+    assert run_async(main()) == "result"
+
+
+@pytest.fixture
+def simulator():
+    with Simulator(latency=constant(0.05)) as simulator:
+        yield simulator
+
+
+def test_client_coalesces_identical_gets(simulator, responses):
+    responses.add_passthru(simulator.url)
+    client = Client("id", "password", simulator.url, coalesce=True, pool_maxsize=8)
+    account = simulator.data["accounts"][0]["id"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        accounts = list(executor.map(lambda _: client.Accounts.get(account), range(8)))
+
+    assert all(result == accounts[0] for result in accounts)
+    assert len({id(result) for result in accounts}) == 8
+    assert simulator.request_count("GET", "/api/accounts/") < 8
+    assert client.session.coalesced == 8 - simulator.request_count("GET", "/api/accounts/")
+
+
+def test_async_client_coalesces_identical_gets(run_async, simulator):
+    async def main():
+        async with AsyncClient("id", "password", simulator.url, coalesce=True) as client:
+            return await asyncio.gather(*(client.Accounts.get(account) for _ in range(5)))
+
+    account = simulator.data["accounts"][0]["id"]
+    accounts = run_async(main())
+
+    assert all(result == accounts[0] for result in accounts)
+    assert simulator.request_count("GET", "/api/accounts/") == 1
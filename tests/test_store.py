@@ -0,0 +1,68 @@
+import pytest
+
+from belvo.models import Transaction
+from belvo.store import Store
+
+TRANSACTIONS = [
+    {"id": "t1", "account": {"id": "a1", "link": "l1"}, "value_date": "2020-01-10"},
+    {"id": "t2", "account": {"id": "a1", "link": "l1"}, "value_date": "2020-02-10"},
+    {"id": "t3", "account": {"id": "a2", "link": "l2"}, "value_date": "2020-03-10"},
+]
+
+
+@pytest.fixture
+def store():
+    store = Store()
+    yield store
+    store.close()
+
+
+def test_store_upserts_records_by_id(store):
+    store.upsert("links", [{"id": "l1", "status": "valid"}])
+    store.upsert("links", {"id": "l1", "status": "invalid"})
+
+    assert store.count("links") == 1
+    assert store.get("links", "l1") == {"id": "l1", "status": "invalid"}
+    assert store.get("links", "unknown") is None
+
+
+def test_store_filters_accounts_by_link(store):
+    store.upsert("accounts", [{"id": "a1", "link": "l1"}, {"id": "a2", "link": "l2"}])
+
+    assert store.accounts(link="l1") == [{"id": "a1", "link": "l1"}]
+    assert len(store.accounts()) == 2
+
+
+def test_store_filters_transactions_newest_first(store):
+    assert store.upsert("transactions", iter(TRANSACTIONS)) == 3
+
+    assert [t["id"] for t in store.transactions()] == ["t3", "t2", "t1"]
+    assert [t["id"] for t in store.transactions(link="l1")] == ["t2", "t1"]
+    assert [t["id"] for t in store.transactions(account="a2")] == ["t3"]
+    assert [t["id"] for t in store.transactions(date_from="2020-02-01")] == ["t3", "t2"]
+    assert [t["id"] for t in store.transactions(date_to="2020-02-10", limit=1)] == ["t2"]
+
+
+def test_store_accepts_models(store):
+    store.upsert("transactions", [Transaction.from_dict(TRANSACTIONS[0])])
+
+    assert store.get("transactions", "t1") == TRANSACTIONS[0]
+
+
+def test_store_deletes_records(store):
+    store.upsert("links", [{"id": "l1"}])
+
+    assert store.delete("links", "l1") is True
+    assert store.delete("links", "l1") is False
+
+
+def test_store_persists_to_file(tmp_path):
+    path = str(tmp_path / "belvo.db")
+    Store(path).upsert("transactions", TRANSACTIONS)
+
+    assert Store(path).count("transactions") == 3
+
+
+def test_store_rejects_unknown_kinds(store):
+    with pytest.raises(ValueError):
+        store.upsert("owners", [{"id": "o1"}])
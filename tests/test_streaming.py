@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from belvo.streaming import PageDecoder
+
+PAGE = {
+    "count": 3,
+    "next": "http://fake.url/api/transactions/?page=2",
+    "previous": None,
+    "results": [
+        {"id": "1", "amount": 1250.5, "description": 'Café "Central"', "tags": [1, 2]},
+        {"id": "2", "amount": -0.5e3, "description": None, "tags": []},
+        {"id": "3", "amount": 12, "description": "ñ", "tags": [{"nested": True}]},
+    ],
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 4096])
+def test_page_decoder_yields_results_regardless_of_chunk_boundaries(chunk_size):
+    raw = json.dumps(PAGE).encode()
+    decoder = PageDecoder()
+
+    results = []
+    for start in range(0, len(raw), chunk_size):
+        end = start + chunk_size
+        results.extend(decoder.feed(raw[start:end]))
+    page = decoder.close()
+
+    assert results == PAGE["results"]
+    assert page == {"count": 3, "next": PAGE["next"], "previous": None}
+
+
+def test_page_decoder_returns_results_as_soon_as_they_are_complete():
+    decoder = PageDecoder()
+
+    assert decoder.feed(b'{"next": null, "results": [{"id": "1"}, {"id"') == [{"id": "1"}]
+    assert decoder.feed(b': "2"}]}') == [{"id": "2"}]
+    assert decoder.close() == {"next": None}
+
+
+def test_page_decoder_does_not_keep_consumed_results_in_memory():
+    decoder = PageDecoder()
+    decoder.feed(b'{"results": [' + b",".join([b'{"id": "%d"}' % i for i in range(1000)]) + b",")
+
+    assert len(decoder._buffer) - decoder._pos < 10
+
+
+@pytest.mark.parametrize(
+    "raw", [b'{"results": [1, 2', b"[1, 2]", b'{"results" [1]}', b'{"results": [1 2]}']
+)
+def test_page_decoder_raises_error_on_invalid_or_incomplete_pages(raw):
+    decoder = PageDecoder()
+
+    with pytest.raises(json.JSONDecodeError):
+        decoder.feed(raw)
+        decoder.close()
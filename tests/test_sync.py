@@ -0,0 +1,62 @@
+import pytest
+
+from belvo.sync import (
+    FileWatermarkStore,
+    InMemoryWatermarkStore,
+    SQLiteWatermarkStore,
+    latest_date,
+    window_start,
+)
+
+
+@pytest.fixture(params=["memory", "file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryWatermarkStore()
+    elif request.param == "file":
+        yield FileWatermarkStore(str(tmp_path / "watermarks.json"))
+    else:
+        store = SQLiteWatermarkStore(str(tmp_path / "watermarks.db"))
+        yield store
+        store.close()
+
+
+def test_store_keeps_watermarks_per_link_and_account(store):
+    assert store.get("link") is None
+
+    store.set("link", "2020-01-31")
+    store.set("link", "2020-02-15", account="account")
+
+    assert store.get("link") == "2020-01-31"
+    assert store.get("link", "account") == "2020-02-15"
+    assert store.get("other-link") is None
+
+
+def test_store_overwrites_watermarks(store):
+    store.set("link", "2020-01-31")
+    store.set("link", "2020-02-29")
+
+    assert store.get("link") == "2020-02-29"
+
+
+@pytest.mark.parametrize("store_class", [FileWatermarkStore, SQLiteWatermarkStore])
+def test_persistent_stores_survive_reopening(store_class, tmp_path):
+    path = str(tmp_path / "watermarks")
+    store_class(path).set("link", "2020-01-31")
+
+    assert store_class(path).get("link") == "2020-01-31"
+
+
+def test_latest_date_prefers_value_date_and_falls_back_to_collected_at():
+    transactions = [
+        {"value_date": "2020-01-10", "collected_at": "2020-03-01T00:00:00Z"},
+        {"collected_at": "2020-02-01T10:00:00Z"},
+        {"value_date": None},
+    ]
+
+    assert latest_date(transactions) == "2020-02-01"
+    assert latest_date([]) is None
+
+
+def test_window_start_goes_back_overlap_days():
+    assert window_start("2020-03-02", 3) == "2020-02-28"
@@ -0,0 +1,48 @@
+import pytest
+
+from belvo.tracing import InMemoryExporter, Tracer
+
+
+def test_spans_are_nested_and_exported_when_ended():
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+
+    with tracer.span("parent", kind="outer") as parent:
+        with tracer.span("child") as child:
+            assert tracer.current() is child
+        assert tracer.current() is parent
+    assert tracer.current() is None
+
+    assert [span.name for span in exporter.spans] == ["child", "parent"]
+    assert child.trace_id == parent.trace_id
+    assert child.parent_id == parent.span_id
+    assert parent.parent_id is None
+    assert parent.attributes == {"kind": "outer"}
+    assert parent.duration >= child.duration >= 0
+
+
+def test_span_records_errors():
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+
+    with pytest.raises(ValueError):
+        with tracer.span("failing"):
+            raise ValueError("boom")
+
+    (span,) = exporter.spans
+    assert span.status == "error"
+    assert span.attributes["error"] == "ValueError('boom')"
+
+
+def test_started_spans_can_have_an_explicit_parent_and_are_ended_once():
+    exporter = InMemoryExporter()
+    tracer = Tracer(exporter)
+    parent = tracer.start_span("parent")
+
+    span = tracer.start_span("child", parent=parent)
+    span.end()
+    span.end()
+
+    assert exporter.spans == [span]
+    assert span.parent_id == parent.span_id
+    assert span.traceparent == f"00-{parent.trace_id}-{span.span_id}-01"
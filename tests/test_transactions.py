@@ -1,8 +1,13 @@
 from unittest.mock import MagicMock
 
+import pytest
 from freezegun import freeze_time
 
 from belvo import resources
+from belvo.client import AsyncClient
+from belvo.exceptions import PartialResultError, RequestError
+from belvo.models import Transaction
+from belvo.sync import InMemoryWatermarkStore
 
 
 @freeze_time("2019-02-28T12:00:00Z")
@@ -59,3 +64,288 @@ def test_transactions_create_sends_account_if_given(api_session):
         },
         raise_exception=False,
     )
+
+
+def test_transactions_list_can_return_models(api_session):
+    transactions = resources.Transactions(api_session)
+    transactions.session.list = MagicMock(return_value=iter([{"id": "1", "amount": 10.5}]))
+
+    results = list(transactions.list(link="fake-link-uuid", model=True))
+
+    assert isinstance(results[0], Transaction)
+    assert results[0].to_dict() == {"id": "1", "amount": 10.5}
+    transactions.session.list.assert_called_with(
+        "/api/transactions/", params={"link": "fake-link-uuid"}, prefetch=0, stream=False
+    )
+
+
+def test_transactions_get_can_return_a_model(api_session):
+    transactions = resources.Transactions(api_session)
+    transactions.session.get = MagicMock(return_value={"id": "1"})
+
+    assert transactions.get("1", model=True) == Transaction.from_dict({"id": "1"})
+
+
+def test_transactions_list_columnar_uses_default_columns(api_session):
+    transactions = resources.Transactions(api_session)
+    transactions.session.list = MagicMock(
+        return_value=iter([{"id": "1", "amount": 10.5, "currency": "MXN"}])
+    )
+
+    columns = transactions.list_columnar(link="fake-link-uuid")
+
+    assert columns.schema == transactions.columns
+    assert columns.data["id"] == ["1"]
+    assert columns.categories["currency"] == ["MXN"]
+
+
+def test_transactions_create_in_windows_merges_and_deduplicates(api_session):
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(
+        side_effect=lambda endpoint, data, **kwargs: [
+            {"id": data["date_from"]},
+            {"id": "shared"},
+        ]
+    )
+
+    result = transactions.create(
+        "fake-link-uuid", "2020-01-15", date_to="2020-03-10", window="month", save_data=False
+    )
+
+    assert result == [
+        {"id": "2020-01-15"},
+        {"id": "shared"},
+        {"id": "2020-02-01"},
+        {"id": "2020-03-01"},
+    ]
+    windows = sorted(
+        (call.kwargs["data"]["date_from"], call.kwargs["data"]["date_to"])
+        for call in transactions.session.post.call_args_list
+    )
+    assert windows == [
+        ("2020-01-15", "2020-01-31"),
+        ("2020-02-01", "2020-02-29"),
+        ("2020-03-01", "2020-03-10"),
+    ]
+    assert all(
+        call.kwargs["data"]["save_data"] is False and call.kwargs["raise_exception"] is True
+        for call in transactions.session.post.call_args_list
+    )
+
+
+def test_transactions_create_in_windows_only_retries_failed_windows(api_session, monkeypatch):
+    attempts = {}
+    sleeps = []
+    monkeypatch.setattr("belvo.resources.base.time.sleep", sleeps.append)
+
+    def post(endpoint, data, **kwargs):
+        attempts[data["date_from"]] = attempts.get(data["date_from"], 0) + 1
+        if data["date_from"] == "2020-02-01" and attempts["2020-02-01"] == 1:
+            raise RequestError(500, [{"code": "service_unavailable"}])
+        return [{"id": data["date_from"]}]
+
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(side_effect=post)
+
+    result = transactions.create(
+        "fake-link-uuid", "2020-01-01", date_to="2020-03-31", window="month"
+    )
+
+    assert result == [{"id": "2020-01-01"}, {"id": "2020-02-01"}, {"id": "2020-03-01"}]
+    assert attempts == {"2020-01-01": 1, "2020-02-01": 2, "2020-03-01": 1}
+    assert len(sleeps) == 1 and 0 <= sleeps[0] <= 1.0
+
+
+def test_transactions_create_in_windows_keeps_results_of_windows_that_succeeded(
+    api_session, monkeypatch
+):
+    sleeps = []
+    monkeypatch.setattr("belvo.resources.base.time.sleep", sleeps.append)
+
+    def post(endpoint, data, **kwargs):
+        if data["date_from"] == "2020-02-01":
+            raise RequestError(400, [{"code": "invalid"}])
+        return [{"id": data["date_from"]}]
+
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(side_effect=post)
+
+    with pytest.raises(PartialResultError) as exc:
+        transactions.create(
+            "fake-link-uuid",
+            "2020-01-01",
+            date_to="2020-03-31",
+            window="month",
+            window_attempts=3,
+            window_backoff=2,
+            raise_exception=True,
+        )
+
+    assert exc.value.results == [{"id": "2020-01-01"}, {"id": "2020-03-01"}]
+    assert exc.value.failed == [("2020-02-01", "2020-02-29")]
+    assert exc.value.status_code == 400
+    assert exc.value.detail == [{"code": "invalid"}]
+    assert transactions.session.post.call_count == 5
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 2 and 0 <= sleeps[1] <= 4
+
+
+def test_transactions_create_in_windows_raises_error_of_windows_that_kept_failing(
+    api_session, monkeypatch
+):
+    monkeypatch.setattr("belvo.resources.base.time.sleep", lambda seconds: None)
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(side_effect=RequestError(400, [{"code": "invalid"}]))
+
+    with pytest.raises(PartialResultError) as exc:
+        transactions.create(
+            "fake-link-uuid",
+            "2020-01-01",
+            date_to="2020-03-31",
+            window="month",
+            window_attempts=2,
+            raise_exception=True,
+        )
+
+    assert exc.value.results == []
+    assert len(exc.value.failed) == 3
+    assert exc.value.detail == [{"code": "invalid"}]
+    assert transactions.session.post.call_count == 6
+
+
+def test_transactions_create_in_windows_returns_errors_of_windows_that_kept_failing(
+    api_session, monkeypatch
+):
+    monkeypatch.setattr("belvo.resources.base.time.sleep", lambda seconds: None)
+
+    def post(endpoint, data, **kwargs):
+        if data["date_from"] == "2020-02-01":
+            raise RequestError(400, [{"code": "invalid", "window": data["date_from"]}])
+        return [{"id": data["date_from"]}]
+
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(side_effect=post)
+
+    result = transactions.create(
+        "fake-link-uuid", "2020-01-01", date_to="2020-03-31", window="month", window_attempts=2
+    )
+
+    assert result == [
+        {"id": "2020-01-01"},
+        {"id": "2020-03-01"},
+        {"code": "invalid", "window": "2020-02-01"},
+    ]
+    assert transactions.session.post.call_count == 4
+
+
+def test_transactions_create_in_windows_raises_errors_without_response(api_session, monkeypatch):
+    monkeypatch.setattr("belvo.resources.base.time.sleep", lambda seconds: None)
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(side_effect=ConnectionError())
+
+    with pytest.raises(PartialResultError) as exc:
+        transactions.create(
+            "fake-link-uuid", "2020-01-01", date_to="2020-01-31", window="month", window_attempts=1
+        )
+
+    assert exc.value.status_code is None
+    assert isinstance(exc.value.errors[0], ConnectionError)
+
+
+def test_transactions_create_in_windows_on_async_client(run_async, async_transport):
+    async_transport.routes[("GET", "/api/", None)] = (200, {})
+    async_transport.routes[("POST", "/api/transactions/", None)] = (
+        500,
+        [{"code": "service_unavailable"}],
+    )
+
+    async def run():
+        async with AsyncClient("a", "b", "http://fake.url", transport=async_transport) as client:
+            return await client.Transactions.create(
+                "fake-link-uuid",
+                "2020-01-01",
+                date_to="2020-02-29",
+                window="month",
+                window_attempts=2,
+                window_backoff=0.01,
+                raise_exception=True,
+            )
+
+    with pytest.raises(PartialResultError) as exc:
+        run_async(run())
+
+    assert exc.value.failed == [("2020-01-01", "2020-01-31"), ("2020-02-01", "2020-02-29")]
+    assert exc.value.status_code == 500
+
+
+@freeze_time("2020-03-10T12:00:00Z")
+def test_transactions_sync_requests_new_window_and_advances_watermark(api_session):
+    store = InMemoryWatermarkStore()
+    store.set("fake-link-uuid", "2020-03-05")
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(
+        return_value=[
+            {"id": "1", "value_date": "2020-03-09"},
+            {"id": "2", "value_date": "2020-03-03"},
+        ]
+    )
+
+    result = transactions.sync("fake-link-uuid", store, save_data=False)
+
+    assert [transaction["id"] for transaction in result] == ["1", "2"]
+    transactions.session.post.assert_called_with(
+        "/api/transactions/",
+        data={
+            "link": "fake-link-uuid",
+            "date_from": "2020-03-02",
+            "date_to": "2020-03-10",
+            "save_data": False,
+        },
+        raise_exception=True,
+    )
+    assert store.get("fake-link-uuid") == "2020-03-09"
+
+
+def test_transactions_sync_keeps_watermarks_per_account(api_session):
+    store = InMemoryWatermarkStore()
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(return_value=[{"id": "1", "value_date": "2020-03-09"}])
+
+    transactions.sync("fake-link-uuid", store, date_from="2020-01-01", account="fake-account")
+
+    assert transactions.session.post.call_args.kwargs["data"]["date_from"] == "2020-01-01"
+    assert store.get("fake-link-uuid", "fake-account") == "2020-03-09"
+    assert store.get("fake-link-uuid") is None
+
+
+def test_transactions_sync_needs_date_from_the_first_time(api_session):
+    transactions = resources.Transactions(api_session)
+
+    with pytest.raises(ValueError):
+        transactions.sync("fake-link-uuid", InMemoryWatermarkStore())
+
+
+def test_transactions_sync_does_not_advance_watermark_on_error(api_session):
+    store = InMemoryWatermarkStore()
+    store.set("fake-link-uuid", "2020-03-05")
+    transactions = resources.Transactions(api_session)
+    transactions.session.post = MagicMock(side_effect=RequestError(428, {"code": "token_required"}))
+
+    assert transactions.sync("fake-link-uuid", store) == {"code": "token_required"}
+    assert store.get("fake-link-uuid") == "2020-03-05"
+
+
+def test_transactions_sync_on_async_client(run_async, async_transport):
+    async_transport.routes[("GET", "/api/", None)] = (200, {})
+    async_transport.routes[("POST", "/api/transactions/", None)] = (
+        201,
+        [{"id": "1", "value_date": "2020-03-09"}],
+    )
+    store = InMemoryWatermarkStore()
+
+    async def run():
+        async with AsyncClient("a", "b", "http://fake.url", transport=async_transport) as client:
+            return await client.Transactions.sync("fake-link-uuid", store, date_from="2020-03-01")
+
+    assert run_async(run()) == [{"id": "1", "value_date": "2020-03-09"}]
+    assert store.get("fake-link-uuid") == "2020-03-09"
@@ -0,0 +1,94 @@
+import base64
+import os
+
+import pytest
+
+from belvo import utils
+from belvo.utils import EncodedFileCache, date_windows
+
+
+def test_date_windows_follows_calendar_months():
+    assert date_windows("2020-01-15", "2020-03-10", "month") == [
+        ("2020-01-15", "2020-01-31"),
+        ("2020-02-01", "2020-02-29"),
+        ("2020-03-01", "2020-03-10"),
+    ]
+
+
+def test_date_windows_crosses_years():
+    assert date_windows("2019-12-20", "2020-01-05", "month") == [
+        ("2019-12-20", "2019-12-31"),
+        ("2020-01-01", "2020-01-05"),
+    ]
+
+
+def test_date_windows_accepts_a_number_of_days():
+    assert date_windows("2020-01-01", "2020-01-05", 2) == [
+        ("2020-01-01", "2020-01-02"),
+        ("2020-01-03", "2020-01-04"),
+        ("2020-01-05", "2020-01-05"),
+    ]
+
+
+@pytest.mark.parametrize("window", ["day", 0, -1])
+def test_date_windows_rejects_invalid_windows(window):
+    with pytest.raises(ValueError):
+        date_windows("2020-01-01", "2020-01-05", window)
+
+
+@pytest.fixture
+def certificate(tmp_path):
+    path = tmp_path / "certificate.cer"
+    path.write_bytes(os.urandom(1000))
+    return path
+
+
+def test_encoded_file_cache_only_reads_files_once(certificate):
+    cache = EncodedFileCache()
+
+    assert cache.encode(certificate) == base64.b64encode(certificate.read_bytes()).decode()
+    assert cache.encode(str(certificate)) == cache.encode(certificate)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_encoded_file_cache_reads_modified_files_again(certificate):
+    cache = EncodedFileCache()
+    cache.encode(certificate)
+
+    certificate.write_bytes(b"renewed")
+    assert cache.encode(certificate) == base64.b64encode(b"renewed").decode()
+
+    certificate.write_bytes(b"updated")
+    stat = certificate.stat()
+    os.utime(str(certificate), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert cache.encode(certificate) == base64.b64encode(b"updated").decode()
+
+    assert cache.misses == 3
+    assert len(cache) == 1
+
+
+def test_encoded_file_cache_shares_identical_files(certificate, tmp_path):
+    copy = tmp_path / "copy.cer"
+    copy.write_bytes(certificate.read_bytes())
+    cache = EncodedFileCache(maxsize=1)
+
+    encoded = cache.encode(certificate)
+
+    assert cache.encode(copy) is encoded
+    assert len(cache) == 1
+
+
+def test_encoded_file_cache_maps_large_files(certificate, monkeypatch):
+    monkeypatch.setattr(utils, "MMAP_THRESHOLD", 100)
+    monkeypatch.setattr(utils, "ENCODE_CHUNK_SIZE", 3 * 7)
+
+    encoded = EncodedFileCache().encode(certificate)
+
+    assert encoded == base64.b64encode(certificate.read_bytes()).decode()
+
+
+def test_encoded_file_cache_rejects_missing_files(tmp_path):
+    with pytest.raises(ValueError):
+        EncodedFileCache().encode(tmp_path / "missing.cer")
+    with pytest.raises(ValueError):
+        EncodedFileCache().encode(tmp_path)